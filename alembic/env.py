@@ -16,7 +16,8 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Importar TODOS los modelos para que Alembic los detecte
-from app.modules.users.models import User
+from app.modules.users.models import User, UserPokemon, PokemonOwnerCount
+from app.modules.auth.models import TokenRevocation
 # Si tienes más modelos, impórtalos aquí:
 # from app.modules.posts.models import Post
 # from app.modules.comments.models import Comment
@@ -9,11 +9,11 @@ from typing import Sequence, Union
 from alembic import op
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from pwdlib import PasswordHash
 import uuid
 import json
 
 from app.core.config import get_settings
+from app.core.security import get_password_hash
 
 # revision identifiers, used by Alembic.
 revision: str = 'b7b8a7142652'
@@ -21,7 +21,6 @@ down_revision: Union[str, Sequence[str], None] = 'b7b8a7142651'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
-pwd_context = PasswordHash.recommended()
 settings = get_settings()
 
 def upgrade() -> None:
@@ -85,7 +84,7 @@ def upgrade() -> None:
         
         if not result:
             # Hash password
-            hashed_pwd = pwd_context.hash(user_data['password'])
+            hashed_pwd = get_password_hash(user_data['password'])
             
             # Transform pokemons to JSON
             pokemons_json = json.dumps(user_data['pokemons'])
@@ -0,0 +1,51 @@
+"""add user pokemon bits
+
+Revision ID: b7b8a7142654
+Revises: b7b8a7142653
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.modules.users import bitset
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7b8a7142654'
+down_revision: Union[str, Sequence[str], None] = 'b7b8a7142653'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('pokemon_bits', sa.LargeBinary(), nullable=True))
+
+    # Backfill from the JSON collections, keyset batches over the primary key
+    users = sa.table('users', sa.column('id'), sa.column('pokemons', sa.JSON()), sa.column('pokemon_bits', sa.LargeBinary()))
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(users.c.id, users.c.pokemons).order_by(users.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(users.c.id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+        connection.execute(
+            users.update().where(users.c.id == sa.bindparam('user_id')).values(pokemon_bits=sa.bindparam('bits')),
+            [{'user_id': row.id, 'bits': bitset.from_ids(p['id'] for p in row.pokemons or ())} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('users', 'pokemon_bits', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'pokemon_bits')
@@ -0,0 +1,70 @@
+"""add user pokemons index
+
+Revision ID: b7b8a7142655
+Revises: b7b8a7142654
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7b8a7142655'
+down_revision: Union[str, Sequence[str], None] = 'b7b8a7142654'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+# Same bound as the collection bitsets, ids outside of it cannot be owned
+MAX_POKEMON_ID = 1025
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_pokemons',
+    sa.Column('pokemon_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('pokemon_id', 'user_id')
+    )
+    op.create_index(op.f('ix_user_pokemons_user_id'), 'user_pokemons', ['user_id'], unique=False)
+    op.create_table('pokemon_owner_counts',
+    sa.Column('pokemon_id', sa.Integer(), nullable=False),
+    sa.Column('owners', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('pokemon_id')
+    )
+
+    # Backfill from the JSON collections, keyset batches over the primary key
+    users = sa.table('users', sa.column('id'), sa.column('pokemons', sa.JSON()))
+    user_pokemons = sa.table('user_pokemons', sa.column('pokemon_id'), sa.column('user_id'))
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(users.c.id, users.c.pokemons).order_by(users.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(users.c.id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+        pairs = {
+            (p['id'], row.id) for row in rows for p in row.pokemons or ()
+            if 1 <= p['id'] <= MAX_POKEMON_ID
+        }
+        if pairs:
+            connection.execute(user_pokemons.insert(), [{'pokemon_id': p, 'user_id': u} for p, u in pairs])
+        last_id = rows[-1].id
+
+    op.execute(
+        "INSERT INTO pokemon_owner_counts (pokemon_id, owners) "
+        "SELECT pokemon_id, count(*) FROM user_pokemons GROUP BY pokemon_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('pokemon_owner_counts')
+    op.drop_index(op.f('ix_user_pokemons_user_id'), table_name='user_pokemons')
+    op.drop_table('user_pokemons')
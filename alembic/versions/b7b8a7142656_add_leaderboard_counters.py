@@ -0,0 +1,41 @@
+"""add leaderboard counters
+
+Revision ID: b7b8a7142656
+Revises: b7b8a7142655
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7b8a7142656'
+down_revision: Union[str, Sequence[str], None] = 'b7b8a7142655'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('pokemon_count', sa.Integer(), server_default='0', nullable=False))
+
+    # The owners index of b7b8a7142655 already holds one row per owned Pokémon
+    op.execute(
+        "UPDATE users SET pokemon_count = counts.total "
+        "FROM (SELECT user_id, count(*) AS total FROM user_pokemons GROUP BY user_id) AS counts "
+        "WHERE users.id = counts.user_id"
+    )
+    op.alter_column('users', 'pokemon_count', server_default=None)
+
+    op.create_index('ix_users_pokemon_count', 'users', [sa.text('pokemon_count DESC'), 'id'], unique=False)
+    op.create_index('ix_pokemon_owner_counts_owners', 'pokemon_owner_counts', [sa.text('owners DESC'), 'pokemon_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pokemon_owner_counts_owners', table_name='pokemon_owner_counts')
+    op.drop_index('ix_users_pokemon_count', table_name='users')
+    op.drop_column('users', 'pokemon_count')
@@ -0,0 +1,79 @@
+"""
+Pick Argon2 parameters for this host.
+
+Usage:
+  python -m app.core.argon2_calibration --target-ms 250 --max-memory-mib 64
+
+Benchmarks hashing on the current machine and prints the ARGON2_* settings that
+keep one hash under the target latency, using as much memory as allowed first
+(memory hardness) and then raising the time cost while there is budget left.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import List, Optional
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+# OWASP minimum for Argon2id
+MIN_MEMORY_KIB = 19 * 1024
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def measure_hash_ms(time_cost: int, memory_cost: int, parallelism: int, rounds: int = 3) -> float:
+  hasher = Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+  timings: List[float] = []
+  for _ in range(rounds):
+    start = time.perf_counter()
+    hasher.hash(SAMPLE_PASSWORD)
+    timings.append((time.perf_counter() - start) * 1000)
+  return statistics.median(timings)
+
+
+def calibrate(target_ms: float, max_memory_kib: int, parallelism: int, min_memory_kib: int = MIN_MEMORY_KIB, rounds: int = 3) -> dict:
+  """
+  Returns the strongest parameters whose hash latency stays under `target_ms`.
+  """
+  memory_cost = max_memory_kib
+  latency = measure_hash_ms(1, memory_cost, parallelism, rounds)
+
+  # Too slow even with a single pass: give up memory until it fits
+  while latency > target_ms and memory_cost // 2 >= min_memory_kib:
+    memory_cost //= 2
+    latency = measure_hash_ms(1, memory_cost, parallelism, rounds)
+
+  time_cost = 1
+  while True:
+    next_latency = measure_hash_ms(time_cost + 1, memory_cost, parallelism, rounds)
+    if next_latency > target_ms:
+      break
+    time_cost, latency = time_cost + 1, next_latency
+
+  return {
+    "ARGON2_TIME_COST": time_cost,
+    "ARGON2_MEMORY_COST": memory_cost,
+    "ARGON2_PARALLELISM": parallelism,
+    "latency_ms": round(latency, 1),
+  }
+
+
+def main(argv: Optional[List[str]] = None):
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget for one hash")
+  parser.add_argument("--max-memory-mib", type=int, default=64, help="Memory budget for one hash")
+  parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+  parser.add_argument("--concurrent-logins", type=int, default=4, help="Logins hashing at once per worker")
+  parser.add_argument("--rounds", type=int, default=3)
+  args = parser.parse_args(argv)
+
+  result = calibrate(args.target_ms, args.max_memory_mib * 1024, args.parallelism, rounds=args.rounds)
+
+  peak_mib = result["ARGON2_MEMORY_COST"] * args.concurrent_logins / 1024
+  print(f"# {result['latency_ms']} ms per hash, up to {peak_mib:.0f} MiB per worker with {args.concurrent_logins} concurrent logins")
+  for key in ("ARGON2_TIME_COST", "ARGON2_MEMORY_COST", "ARGON2_PARALLELISM"):
+    print(f"{key}={result[key]}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+  """
+  Thread-safe in-memory LRU cache with per-entry expiration.
+  Entries expire after `ttl` seconds (None = never) or at an explicit wall-clock time.
+  """
+  def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+    self._lock = Lock()
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    with self._lock:
+      item = self._data.get(key, _MISSING)
+      if item is _MISSING:
+        return default
+
+      value, deadline = item
+      if deadline is not None and deadline <= time.monotonic():
+        del self._data[key]
+        return default
+
+      self._data.move_to_end(key)
+      return value
+
+  def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+    """
+    Store a value. `expires_at` is a unix timestamp and wins over `ttl`.
+    """
+    if expires_at is not None:
+      deadline = time.monotonic() + (expires_at - time.time())
+    elif ttl is not None or self.ttl is not None:
+      deadline = time.monotonic() + (ttl if ttl is not None else self.ttl)
+    else:
+      deadline = None
+
+    with self._lock:
+      self._data[key] = (value, deadline)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+
+  def pop(self, key: Hashable, default: Any = None) -> Any:
+    with self._lock:
+      item = self._data.pop(key, _MISSING)
+    return default if item is _MISSING else item[0]
+
+  def clear(self) -> None:
+    with self._lock:
+      self._data.clear()
+
+  def __contains__(self, key: Hashable) -> bool:
+    return self.get(key, _MISSING) is not _MISSING
+
+  def __len__(self) -> int:
+    return len(self._data)
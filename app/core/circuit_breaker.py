@@ -0,0 +1,68 @@
+import time
+from threading import Lock
+
+
+class CircuitBreaker:
+  """
+  Stops calling a failing dependency for a while.
+
+  closed: calls go through, consecutive failures are counted.
+  open: after `failure_threshold` failures calls are rejected for `reset_timeout` seconds.
+  half_open: once the timeout passes a single trial call is let through,
+  its result closes or reopens the circuit.
+  """
+  CLOSED = "closed"
+  OPEN = "open"
+  HALF_OPEN = "half_open"
+
+  def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+    self.failure_threshold = failure_threshold
+    self.reset_timeout = reset_timeout
+    self._failures = 0
+    self._opened_at = None
+    self._trial_started = None
+    self._lock = Lock()
+
+  @property
+  def state(self) -> str:
+    with self._lock:
+      return self._state()
+
+  def _state(self) -> str:
+    if self._opened_at is None:
+      return self.CLOSED
+    if time.monotonic() - self._opened_at >= self.reset_timeout:
+      return self.HALF_OPEN
+    return self.OPEN
+
+  def allow(self) -> bool:
+    with self._lock:
+      state = self._state()
+      if state == self.CLOSED:
+        return True
+      # A trial that never reported back (cancelled request) is given up after reset_timeout
+      now = time.monotonic()
+      if state == self.HALF_OPEN and (self._trial_started is None or now - self._trial_started >= self.reset_timeout):
+        self._trial_started = now
+        return True
+      return False
+
+  def record_success(self) -> None:
+    with self._lock:
+      self._failures = 0
+      self._opened_at = None
+      self._trial_started = None
+
+  def record_failure(self) -> None:
+    with self._lock:
+      self._failures += 1
+      if self._trial_started is not None or self._failures >= self.failure_threshold:
+        self._opened_at = time.monotonic()
+      self._trial_started = None
+
+  def snapshot(self) -> dict:
+    with self._lock:
+      return {"state": self._state(), "failures": self._failures}
+
+  def reset(self) -> None:
+    self.record_success()
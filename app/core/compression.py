@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import zlib
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .http_cache import encoded_etag, is_not_modified
+
+try:
+  import brotli
+except ImportError:  # brotli is optional, gzip is always available
+  brotli = None
+
+
+# Payloads that are already compressed gain nothing from another pass
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+  """
+  Pick the best supported encoding from an Accept-Encoding header.
+  Brotli is preferred over gzip when both are acceptable.
+  """
+  accepted: Dict[str, float] = {}
+  for item in accept_encoding.split(","):
+    parts = item.strip().split(";")
+    name = parts[0].strip().lower()
+    if not name:
+      continue
+    quality = 1.0
+    for param in parts[1:]:
+      key, _, value = param.strip().partition("=")
+      if key == "q":
+        try:
+          quality = float(value)
+        except ValueError:
+          quality = 0.0
+    accepted[name] = quality
+
+  def acceptable(name: str) -> bool:
+    return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+  if brotli is not None and acceptable("br"):
+    return "br"
+  if acceptable("gzip"):
+    return "gzip"
+  return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+  if encoding == "br":
+    return brotli.compress(body, quality=brotli_quality)
+  return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class _StreamCompressor:
+  """ Incremental compressor for streamed bodies. """
+  def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+    if encoding == "br":
+      self._compressor = brotli.Compressor(quality=brotli_quality)
+      self._flush = self._compressor.flush
+      self._finish = self._compressor.finish
+      self._process = self._compressor.process
+    else:
+      # wbits=31 writes a gzip container
+      self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+      self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+      self._finish = self._compressor.flush
+      self._process = self._compressor.compress
+
+  def process(self, chunk: bytes) -> bytes:
+    return self._process(chunk) + self._flush()
+
+  def finish(self) -> bytes:
+    return self._finish()
+
+
+class CompressionMiddleware:
+  """
+  Negotiates brotli/gzip per request and compresses responses above `minimum_size`.
+  Responses that already carry a Content-Encoding (e.g. precompressed payloads)
+  are passed through untouched. A compressed response gets the ETag of its
+  encoding, and so does a 304 when the client revalidates that variant.
+  """
+  def __init__(self, app: ASGIApp, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+    self.app = app
+    self.minimum_size = minimum_size
+    self.gzip_level = gzip_level
+    self.brotli_quality = brotli_quality
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    request_headers = Headers(scope=scope)
+    encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+    if encoding is None:
+      await self.app(scope, receive, send)
+      return
+
+    start_message: Optional[Message] = None
+    compressor: Optional[_StreamCompressor] = None
+    passthrough = False
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal start_message, compressor, passthrough
+
+      if message["type"] == "http.response.start":
+        start_message = message
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "")
+        passthrough = (
+          "content-encoding" in headers
+          or message["status"] in (status.HTTP_204_NO_CONTENT, status.HTTP_304_NOT_MODIFIED)
+          or not content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+        if passthrough:
+          etag = headers.get("etag")
+          if message["status"] == status.HTTP_304_NOT_MODIFIED and etag and "content-encoding" not in headers:
+            tag = encoded_etag(etag, encoding)
+            if tag in request_headers.get("if-none-match", ""):
+              MutableHeaders(raw=message["headers"])["ETag"] = tag
+          await send(message)
+        return
+
+      if message["type"] != "http.response.body" or passthrough:
+        await send(message)
+        return
+
+      body = message.get("body", b"")
+      more_body = message.get("more_body", False)
+
+      if compressor is None:
+        headers = MutableHeaders(raw=start_message["headers"])
+
+        if not more_body:
+          # Whole body in one message: apply the size threshold
+          if len(body) < self.minimum_size:
+            await send(start_message)
+            await send(message)
+            return
+          body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+          self._encode_headers(headers, encoding)
+          headers["Content-Length"] = str(len(body))
+          headers.add_vary_header("Accept-Encoding")
+          await send(start_message)
+          await send({"type": "http.response.body", "body": body})
+          return
+
+        compressor = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+        self._encode_headers(headers, encoding)
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        await send(start_message)
+
+      chunk = compressor.process(body)
+      if not more_body:
+        chunk += compressor.finish()
+      await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    await self.app(scope, receive, send_wrapper)
+
+  @staticmethod
+  def _encode_headers(headers: MutableHeaders, encoding: str) -> None:
+    headers["Content-Encoding"] = encoding
+    if "etag" in headers:
+      headers["ETag"] = encoded_etag(headers["etag"], encoding)
+
+
+class PrecompressedPayload:
+  """
+  A serialized payload kept alongside its compressed variants.
+  Variants are built once per encoding on first request.
+  """
+  def __init__(self, source: Any, body: bytes, media_type: str):
+    self.source = source
+    self.body = body
+    self.media_type = media_type
+    self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    self.variants: Dict[str, bytes] = {}
+
+
+class PrecompressedCache:
+  """
+  Cache for hot, rarely changing payloads so they are not re-serialized
+  and re-compressed on every request.
+  """
+  def __init__(self, gzip_level: int = 9, brotli_quality: int = 11):
+    # Payloads are compressed once, so use the strongest levels
+    self.gzip_level = gzip_level
+    self.brotli_quality = brotli_quality
+    self._payloads: Dict[str, PrecompressedPayload] = {}
+    self._lock = Lock()
+
+  def payload(self, key: str, source: Any, render: Callable[[Any], bytes], media_type: str = "application/json") -> PrecompressedPayload:
+    """
+    Return the cached payload for `key`, re-rendering only when `source` changed.
+    """
+    cached = self._payloads.get(key)
+    if cached is not None and cached.source is source:
+      return cached
+
+    payload = PrecompressedPayload(source, render(source), media_type)
+    with self._lock:
+      self._payloads[key] = payload
+    return payload
+
+  def variant(self, payload: PrecompressedPayload, encoding: str) -> bytes:
+    body = payload.variants.get(encoding)
+    if body is None:
+      body = compress(payload.body, encoding, self.gzip_level, self.brotli_quality)
+      payload.variants[encoding] = body
+    return body
+
+  def response(self, request: Request, payload: PrecompressedPayload, cache_control: str) -> Response:
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    etag = encoded_etag(payload.etag, encoding) if encoding else payload.etag
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    if is_not_modified(request, payload.etag):
+      return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding is None:
+      return Response(content=payload.body, media_type=payload.media_type, headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    return Response(content=self.variant(payload, encoding), media_type=payload.media_type, headers=headers)
+
+
+precompressed = PrecompressedCache()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -12,13 +13,79 @@ class Settings(BaseSettings):
 
   # Database
   DATABASE_URL: str
+  DB_POOL_SIZE: int = 5
+  DB_MAX_OVERFLOW: int = 10
+  # Connections all workers may open together, overrides the pool sizes in app.server
+  DB_CONNECTION_BUDGET: Optional[int] = None
+
+  # Server (app.server)
+  HOST: str = "0.0.0.0"
+  PORT: int = 8000
+  WEB_CONCURRENCY: Optional[int] = None
+  MAX_REQUESTS: int = 10000
+  MAX_REQUESTS_JITTER: int = 1000
+  GRACEFUL_TIMEOUT: int = 30
   
   # Security
   SECRET_KEY: str
   ALGORITHM: str = "HS256"
   ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+  REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+  REVOCATION_SYNC_SECONDS: int = 30
+  # PEM keys, only for asymmetric algorithms (RS256, ES256, EdDSA...)
+  JWT_PRIVATE_KEY: Optional[str] = None
+  JWT_PUBLIC_KEY: Optional[str] = None
+  TOKEN_CACHE_SIZE: int = 4096
+
+  # Password hashing (Argon2id), tune per host with `python -m app.core.argon2_calibration`
+  ARGON2_TIME_COST: int = 3
+  ARGON2_MEMORY_COST: int = 65536  # KiB
+  ARGON2_PARALLELISM: int = 4
 
   API_POKEMON: str
+  POKEMON_CATALOG_TTL_SECONDS: int = 86400
+  POKEMON_CACHE_SIZE: int = 2048
+  POKEMON_CACHE_TTL_SECONDS: int = 86400
+  POKEMON_SEARCH_MAX_DISTANCE: int = 2
+  POKEAPI_MAX_CONNECTIONS: int = 20
+  # Sprite images proxied from their upstream host, cached on disk up to this size
+  SPRITE_CACHE_DIR: str = ".cache/sprites"
+  SPRITE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+  POKEAPI_MAX_KEEPALIVE: int = 10
+  # Leaderboards (most collected Pokémon, top collectors) are served from memory for this long
+  LEADERBOARD_CACHE_SECONDS: float = 30.0
+  # Full reload of the similarity matrix, picks up collections changed by other workers
+  SIMILARITY_REFRESH_SECONDS: float = 300.0
+  POKEAPI_BREAKER_FAILURE_THRESHOLD: int = 5
+  POKEAPI_BREAKER_RESET_SECONDS: float = 30.0
+
+  # Background jobs (app.core.tasks), set the SQLite path to persist them across restarts
+  TASK_QUEUE_WORKERS: int = 4
+  TASK_QUEUE_MAX_SIZE: int = 1000
+  TASK_QUEUE_MAX_RETRIES: int = 3
+  TASK_QUEUE_RETRY_BACKOFF_SECONDS: float = 1.0
+  TASK_QUEUE_LEASE_SECONDS: float = 300.0
+  TASK_QUEUE_SQLITE_PATH: Optional[str] = None
+
+  # Cache invalidation between workers (app.core.invalidation), PostgreSQL only
+  INVALIDATION_CHANNEL: str = "cache_invalidation"
+  INVALIDATION_COALESCE_SECONDS: float = 0.05
+  # While the listener is down every cache is flushed this often
+  INVALIDATION_FALLBACK_SECONDS: float = 30.0
+
+  # Health probes (/livez, /readyz)
+  HEALTH_CHECK_CACHE_SECONDS: float = 5.0
+
+  # Warmup of new workers (app.warmup)
+  WARMUP_ENABLED: bool = True
+  WARMUP_DB_CONNECTIONS: int = 2
+  WARMUP_POKEMON_IDS: List[int] = [1, 4, 7, 25, 6, 150]
+  WARMUP_TIMEOUT_SECONDS: float = 15.0
+
+  # Compression
+  COMPRESSION_MINIMUM_SIZE: int = 500
+  COMPRESSION_GZIP_LEVEL: int = 6
+  COMPRESSION_BROTLI_QUALITY: int = 4
 
   model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -7,16 +8,28 @@ from .config import get_settings
 settings = get_settings()
 
 
-engine = create_engine(
+@lru_cache()
+def get_engine():
+  """
+  Engine created on first use, not at import time, so importing the app stays cheap
+  and a preloading server can fork before any pool exists.
+  """
+  return create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     echo=False 
-)
+  )
+
+
+def engine_created() -> bool:
+  return get_engine.cache_info().currsize > 0
+
 
 SessionLocal = sessionmaker(
   autocommit=False,
-  autoflush=False,
-  bind=engine
+  autoflush=False
 )
 
 
@@ -24,7 +37,7 @@ Base = declarative_base()
 
 
 def get_db():
-  db = SessionLocal()
+  db = SessionLocal(bind=get_engine())
   try:
     yield db
   finally:
@@ -33,4 +46,4 @@ def get_db():
 
 def create_tables():
     """Solo para testing o desarrollo. Migraciones en producción."""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=get_engine())
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Content-addressed disk cache with a size cap.
+
+Blobs are stored once per SHA-256 digest under `root/blobs/ab/abcd...`, keys
+point at a digest through a small ref file under `root/refs/`. Keys sharing
+the same content share the blob. When the blobs exceed `max_bytes` the least
+recently used keys are dropped, and their blob once no key points at it.
+
+The LRU order lives in memory, per worker. Hits touch the ref file so the
+order survives a restart: refs are reloaded by modification time on first use.
+Workers share the directory, so a worker over the cap rescans the refs first:
+the cap holds for the whole directory, keys added by other workers rank
+before its own in the LRU order, keys they evicted are forgotten.
+
+A blob may be evicted by another worker while it is being sent. `pin` hands
+out a hard link to it instead, which keeps the file alive until `release`.
+"""
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class CachedFile:
+  path: str
+  digest: str
+  size: int
+  media_type: str
+
+
+class DiskCache:
+
+  # Pins older than this were left by a crashed worker
+  STALE_PIN_SECONDS = 3600
+
+  def __init__(self, root: str, max_bytes: int):
+    self.root = root
+    self.max_bytes = max_bytes
+    self._refs: "OrderedDict[str, CachedFile]" = OrderedDict()
+    self._holders: Dict[str, int] = {}  # digest -> number of keys pointing at it
+    self._size = 0
+    self._loaded = False
+    self._lock = Lock()
+
+  @property
+  def size(self) -> int:
+    return self._size
+
+  def _ref_path(self, key: str) -> str:
+    return os.path.join(self.root, "refs", hashlib.sha256(key.encode()).hexdigest())
+
+  def _blob_path(self, digest: str) -> str:
+    return os.path.join(self.root, "blobs", digest[:2], digest)
+
+  def _read_refs(self) -> Iterator[Tuple[float, str, CachedFile]]:
+    refs_dir = os.path.join(self.root, "refs")
+    if not os.path.isdir(refs_dir):
+      return
+    for name in os.listdir(refs_dir):
+      path = os.path.join(refs_dir, name)
+      try:
+        with open(path) as file:
+          key, digest, media_type = file.read().split("\n")[:3]
+        blob = self._blob_path(digest)
+        yield os.stat(path).st_mtime, key, CachedFile(blob, digest, os.stat(blob).st_size, media_type)
+      except (OSError, ValueError):
+        # Half written or orphaned ref, dropped
+        try:
+          os.unlink(path)
+        except FileNotFoundError:
+          pass
+
+  def _load(self) -> None:
+    # Called with the lock held, once
+    self._loaded = True
+    for _, key, cached in sorted(self._read_refs(), key=lambda entry: entry[0]):
+      self._track(key, cached)
+
+    pins_dir = os.path.join(self.root, "pins")
+    if os.path.isdir(pins_dir):
+      for name in os.listdir(pins_dir):
+        path = os.path.join(pins_dir, name)
+        try:
+          if time.time() - os.stat(path).st_mtime > self.STALE_PIN_SECONDS:
+            os.unlink(path)
+        except FileNotFoundError:
+          pass
+
+  def _rescan(self) -> None:
+    # Called with the lock held: picks up the keys other workers added or evicted
+    on_disk = {key: (mtime, cached) for mtime, key, cached in self._read_refs()}
+    known = [(key, on_disk[key][1]) for key in self._refs if key in on_disk]
+    added = sorted((mtime, key, cached) for key, (mtime, cached) in on_disk.items() if key not in self._refs)
+    self._refs, self._holders, self._size = OrderedDict(), {}, 0
+    for _, key, cached in added:
+      self._track(key, cached)
+    for key, cached in known:
+      self._track(key, cached)
+
+  def _track(self, key: str, cached: CachedFile) -> None:
+    self._refs[key] = cached
+    holders = self._holders.get(cached.digest, 0)
+    if not holders:
+      self._size += cached.size
+    self._holders[cached.digest] = holders + 1
+
+  def _untrack(self, key: str, remove_ref: bool = True) -> Optional[CachedFile]:
+    """
+    Forget `key`, returns its entry when no other key of this worker uses the blob.
+    """
+    cached = self._refs.pop(key)
+    holders = self._holders.pop(cached.digest) - 1
+    if holders:
+      self._holders[cached.digest] = holders
+    else:
+      self._size -= cached.size
+    if remove_ref:
+      try:
+        os.unlink(self._ref_path(key))
+      except FileNotFoundError:
+        pass
+    return None if holders else cached
+
+  def _remove_blobs(self, orphans: List[CachedFile]) -> None:
+    # Other workers may have pointed keys at the same content since our last scan
+    if not orphans:
+      return
+    referenced = {cached.digest for _, _, cached in self._read_refs()}
+    for cached in orphans:
+      if cached.digest in referenced:
+        continue
+      try:
+        os.unlink(cached.path)
+      except FileNotFoundError:
+        pass
+
+  def get(self, key: str) -> Optional[CachedFile]:
+    with self._lock:
+      if not self._loaded:
+        self._load()
+      cached = self._refs.get(key)
+      if cached is None:
+        return None
+      if not os.path.exists(cached.path):
+        # Removed behind our back
+        self._untrack(key)
+        return None
+      try:
+        os.utime(self._ref_path(key))
+      except FileNotFoundError:
+        # Evicted by another worker, the blob may still be used by its other keys
+        self._rescan()
+        return None
+      self._refs.move_to_end(key)
+    return cached
+
+  def pin(self, key: str) -> Optional[CachedFile]:
+    """
+    Like `get`, the path is a hard link that stays valid until `release`
+    even if the entry is evicted meanwhile.
+    """
+    cached = self.get(key)
+    if cached is None:
+      return None
+    pin = os.path.join(self.root, "pins", uuid.uuid4().hex)
+    os.makedirs(os.path.dirname(pin), exist_ok=True)
+    try:
+      os.link(cached.path, pin)
+    except FileNotFoundError:
+      # Evicted by another worker since `get`
+      return None
+    return replace(cached, path=pin)
+
+  def release(self, pinned: CachedFile) -> None:
+    try:
+      os.unlink(pinned.path)
+    except FileNotFoundError:
+      pass
+
+  def put(self, key: str, content: bytes, media_type: str) -> CachedFile:
+    digest = hashlib.sha256(content).hexdigest()
+    cached = CachedFile(self._blob_path(digest), digest, len(content), media_type)
+    # Files are small: written under the lock so eviction never races a write
+    with self._lock:
+      if not self._loaded:
+        self._load()
+      previous = self._refs.get(key)
+      if previous is not None and previous.digest == digest:
+        self._refs.move_to_end(key)
+        return previous
+      orphans = []
+      if previous is not None:
+        orphans.append(self._untrack(key, remove_ref=False))
+
+      if digest not in self._holders:
+        self._write(cached.path, content)
+      self._write(self._ref_path(key), f"{key}\n{digest}\n{media_type}".encode())
+      self._track(key, cached)
+      if self._size > self.max_bytes:
+        self._rescan()
+      while self._size > self.max_bytes and len(self._refs) > 1:
+        orphans.append(self._untrack(next(iter(self._refs))))
+      self._remove_blobs([orphan for orphan in orphans if orphan is not None])
+    return cached
+
+  @staticmethod
+  def _write(path: str, content: bytes) -> None:
+    # Written aside then renamed: readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as file:
+      file.write(content)
+    os.replace(tmp, path)
+
+  def __len__(self) -> int:
+    return len(self._refs)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+# Cache-Control policies per kind of resource
+PRIVATE_REVALIDATE = "private, no-cache"
+PUBLIC_LONG = "public, max-age=86400"
+# Content-addressed files (strong ETag from their digest)
+PUBLIC_STATIC = "public, max-age=2592000"
+
+# Content codings that get their own ETag, see encoded_etag
+ETAG_ENCODINGS = ("br", "gzip")
+
+
+def make_etag(*parts: Any) -> str:
+  """
+  Build a strong ETag from the given parts.
+  Parts are joined and hashed so the tag does not leak internal values.
+  """
+  raw = "|".join(str(part) for part in parts)
+  digest = hashlib.sha256(raw.encode()).hexdigest()[:32]
+  return f'"{digest}"'
+
+
+def content_etag(payload: Any) -> str:
+  """
+  Build a strong ETag from the JSON representation of a payload.
+  """
+  raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+  return make_etag(raw)
+
+
+def user_etag(user, variant: str = "") -> str:
+  """
+  ETag for a user resource, derived from its id and last update.
+  The variant separates representations of the same user (e.g. its pokemons).
+  """
+  return make_etag(user.id, user.updated_at.isoformat() if user.updated_at else "", variant)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+  """
+  ETag of the `encoding` variant of a representation. Each content coding is a
+  different byte sequence and must not share the strong tag of the identity body.
+  """
+  return f'{etag[:-1]}-{encoding}"'
+
+
+def decoded_etag(tag: str) -> str:
+  """
+  Tag of the identity representation, for tags built by encoded_etag.
+  """
+  tag = tag.removeprefix("W/")
+  for encoding in ETAG_ENCODINGS:
+    suffix = f'-{encoding}"'
+    if tag.endswith(suffix):
+      return f'{tag[:-len(suffix)]}"'
+  return tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+  if_none_match = request.headers.get("if-none-match")
+  if not if_none_match:
+    return False
+
+  if if_none_match.strip() == "*":
+    return True
+
+  # If-None-Match uses weak comparison, and any content coding of the representation matches
+  candidates = [tag.strip() for tag in if_none_match.split(",")]
+  return any(decoded_etag(tag) == etag for tag in candidates)
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+  response.headers["ETag"] = etag
+  response.headers["Cache-Control"] = cache_control
+
+
+def conditional_response(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+  """
+  Returns a 304 response when the client already holds the current representation,
+  so the route can skip serialization. Otherwise decorates the outgoing response
+  with validators and returns None.
+  """
+  if is_not_modified(request, etag):
+    return Response(
+      status_code=status.HTTP_304_NOT_MODIFIED,
+      headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+  set_cache_headers(response, etag, cache_control)
+  return None
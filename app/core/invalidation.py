@@ -0,0 +1,227 @@
+"""
+Cross-worker cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+    invalidation_bus.subscribe("user", lambda keys: cache.clear())
+    invalidation_bus.publish(db, "user", user.id)
+    db.commit()
+
+Events are attached to the session and sent with its commit: `pg_notify` runs
+inside the transaction, so PostgreSQL only delivers them to the other workers
+if it commits, and the handlers of this worker run right after the commit.
+Events of a rolled back transaction are dropped. A transaction sends each key
+once, and a topic with more than `max_keys` keys is sent as a wildcard.
+
+Each worker LISTENs on a dedicated connection and buffers what it receives
+for `coalesce` seconds, so a burst of writes costs one call per handler.
+Handlers get the set of keys, or None meaning "everything". Events sent
+while a worker is not listening are lost: every handler is flushed when the
+listener disconnects, every `fallback_ttl` seconds until it is back, and on
+reconnect.
+
+Without PostgreSQL (SQLite locally and in tests) there is no NOTIFY, events
+only reach the handlers of the worker that committed them.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Handler = Callable[[Optional[Set[str]]], None]
+Events = Dict[str, Optional[Set[str]]]
+
+_PENDING = "invalidation_events"
+# NOTIFY payloads are capped at 8000 bytes
+MAX_PAYLOAD = 7900
+
+
+class InvalidationBus:
+
+  def __init__(self, channel: str, coalesce: float = 0.05, fallback_ttl: float = 30.0, max_keys: int = 100):
+    self.channel = channel
+    self.coalesce = coalesce
+    self.fallback_ttl = fallback_ttl
+    self.max_keys = max_keys
+    self.worker_id = uuid.uuid4().hex[:12]
+    self.connected = False
+    self._handlers: Dict[str, List[Tuple[Handler, bool]]] = defaultdict(list)
+    self._buffered: Events = {}
+    self._flush_handle: Optional[asyncio.TimerHandle] = None
+    self._flushed_at = time.monotonic()
+    self._task: Optional[asyncio.Task] = None
+
+  @property
+  def listening(self) -> bool:
+    return self._task is not None
+
+  def subscribe(self, topic: str, handler: Handler, local: bool = True) -> None:
+    """
+    `local=False` for caches the writing worker already updates in place.
+    """
+    self._handlers[topic].append((handler, local))
+
+  def publish(self, session: Session, topic: str, key) -> None:
+    session.info.setdefault(_PENDING, defaultdict(set))[topic].add(str(key))
+
+  def dispatch(self, events: Events, local: bool = False) -> None:
+    for topic, keys in events.items():
+      for handler, on_local in self._handlers.get(topic, ()):
+        if local and not on_local:
+          continue
+        try:
+          handler(keys)
+        except Exception:
+          logger.exception("Invalidation handler for %s failed", topic)
+
+  def flush_all(self) -> None:
+    self._flushed_at = time.monotonic()
+    self.dispatch({topic: None for topic in self._handlers})
+
+  def encode(self, events: Events) -> List[str]:
+    """
+    NOTIFY payloads for `events`, split by topic when they do not fit in one.
+    """
+    compact = {
+      topic: None if keys is None or len(keys) > self.max_keys else sorted(keys)
+      for topic, keys in events.items()
+    }
+    payload = json.dumps({"w": self.worker_id, "e": compact}, separators=(",", ":"))
+    if len(payload) <= MAX_PAYLOAD:
+      return [payload]
+    if len(compact) > 1:
+      return [message for topic, keys in events.items() for message in self.encode({topic: keys})]
+    return [json.dumps({"w": self.worker_id, "e": {topic: None for topic in compact}}, separators=(",", ":"))]
+
+  def receive(self, payload: str) -> None:
+    try:
+      message = json.loads(payload)
+    except ValueError:
+      logger.warning("Ignoring malformed invalidation: %r", payload[:100])
+      return
+    if message.get("w") == self.worker_id:
+      # Already applied after our own commit
+      return
+
+    for topic, keys in message.get("e", {}).items():
+      if keys is None:
+        self._buffered[topic] = None
+      elif self._buffered.get(topic, set()) is not None:
+        self._buffered.setdefault(topic, set()).update(keys)
+
+    if self._flush_handle is None:
+      self._flush_handle = asyncio.get_running_loop().call_later(self.coalesce, self._flush)
+
+  def _flush(self) -> None:
+    events, self._buffered, self._flush_handle = self._buffered, {}, None
+    self.dispatch(events)
+
+  async def start(self, engine) -> None:
+    if self.listening or engine.dialect.name != "postgresql":
+      return
+    self._task = asyncio.create_task(self._listen(engine))
+
+  async def stop(self) -> None:
+    if self._task is None:
+      return
+    self._task.cancel()
+    await asyncio.gather(self._task, return_exceptions=True)
+    self._task = None
+
+  def _connect(self, engine):
+    # Own connection, out of the pool: it stays in LISTEN for the life of the worker
+    connection = engine.raw_connection()
+    connection.detach()
+    dbapi_connection = connection.dbapi_connection
+    dbapi_connection.autocommit = True
+    with dbapi_connection.cursor() as cursor:
+      cursor.execute(f'LISTEN "{self.channel}"')
+    return dbapi_connection
+
+  async def _listen(self, engine) -> None:
+    while True:
+      try:
+        connection = await run_in_threadpool(self._connect, engine)
+      except Exception as e:
+        logger.warning("Invalidation listener cannot connect: %s", e)
+        if time.monotonic() - self._flushed_at >= self.fallback_ttl:
+          self.flush_all()
+        await asyncio.sleep(min(self.fallback_ttl, 5.0))
+        continue
+
+      self.connected = True
+      self.flush_all()
+      try:
+        await self._receive(connection)
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        logger.warning("Invalidation listener disconnected: %s", e)
+      finally:
+        self.connected = False
+        connection.close()
+        self.flush_all()
+
+  async def _receive(self, connection) -> None:
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    loop.add_reader(connection.fileno(), readable.set)
+    try:
+      while True:
+        try:
+          await asyncio.wait_for(readable.wait(), self.fallback_ttl)
+        except asyncio.TimeoutError:
+          # Quiet channel: make sure the connection is still alive
+          await run_in_threadpool(self._ping, connection)
+          continue
+        readable.clear()
+        connection.poll()
+        while connection.notifies:
+          self.receive(connection.notifies.pop(0).payload)
+    finally:
+      loop.remove_reader(connection.fileno())
+
+  @staticmethod
+  def _ping(connection) -> None:
+    with connection.cursor() as cursor:
+      cursor.execute("SELECT 1")
+
+
+invalidation_bus = InvalidationBus(
+  channel=settings.INVALIDATION_CHANNEL,
+  coalesce=settings.INVALIDATION_COALESCE_SECONDS,
+  fallback_ttl=settings.INVALIDATION_FALLBACK_SECONDS,
+)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify(session: Session) -> None:
+  events = session.info.get(_PENDING)
+  if not events or session.get_bind().dialect.name != "postgresql":
+    return
+  for payload in invalidation_bus.encode(events):
+    session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": invalidation_bus.channel, "payload": payload})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply(session: Session) -> None:
+  events = session.info.pop(_PENDING, None)
+  if events:
+    invalidation_bus.dispatch(events, local=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session: Session, previous_transaction) -> None:
+  # Outermost transaction only, a savepoint rollback keeps the events of its parent
+  if previous_transaction.parent is None:
+    session.info.pop(_PENDING, None)
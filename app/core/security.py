@@ -1,25 +1,97 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
+import hashlib
+import uuid
 import jwt
-from jwt import PyJWTError
+from jwt import PyJWK, PyJWTError
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer
 
 from app.modules.auth.schema import TokenData
+from .cache import TTLCache
 from .config import get_settings
 
 settings = get_settings()
 
-pwd_context = PasswordHash.recommended()
+
+def build_password_hash(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHash:
+  return PasswordHash((
+    Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism),
+  ))
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHash:
+  # Built on first use, keeps argon2 setup off the import path
+  return build_password_hash(
+    settings.ARGON2_TIME_COST,
+    settings.ARGON2_MEMORY_COST,
+    settings.ARGON2_PARALLELISM
+  )
 security = HTTPBearer()
 
+# Verified token digest -> claims, entries expire with the token
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+
+def _read_pem(value: str) -> str:
+  # PEM keys in env vars usually come with escaped newlines
+  return value.replace("\\n", "\n")
+
+
+def _is_symmetric() -> bool:
+  return settings.ALGORITHM.startswith("HS")
+
+
+@lru_cache()
+def get_signing_key():
+  """
+  Key used to sign tokens, prepared once.
+  HS* algorithms use SECRET_KEY, asymmetric ones (RS256, ES256, EdDSA...) JWT_PRIVATE_KEY.
+  """
+  algorithm = jwt.get_algorithm_by_name(settings.ALGORITHM)
+  if _is_symmetric():
+    return algorithm.prepare_key(settings.SECRET_KEY)
+
+  if not settings.JWT_PRIVATE_KEY:
+    raise RuntimeError(f"JWT_PRIVATE_KEY is required to sign tokens with {settings.ALGORITHM}")
+  return algorithm.prepare_key(_read_pem(settings.JWT_PRIVATE_KEY))
+
+
+@lru_cache()
+def get_verification_key() -> PyJWK:
+  """
+  Key used to verify tokens, as a PyJWK so PyJWT skips key preparation on every decode.
+  With an asymmetric algorithm only JWT_PUBLIC_KEY is needed, so verification
+  can run on services that never see the signing secret.
+  """
+  algorithm = jwt.get_algorithm_by_name(settings.ALGORITHM)
+  if _is_symmetric():
+    key = algorithm.prepare_key(settings.SECRET_KEY)
+  elif settings.JWT_PUBLIC_KEY:
+    key = algorithm.prepare_key(_read_pem(settings.JWT_PUBLIC_KEY))
+  else:
+    key = get_signing_key().public_key()
+
+  return PyJWK(algorithm.to_jwk(key, as_dict=True), algorithm=settings.ALGORITHM)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-  return pwd_context.verify(plain_password, hashed_password)
+  return get_password_hasher().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+  """
+  Verify a password and return a new hash when the stored one
+  was made with different Argon2 parameters than the current ones.
+  """
+  return get_password_hasher().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-  return pwd_context.hash(password)
+  return get_password_hasher().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -30,17 +102,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
   to_encode.update({"exp": expire})
-  encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+  encoded_jwt = jwt.encode(to_encode, get_signing_key(), algorithm=settings.ALGORITHM)
   return encoded_jwt
 
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+  """
+  Long lived token only accepted by the refresh endpoint.
+  The jti identifies it so it can be revoked when rotated.
+  """
+  to_encode = data.copy()
+  to_encode.update({"type": "refresh", "jti": uuid.uuid4().hex})
+  return create_access_token(
+    to_encode,
+    expires_delta=expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+  )
+
+
 def verify_token(token: str) -> TokenData:
+  # Clients send the same token many times per session, skip decoding it again
+  digest = hashlib.sha256(token.encode()).digest()
+  payload = _token_cache.get(digest)
+  if payload is not None:
+    return dict(payload)
+
   try:
-    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    return payload
+    payload = jwt.decode(token, get_verification_key(), algorithms=[settings.ALGORITHM])
   except PyJWTError:
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
       detail="Could not validate credentials",
       headers={"WWW-Authenticate": "Bearer"}
     )
+
+  if "exp" in payload:
+    _token_cache.set(digest, payload, expires_at=payload["exp"])
+  return dict(payload)
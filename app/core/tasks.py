@@ -0,0 +1,284 @@
+"""
+In-process background jobs.
+
+    @task_queue.task("pokemon.enrich")
+    async def enrich_pokemon(pokemon_id: int): ...
+
+    await task_queue.enqueue("pokemon.enrich", pokemon_id=25)
+
+Jobs are referenced by name with JSON arguments so they can be persisted.
+A bounded number of workers run them off the request path, failed jobs are
+retried with exponential backoff. When the queue is full `enqueue` waits for
+room (backpressure) and past `put_timeout` runs the job itself.
+
+With a durable backend (SQLiteBackend locally) a job is stored before it is
+queued and deleted once it succeeds, so jobs left by a stopped or crashed
+worker are picked up again when their lease expires. A job may then run
+twice, handlers must be idempotent.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class Job:
+  name: str
+  kwargs: dict
+  id: str = field(default_factory=lambda: uuid.uuid4().hex)
+  attempts: int = 0
+
+
+class MemoryBackend:
+  """
+  No persistence, jobs only live in the queue.
+  """
+  durable = False
+
+  def save(self, job: Job, lease: float) -> None:
+    pass
+
+  def complete(self, job: Job) -> None:
+    pass
+
+  def fail(self, job: Job, error: str) -> None:
+    pass
+
+  def claim(self, lease: float, limit: int) -> List[Job]:
+    return []
+
+
+class SQLiteBackend:
+  """
+  Local stand-in for a durable broker. Each job row holds a lease: the worker
+  that queued or claimed it owns it until `locked_until`, then any worker may claim it.
+
+  The connection is opened on first use by each process: the app is loaded
+  before the server forks its workers and SQLite connections must not cross a fork.
+  """
+  durable = True
+
+  def __init__(self, path: str):
+    self.path = path
+    self._lock = Lock()
+    self._pid: Optional[int] = None
+    self._connection: Optional[sqlite3.Connection] = None
+
+  @property
+  def connection(self) -> sqlite3.Connection:
+    # Called with the lock held
+    if self._pid != os.getpid():
+      # The parent's connection is dropped, not closed: closing it would touch the parent's locks
+      self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+      self._connection.execute("PRAGMA journal_mode=WAL")
+      self._connection.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "id TEXT PRIMARY KEY, name TEXT NOT NULL, kwargs TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL DEFAULT 'pending', "
+        "error TEXT, locked_until REAL NOT NULL, created_at REAL NOT NULL)"
+      )
+      self._pid = os.getpid()
+    return self._connection
+
+  def save(self, job: Job, lease: float) -> None:
+    now = time.time()
+    with self._lock:
+      self.connection.execute(
+        "INSERT INTO jobs (id, name, kwargs, attempts, locked_until, created_at) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET attempts = excluded.attempts, locked_until = excluded.locked_until",
+        (job.id, job.name, json.dumps(job.kwargs), job.attempts, now + lease, now)
+      )
+
+  def complete(self, job: Job) -> None:
+    with self._lock:
+      self.connection.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+
+  def fail(self, job: Job, error: str) -> None:
+    with self._lock:
+      self.connection.execute(
+        "UPDATE jobs SET status = 'failed', attempts = ?, error = ? WHERE id = ?",
+        (job.attempts, error, job.id)
+      )
+
+  def claim(self, lease: float, limit: int) -> List[Job]:
+    now = time.time()
+    with self._lock:
+      rows = self.connection.execute(
+        "UPDATE jobs SET locked_until = ? WHERE id IN ("
+        "SELECT id FROM jobs WHERE status = 'pending' AND locked_until <= ? ORDER BY created_at LIMIT ?"
+        ") RETURNING id, name, kwargs, attempts",
+        (now + lease, now, limit)
+      ).fetchall()
+    return [Job(name=name, kwargs=json.loads(kwargs), id=job_id, attempts=attempts) for job_id, name, kwargs, attempts in rows]
+
+  def failed(self) -> List[dict]:
+    with self._lock:
+      rows = self.connection.execute("SELECT id, name, kwargs, attempts, error FROM jobs WHERE status = 'failed'").fetchall()
+    return [{"id": r[0], "name": r[1], "kwargs": json.loads(r[2]), "attempts": r[3], "error": r[4]} for r in rows]
+
+
+class TaskQueue:
+
+  def __init__(
+    self,
+    backend=None,
+    workers: int = 4,
+    max_size: int = 1000,
+    max_retries: int = 3,
+    retry_backoff: float = 1.0,
+    put_timeout: float = 1.0,
+    lease: float = 300.0,
+  ):
+    self.backend = backend or MemoryBackend()
+    self.workers = workers
+    self.max_size = max_size
+    self.max_retries = max_retries
+    self.retry_backoff = retry_backoff
+    self.put_timeout = put_timeout
+    self.lease = lease
+    self._handlers: Dict[str, Callable] = {}
+    self._queue: Optional[asyncio.Queue] = None
+    self._tasks: List[asyncio.Task] = []
+
+  def task(self, name: str):
+    """
+    Register a handler, sync handlers run in the threadpool.
+    """
+    def decorator(func):
+      self._handlers[name] = func
+      return func
+    return decorator
+
+  @property
+  def running(self) -> bool:
+    return self._queue is not None
+
+  @property
+  def queued(self) -> int:
+    return self._queue.qsize() if self.running else 0
+
+  async def start(self) -> None:
+    if self.running:
+      return
+    self._queue = asyncio.Queue(maxsize=self.max_size)
+    self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    if self.backend.durable:
+      self._tasks.append(asyncio.create_task(self._recover()))
+
+  async def stop(self, timeout: float = 10.0) -> None:
+    """
+    Let queued jobs finish for up to `timeout` seconds. Durable jobs still
+    queued after that are left to the next worker.
+    """
+    if not self.running:
+      return
+    try:
+      await asyncio.wait_for(self._queue.join(), timeout)
+    except asyncio.TimeoutError:
+      logger.warning("Task queue stopped with %s jobs pending", self._queue.qsize())
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._queue, self._tasks = None, []
+
+  async def enqueue(self, name: str, **kwargs) -> Job:
+    if name not in self._handlers:
+      raise KeyError(f"Unknown task: {name}")
+
+    job = Job(name=name, kwargs=kwargs)
+    if not self.running:
+      # No workers in this process (scripts, tests): run it now
+      await self._execute(job)
+      return job
+
+    await run_in_threadpool(self.backend.save, job, self.lease)
+    try:
+      await asyncio.wait_for(self._queue.put(job), self.put_timeout)
+    except asyncio.TimeoutError:
+      logger.warning("Task queue full, running %s inline", name)
+      await self._execute(job)
+    return job
+
+  async def join(self) -> None:
+    if self.running:
+      await self._queue.join()
+
+  async def _call(self, job: Job) -> None:
+    handler = self._handlers[job.name]
+    if asyncio.iscoroutinefunction(handler):
+      await handler(**job.kwargs)
+    else:
+      await run_in_threadpool(handler, **job.kwargs)
+
+  async def _execute(self, job: Job) -> None:
+    job.attempts += 1
+    try:
+      await self._call(job)
+    except Exception as e:
+      if job.attempts <= self.max_retries and self.running:
+        delay = self.retry_backoff * 2 ** (job.attempts - 1)
+        logger.info("Task %s failed (%s), retry %s in %ss", job.name, e, job.attempts, delay)
+        await run_in_threadpool(self.backend.save, job, self.lease + delay)
+        asyncio.get_running_loop().call_later(delay, self._requeue, job)
+      else:
+        logger.error("Task %s failed after %s attempts: %s", job.name, job.attempts, e)
+        await run_in_threadpool(self.backend.fail, job, str(e))
+      return
+    await run_in_threadpool(self.backend.complete, job)
+
+  def _requeue(self, job: Job) -> None:
+    if not self.running:
+      return
+    try:
+      self._queue.put_nowait(job)
+    except asyncio.QueueFull:
+      # Still stored, it is claimed again once its lease expires
+      pass
+
+  async def _worker(self) -> None:
+    while True:
+      job = await self._queue.get()
+      try:
+        await self._execute(job)
+      except Exception:
+        logger.exception("Task %s crashed", job.name)
+      finally:
+        self._queue.task_done()
+
+  async def _recover(self) -> None:
+    # Claim jobs whose lease ran out: left by this process before a restart or by a dead worker
+    while True:
+      room = self.max_size - self._queue.qsize()
+      if room > 0:
+        for job in await run_in_threadpool(self.backend.claim, self.lease, room):
+          self._requeue(job)
+      await asyncio.sleep(self.lease / 2)
+
+
+def create_task_queue(settings) -> TaskQueue:
+  backend = SQLiteBackend(settings.TASK_QUEUE_SQLITE_PATH) if settings.TASK_QUEUE_SQLITE_PATH else None
+  return TaskQueue(
+    backend=backend,
+    workers=settings.TASK_QUEUE_WORKERS,
+    max_size=settings.TASK_QUEUE_MAX_SIZE,
+    max_retries=settings.TASK_QUEUE_MAX_RETRIES,
+    retry_backoff=settings.TASK_QUEUE_RETRY_BACKOFF_SECONDS,
+    lease=settings.TASK_QUEUE_LEASE_SECONDS,
+  )
+
+
+task_queue = create_task_queue(settings)
@@ -0,0 +1,108 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import get_engine
+from app.core.invalidation import invalidation_bus
+from app.core.tasks import task_queue
+from app.modules.pokemon.service import PokeAPIService
+
+settings = get_settings()
+
+
+def check_database() -> dict:
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+    pool = get_engine().pool
+    return {"pool": pool.status()}
+
+
+def check_pokeapi() -> dict:
+    # Breaker state only, probes must not send traffic upstream
+    snapshot = PokeAPIService.breaker.snapshot()
+    if snapshot["state"] == PokeAPIService.breaker.OPEN:
+        raise RuntimeError(f"circuit open after {snapshot['failures']} failures")
+    return snapshot
+
+
+def check_caches() -> dict:
+    return {
+        "pokemon_entries": len(PokeAPIService._pokemon_cache),
+        "catalog_loaded": "catalog" in PokeAPIService._catalog_cache,
+    }
+
+
+def check_task_queue() -> dict:
+    if task_queue.queued >= task_queue.max_size:
+        raise RuntimeError("task queue full")
+    return {"running": task_queue.running, "queued": task_queue.queued}
+
+
+def check_invalidation() -> dict:
+    # Caches of a worker that stopped listening fall back to flushing every INVALIDATION_FALLBACK_SECONDS
+    if invalidation_bus.listening and not invalidation_bus.connected:
+        raise RuntimeError("invalidation listener disconnected")
+    return {"listening": invalidation_bus.listening, "connected": invalidation_bus.connected}
+
+
+# name -> (check, critical). A failing critical check makes the worker not ready,
+# the others only degrade it: an upstream outage must not empty the load balancer.
+CHECKS: Dict[str, Tuple[Callable[[], dict], bool]] = {
+    "database": (check_database, True),
+    "pokeapi": (check_pokeapi, False),
+    "caches": (check_caches, False),
+    "task_queue": (check_task_queue, False),
+    "invalidation": (check_invalidation, False),
+}
+
+
+def run_check(check: Callable[[], dict]) -> dict:
+    start = time.perf_counter()
+    try:
+        result = {"status": "ok", **check()}
+    except Exception as e:
+        result = {"status": "error", "error": str(e)}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+class ReadinessProbe:
+    """
+    Runs the dependency checks at most once per `ttl` seconds, concurrent probes
+    in between get the last report.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._report: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = Lock()
+
+    def report(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._checked_at
+            if self._report is None or age >= self.ttl:
+                self._report = self._run()
+                self._checked_at = time.monotonic()
+                age = 0.0
+            return {**self._report, "cached_for_s": round(age, 3)}
+
+    def _run(self) -> dict:
+        checks, status = {}, "ready"
+        for name, (check, critical) in CHECKS.items():
+            checks[name] = run_check(check)
+            if checks[name]["status"] != "ok":
+                if critical:
+                    status = "not_ready"
+                elif status == "ready":
+                    status = "degraded"
+        return {"status": status, "checks": checks}
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._report = None
+
+
+readiness_probe = ReadinessProbe(ttl=settings.HEALTH_CHECK_CACHE_SECONDS)
@@ -1,20 +1,50 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import get_settings
+from .core.compression import CompressionMiddleware
+from .core.database import get_engine
+from .core.invalidation import invalidation_bus
+from .core.tasks import task_queue
 from app.modules.users.controller import router as users_router
 from app.modules.auth.controller import router as auth_router
 from app.modules.pokemon.controller import router as pokemon_router
+from app.modules.pokemon.service import PokeAPIService
+from app.health import readiness_probe
 
 
 settings = get_settings()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await task_queue.start()
+    await invalidation_bus.start(get_engine())
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        from app.warmup import warmup
+        # Runs in the background so the server starts accepting; /health stays 503 until it is done
+        warmup_task = asyncio.create_task(warmup(app))
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await task_queue.stop(timeout=settings.GRACEFUL_TIMEOUT / 2)
+    await invalidation_bus.stop()
+    await PokeAPIService.close_client()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
+app.state.ready = not settings.WARMUP_ENABLED
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +54,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 
 # Routers
 app.include_router(auth_router)
@@ -42,4 +79,29 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    if not app.state.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"}
+        )
+    return {"status": "healthy"}
+
+
+@app.get("/livez")
+def liveness_check():
+    # Process is up and serving, dependencies are /readyz's job
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+def readiness_check():
+    if not app.state.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"}
+        )
+
+    report = readiness_probe.report()
+    if report["status"] == "not_ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=report)
+    return report
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.modules.auth.schema import LoginRequest, Token
+from app.modules.auth.schema import LoginRequest, RefreshRequest, Token
 from app.core.database import get_db
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response, user_etag
 from .service import AuthService
 from .dependencies import get_current_user
 from app.modules.users.models import User
@@ -30,12 +31,22 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
     )
 
   access_token = auth_service.create_access_token_for_user(user)
+  refresh_token = auth_service.create_refresh_token_for_user(user)
   
   return {
     "access_token": access_token,
+    "refresh_token": refresh_token,
     "token_type": "bearer"
   }
 
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+  auth_service = AuthService(db)
+  return auth_service.refresh_tokens(body.refresh_token)
+
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
-  return current_user
\ No newline at end of file
+def get_current_user_info(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+  not_modified = conditional_response(request, response, user_etag(current_user), PRIVATE_REVALIDATE)
+  if not_modified:
+    return not_modified
+  return current_user
@@ -1,4 +1,3 @@
-from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -6,19 +5,18 @@ from uuid import UUID
 
 from app.core.database import get_db
 from app.core.security import verify_token, security
+from app.modules.auth.schema import Principal
 from app.modules.users.repository import UserRepository
 from app.modules.users.models import User
+from .revocation import revocation_index, user_key
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
-  # Get token
-  token = credentials.credentials
-
+def _verify_access_token(token: str, db: Session) -> tuple[UUID, dict]:
   # Verify and decode token
   payload = verify_token(token)
   user_id_str: str = payload.get("sub")
 
-  if user_id_str is None:
+  if user_id_str is None or payload.get("type", "access") != "access":
     raise HTTPException(
       status_code=status.HTTP_401_UNAUTHORIZED,
       detail="Invalid authentication credentials",
@@ -34,6 +32,30 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
       detail="Invalid user ID format",
       headers={"WWW-Authenticate": "Bearer"}
     )
+
+  # Deactivated and deleted users are in the revocation index
+  revocation_index.maybe_sync(db)
+  if revocation_index.is_revoked(user_key(user_id)):
+    raise HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Token has been revoked",
+      headers={"WWW-Authenticate": "Bearer"}
+    )
+
+  return user_id, payload
+
+
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> Principal:
+  """
+  Authenticated caller from the token claims alone, no user lookup.
+  Use it when the route only needs the caller id or role.
+  """
+  user_id, payload = _verify_access_token(credentials.credentials, db)
+  return Principal(id=user_id, is_superuser=payload.get("su", False))
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+  user_id, _ = _verify_access_token(credentials.credentials, db)
   
   # Get user from database
   user_repository = UserRepository(db)
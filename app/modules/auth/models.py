@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class TokenRevocation(Base):
+  __tablename__ = "token_revocations"
+
+  # "sub:<user id>" revokes every token of a user, "jti:<token id>" a single token
+  key = Column(String, primary_key=True)
+  expires_at = Column(DateTime, nullable=False, index=True)
+  created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+  def __repr__(self):
+    return f"<TokenRevocation(key='{self.key}', expires_at='{self.expires_at}')>"
@@ -0,0 +1,44 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List
+from .models import TokenRevocation
+
+
+def _insert(db: Session):
+  dialect = db.get_bind().dialect.name
+  if dialect == "postgresql":
+    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+  elif dialect == "sqlite":
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+  else:
+    raise NotImplementedError(f"Revocations need an upsert for {dialect}")
+  return dialect_insert(TokenRevocation)
+
+
+class RevocationRepository:
+  """ Persistence of revoked tokens. Writes join the caller's transaction. """
+  def __init__(self, db: Session):
+    self.db = db
+
+  def add(self, key: str, expires_at: datetime) -> None:
+    statement = _insert(self.db).values(key=key, expires_at=expires_at)
+    self.db.execute(statement.on_conflict_do_update(
+      index_elements=[TokenRevocation.key],
+      set_={"expires_at": statement.excluded.expires_at}
+    ))
+
+  def add_once(self, key: str, expires_at: datetime) -> bool:
+    """ False when the key was already there: concurrent callers cannot both add it """
+    result = self.db.execute(
+      _insert(self.db).values(key=key, expires_at=expires_at).on_conflict_do_nothing().returning(TokenRevocation.key)
+    )
+    return result.first() is not None
+
+  def remove(self, key: str) -> None:
+    self.db.query(TokenRevocation).filter(TokenRevocation.key == key).delete()
+
+  def get_active_keys(self, now: datetime, prefix: str = "") -> List[str]:
+    query = self.db.query(TokenRevocation.key).filter(TokenRevocation.expires_at > now)
+    if prefix:
+      query = query.filter(TokenRevocation.key.startswith(prefix, autoescape=True))
+    return [row.key for row in query.all()]
@@ -0,0 +1,157 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.invalidation import invalidation_bus
+from .repository import RevocationRepository
+
+settings = get_settings()
+
+
+USER_PREFIX = "sub:"
+
+
+def user_key(user_id) -> str:
+  return f"{USER_PREFIX}{user_id}"
+
+
+def token_key(jti: str) -> str:
+  return f"jti:{jti}"
+
+
+class BloomFilter:
+  """
+  Bloom filter sized for `capacity` keys. Answers "definitely not present"
+  without touching the exact set, about 0.2% false positives up to capacity.
+  """
+  BITS_PER_KEY = 16
+
+  def __init__(self, capacity: int = 4096, hashes: int = 4):
+    # Power of two, at least 64 Kib
+    self.size_bits = max(1 << 16, 1 << (capacity * self.BITS_PER_KEY - 1).bit_length())
+    self.capacity = self.size_bits // self.BITS_PER_KEY
+    self.hashes = hashes
+    self._bits = bytearray(self.size_bits // 8)
+
+  def _positions(self, key: str) -> Iterable[int]:
+    digest = hashlib.blake2b(key.encode(), digest_size=4 * self.hashes).digest()
+    for i in range(self.hashes):
+      yield int.from_bytes(digest[i * 4:(i + 1) * 4], "little") % self.size_bits
+
+  def add(self, key: str) -> None:
+    for position in self._positions(key):
+      self._bits[position >> 3] |= 1 << (position & 7)
+
+  def __contains__(self, key: str) -> bool:
+    return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationIndex:
+  """
+  In-memory view of the revoked users (sub: keys) of the token_revocations table.
+  Revoked refresh tokens stay in the table only, /auth/refresh checks them by key.
+  A bloom filter answers the common case (not revoked) and an exact set confirms hits.
+  The index is reloaded from the database every `sync_interval` seconds so
+  revocations written by other workers are picked up.
+  """
+  def __init__(self, sync_interval: float):
+    self.sync_interval = sync_interval
+    self._keys: Set[str] = set()
+    self._bloom = BloomFilter()
+    self._last_sync: Optional[float] = None
+    self._lock = Lock()
+
+  def is_revoked(self, *keys: str) -> bool:
+    return any(key in self._bloom and key in self._keys for key in keys)
+
+  def add(self, key: str) -> None:
+    with self._lock:
+      self._keys.add(key)
+      if len(self._keys) > self._bloom.capacity:
+        # Grown past its size, false positives would climb: rebuilt twice as large
+        self._bloom = self._build_bloom(self._keys)
+      else:
+        self._bloom.add(key)
+
+  @staticmethod
+  def _build_bloom(keys: Set[str]) -> BloomFilter:
+    bloom = BloomFilter(capacity=2 * len(keys))
+    for key in keys:
+      bloom.add(key)
+    return bloom
+
+  def discard(self, key: str) -> None:
+    # Bloom filters cannot delete, a stale bit only costs a lookup in the exact set
+    with self._lock:
+      self._keys.discard(key)
+
+  def load(self, keys: Iterable[str]) -> None:
+    keys = set(keys)
+    bloom = self._build_bloom(keys)
+    with self._lock:
+      self._keys, self._bloom = keys, bloom
+      self._last_sync = time.monotonic()
+
+  def sync(self, db: Session) -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    self.load(RevocationRepository(db).get_active_keys(now, prefix=USER_PREFIX))
+
+  def invalidate(self) -> None:
+    # Reloaded by the next request
+    self._last_sync = None
+
+  def maybe_sync(self, db: Session) -> None:
+    if self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval:
+      self.sync(db)
+
+
+revocation_index = RevocationIndex(settings.REVOCATION_SYNC_SECONDS)
+
+
+def _apply(update):
+  def handler(keys: Optional[Set[str]]) -> None:
+    if keys is None:
+      # Too many keys or missed events: reloaded by the next request
+      revocation_index.invalidate()
+      return
+    for key in keys:
+      update(key)
+  return handler
+
+
+# Applied once the transaction commits, in this worker and the others
+invalidation_bus.subscribe("revoked", _apply(revocation_index.add))
+invalidation_bus.subscribe("restored", _apply(revocation_index.discard))
+
+
+class RevocationService:
+  """
+  Writes revocations to the database in the caller's transaction. The index
+  of every worker follows user revocations after the commit, a rollback
+  leaves it untouched.
+  """
+  def __init__(self, db: Session):
+    self.db = db
+    self.repository = RevocationRepository(db)
+
+  def revoke_user(self, user_id: UUID) -> None:
+    # Every token issued before now is expired once the longest lived one is
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    self.repository.add(user_key(user_id), expires_at.replace(tzinfo=None))
+    invalidation_bus.publish(self.db, "revoked", user_key(user_id))
+
+  def restore_user(self, user_id: UUID) -> None:
+    self.repository.remove(user_key(user_id))
+    invalidation_bus.publish(self.db, "restored", user_key(user_id))
+
+  def revoke_token(self, jti: str, expires_at: datetime) -> bool:
+    """
+    Single use: False when the token was already revoked, by an earlier or a concurrent call.
+    """
+    return self.repository.add_once(token_key(jti), expires_at.replace(tzinfo=None))
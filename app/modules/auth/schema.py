@@ -11,6 +11,16 @@ class LoginRequest(BaseModel):
 class Token(BaseModel):
   access_token: str
   token_type: str
+  refresh_token: Optional[str] = None
+
+# Schema to Refresh
+class RefreshRequest(BaseModel):
+  refresh_token: str
+
+# Authenticated caller, built from the access token claims without a database lookup
+class Principal(BaseModel):
+  id: UUID
+  is_superuser: bool = False
 
 class TokenData(BaseModel):
   user_id: Optional[UUID] = None
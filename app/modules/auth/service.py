@@ -1,11 +1,13 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import Optional
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
 from app.modules.users.repository import UserRepository
 from app.modules.users.models import User
-from app.core.security import verify_password, create_access_token, get_settings
+from app.core.security import verify_and_update_password, create_access_token, create_refresh_token, verify_token, get_settings
+from .revocation import RevocationService, revocation_index, user_key
 
 settings = get_settings()
 
@@ -17,6 +19,7 @@ class AuthService:
   def __init__(self, db: Session):
     self.db = db
     self.user_repository = UserRepository(db)
+    self.revocation_service = RevocationService(db)
 
   def authenticate_user(self, email: str, password: str) -> Optional[User]:
     """
@@ -34,9 +37,15 @@ class AuthService:
         detail="User account is inactive"
       )
 
-    if not verify_password(password, user.hashed_password):
+    verified, updated_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
       return None
 
+    # Hash made with outdated parameters, upgrade it while we have the password
+    if updated_hash:
+      user.hashed_password = updated_hash
+      self.user_repository.update(user)
+
     return user
 
   def create_access_token_for_user(self, user: User) -> str:
@@ -44,7 +53,50 @@ class AuthService:
     Generate JWT access token for authenticated user.
     """
     access_token = create_access_token(
-      data={"sub": str(user.id)},
+      data={"sub": str(user.id), "su": bool(user.is_superuser)},
       expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    return access_token
\ No newline at end of file
+    return access_token
+
+  def create_refresh_token_for_user(self, user: User) -> str:
+    """
+    Generate a refresh token, exchanged for new tokens without re-entering the password.
+    """
+    return create_refresh_token(data={"sub": str(user.id)})
+
+  def refresh_tokens(self, refresh_token: str) -> dict:
+    """
+    Rotate a refresh token: the presented token is revoked and a new pair is issued.
+    """
+    invalid = HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="Invalid refresh token",
+      headers={"WWW-Authenticate": "Bearer"}
+    )
+
+    payload = verify_token(refresh_token)
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("sub"):
+      raise invalid
+
+    revocation_index.maybe_sync(self.db)
+    if revocation_index.is_revoked(user_key(payload["sub"])):
+      raise invalid
+
+    try:
+      user = self.user_repository.get_by_id(UUID(payload["sub"]))
+    except ValueError:
+      raise invalid
+
+    if not user or not user.is_active:
+      raise invalid
+
+    # Revoking is the check: only one request can rotate a given token
+    if not self.revocation_service.revoke_token(payload["jti"], datetime.fromtimestamp(payload["exp"], tz=timezone.utc)):
+      raise invalid
+    self.db.commit()
+
+    return {
+      "access_token": self.create_access_token_for_user(user),
+      "refresh_token": self.create_refresh_token_for_user(user),
+      "token_type": "bearer"
+    }
\ No newline at end of file
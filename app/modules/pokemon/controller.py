@@ -1,5 +1,16 @@
-from fastapi import APIRouter, Depends
-from app.modules.pokemon.shemas import Pokemon
+import json
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from app.core.compression import precompressed
+from app.core.http_cache import PUBLIC_LONG, PUBLIC_STATIC, conditional_response, content_etag, is_not_modified
+from app.core.database import get_db
+from app.modules.auth.dependencies import get_current_principal
+from app.modules.auth.schema import Principal
+from app.modules.pokemon.shemas import EvolutionChain, LeaderboardEntry, Pokemon, PokemonDetails, PokemonOwners, PokemonSearch
 from .service import PokeAPIService
 
 
@@ -13,11 +24,125 @@ def get_pokemon_service() -> PokeAPIService:
     return PokeAPIService()
 
 
+@router.get("/", response_model=List[Pokemon])
+async def get_pokemon_catalog(request: Request, service: PokeAPIService = Depends(get_pokemon_service)):
+    catalog = await service.get_catalog()
+
+    # Served precompressed: the catalog is large and identical for every client
+    payload = precompressed.payload(
+        "pokemon_catalog",
+        catalog,
+        lambda source: json.dumps(source, separators=(",", ":")).encode()
+    )
+    return precompressed.response(request, payload, PUBLIC_LONG)
+
+
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def get_pokemon_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    from app.modules.users.service import UserService
+
+    return await UserService(db).get_pokemon_leaderboard(limit)
+
+
+@router.get("/search", response_model=PokemonSearch)
+async def search_pokemon(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    service: PokeAPIService = Depends(get_pokemon_service)
+):
+    return await service.search(q, limit)
+
+
 @router.get("/{pokemon_id}", response_model=Pokemon)
-async def get_pokemon(pokemon_id: int, service: PokeAPIService = Depends(get_pokemon_service)) -> Pokemon:
-    return await service.get_pokemon(pokemon_id)
+async def get_pokemon(pokemon_id: int, request: Request, response: Response, service: PokeAPIService = Depends(get_pokemon_service)) -> Pokemon:
+    pokemon = await service.get_pokemon(pokemon_id)
+
+    not_modified = conditional_response(request, response, content_etag(pokemon), PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+    return pokemon
+
+
+@router.get("/{pokemon_id}/details", response_model=PokemonDetails, response_model_exclude_unset=True)
+async def get_pokemon_details(
+    pokemon_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma separated, e.g. types,stats,abilities,sprites"),
+    service: PokeAPIService = Depends(get_pokemon_service)
+):
+    projection = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    details = await service.get_pokemon_details(pokemon_id, projection)
 
+    not_modified = conditional_response(request, response, content_etag(details), PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+    return details
 
-@router.get("/name/{name}", response_model=Pokemon)
+
+@router.get("/{pokemon_id}/evolution", response_model=EvolutionChain)
+async def get_pokemon_evolution(
+    pokemon_id: int,
+    request: Request,
+    response: Response,
+    service: PokeAPIService = Depends(get_pokemon_service)
+):
+    chain = await service.get_evolution_chain(pokemon_id)
+
+    not_modified = conditional_response(request, response, content_etag(chain), PUBLIC_LONG)
+    if not_modified:
+        return not_modified
+    return chain
+
+
+@router.get("/{pokemon_id}/sprite", response_class=FileResponse)
+async def get_pokemon_sprite(
+    pokemon_id: int,
+    request: Request,
+    variant: str = Query("front_default", description="Sprite variant, e.g. front_default, front_shiny"),
+    service: PokeAPIService = Depends(get_pokemon_service)
+):
+    sprite = await service.get_sprite(pokemon_id, variant)
+
+    headers = {"ETag": f'"{sprite.digest}"', "Cache-Control": PUBLIC_STATIC}
+    if is_not_modified(request, headers["ETag"]):
+        service.release_sprite(sprite)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Sent with sendfile by servers supporting the pathsend extension, streamed from disk otherwise
+    return FileResponse(
+        sprite.path,
+        media_type=sprite.media_type,
+        headers=headers,
+        background=BackgroundTask(service.release_sprite, sprite)
+    )
+
+
+@router.get("/{pokemon_id}/owners", response_model=PokemonOwners)
+def get_pokemon_owners(
+    pokemon_id: int,
+    after: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Imported here: the users module already depends on this one
+    from app.modules.users.service import UserService
+
+    return UserService(db).get_pokemon_owners(pokemon_id, after=after, limit=limit)
+
+
+@router.get(
+    "/name/{name}",
+    response_model=Pokemon,
+    description=(
+        "Resolves the name against the catalog of ids 1-1025. Names close to a catalog entry "
+        "answer 404 with suggestions; other names are looked up once on PokeAPI. Alternate "
+        "forms outside 1-1025 (e.g. charizard-mega-x) answer 404."
+    )
+)
 async def get_pokemon_by_name(name: str, service: PokeAPIService = Depends(get_pokemon_service)) -> Pokemon:
     return await service.get_pokemon_by_name(name)
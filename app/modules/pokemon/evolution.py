@@ -0,0 +1,50 @@
+"""
+Species and evolution-chain documents, normalized.
+
+PokeAPI links a Pokémon to its chain through its species:
+pokemon-species/{id} -> evolution_chain.url -> evolution-chain/{chain_id}.
+Default forms share their id with their species, so the species is fetched
+directly. The chain document names every member with its species URL, so
+the whole tree (and the id of each member) is known from one chain fetch.
+"""
+from typing import Dict, Iterator
+
+
+def resource_id(url: str) -> int:
+    # Resource urls end with the id: .../evolution-chain/10/
+    return int(url.rstrip("/").rsplit("/", 1)[-1])
+
+
+def parse_species(result: Dict) -> Dict:
+    evolves_from = result.get("evolves_from_species")
+    chain = result.get("evolution_chain")
+    return {
+        "id": result["id"],
+        "name": result["name"],
+        "chain_id": resource_id(chain["url"]) if chain else None,
+        "evolves_from": resource_id(evolves_from["url"]) if evolves_from else None,
+    }
+
+
+def _parse_node(link: Dict) -> Dict:
+    details = (link.get("evolution_details") or [{}])[0]
+    trigger, item = details.get("trigger"), details.get("item")
+    return {
+        "id": resource_id(link["species"]["url"]),
+        "name": link["species"]["name"],
+        "trigger": trigger["name"] if trigger else None,
+        "min_level": details.get("min_level"),
+        "item": item["name"] if item else None,
+        "evolves_to": [_parse_node(child) for child in link.get("evolves_to") or ()],
+    }
+
+
+def parse_chain(result: Dict) -> Dict:
+    return {"id": result["id"], "chain": _parse_node(result["chain"])}
+
+
+def members(node: Dict) -> Iterator[int]:
+    yield node["id"]
+    for child in node["evolves_to"]:
+        yield from members(child)
+
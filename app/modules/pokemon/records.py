@@ -0,0 +1,83 @@
+"""
+Normalized Pokémon records.
+
+A PokeAPI document carries every move, game index and sprite variant. Only
+what the API serves is kept: types, base stats, abilities and the top-level
+sprite URLs, in a slotted object with tuples and interned names (type, stat
+and ability names repeat across every Pokémon). A record is about 2 KB in
+memory, the parsed upstream document is hundreds of KB.
+"""
+from sys import intern
+from typing import Dict, Iterable, Optional, Tuple
+
+# Projectable fields, id and name are always returned
+FIELDS = ("height", "weight", "base_experience", "types", "stats", "abilities", "sprites")
+
+
+class PokemonRecord:
+    __slots__ = ("id", "name", "height", "weight", "base_experience", "types", "stats", "abilities", "sprites")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        height: Optional[int] = None,
+        weight: Optional[int] = None,
+        base_experience: Optional[int] = None,
+        types: Tuple[str, ...] = (),
+        stats: Tuple[Tuple[str, int], ...] = (),
+        abilities: Tuple[Tuple[str, bool], ...] = (),
+        sprites: Tuple[Tuple[str, str], ...] = (),
+    ):
+        self.id = id
+        self.name = name
+        self.height = height
+        self.weight = weight
+        self.base_experience = base_experience
+        self.types = types
+        self.stats = stats
+        self.abilities = abilities
+        self.sprites = sprites
+
+    @classmethod
+    def from_payload(cls, result: Dict) -> "PokemonRecord":
+        def by_slot(items: Iterable[Dict]) -> list:
+            return sorted(items or (), key=lambda item: item.get("slot", 0))
+
+        return cls(
+            id=result["id"],
+            name=intern(result["name"]),
+            height=result.get("height"),
+            weight=result.get("weight"),
+            base_experience=result.get("base_experience"),
+            types=tuple(intern(item["type"]["name"]) for item in by_slot(result.get("types"))),
+            stats=tuple((intern(item["stat"]["name"]), item["base_stat"]) for item in result.get("stats") or ()),
+            abilities=tuple(
+                (intern(item["ability"]["name"]), bool(item.get("is_hidden"))) for item in by_slot(result.get("abilities"))
+            ),
+            # Top-level URLs only, the nested "other" and "versions" variants are most of the payload
+            sprites=tuple(
+                (intern(key), url) for key, url in (result.get("sprites") or {}).items() if isinstance(url, str)
+            ),
+        )
+
+    def summary(self) -> Dict:
+        return {"id": self.id, "name": self.name}
+
+    def to_dict(self, fields: Iterable[str] = FIELDS) -> Dict:
+        """
+        Public representation restricted to `fields`.
+        """
+        document = self.summary()
+        for field in fields:
+            if field == "stats":
+                document["stats"] = dict(self.stats)
+            elif field == "abilities":
+                document["abilities"] = [{"name": name, "is_hidden": hidden} for name, hidden in self.abilities]
+            elif field == "sprites":
+                document["sprites"] = dict(self.sprites)
+            elif field == "types":
+                document["types"] = list(self.types)
+            else:
+                document[field] = getattr(self, field)
+        return document
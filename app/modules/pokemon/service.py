@@ -1,81 +1,376 @@
-import httpx
-from typing import Optional, Dict
+import asyncio
+from typing import Optional, Dict, List
 from fastapi import HTTPException, status
-from app.core.config import Settings
-from app.modules.pokemon.shemas import Pokemon
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import get_settings
+from app.core.file_cache import CachedFile, DiskCache
+from app.modules.pokemon.evolution import members, parse_chain, parse_species
+from app.modules.pokemon.records import FIELDS, PokemonRecord
+from app.modules.pokemon.search import NameIndex, normalize
+from app.modules.pokemon.shemas import Pokemon, PokemonSearch
 
-settings = Settings()
+settings = get_settings()
 
 
 class PokeAPIService:
 
     BASE_URL = settings.API_POKEMON
     TIMEOUT = 10.0
+    MAX_POKEMON_ID = 1025
 
-    def __init__(self):
-        self.limits = httpx.Limits(
-            max_keepalive_connections=5,
-            max_connections=10
-        )
+    # Shared by every instance, the catalog rarely changes upstream
+    _catalog_cache = TTLCache(maxsize=3, ttl=settings.POKEMON_CATALOG_TTL_SECONDS)
+    # id -> PokemonRecord, the upstream document is parsed once and never kept
+    _pokemon_cache = TTLCache(maxsize=settings.POKEMON_CACHE_SIZE, ttl=settings.POKEMON_CACHE_TTL_SECONDS)
 
-    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
-        async with httpx.AsyncClient(
-            timeout=self.TIMEOUT,
-            limits=self.limits
-        ) as client:
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/{endpoint}",
-                    params=params or {}
+    # Sprite images on local disk, fetched once from their upstream host
+    _sprite_cache = DiskCache(settings.SPRITE_CACHE_DIR, settings.SPRITE_CACHE_MAX_BYTES)
+
+    # Species and chains are resolved once: every member of a chain maps to it in the index
+    _species_cache = TTLCache(maxsize=MAX_POKEMON_ID, ttl=settings.POKEMON_CATALOG_TTL_SECONDS)
+    _chain_cache = TTLCache(maxsize=MAX_POKEMON_ID, ttl=settings.POKEMON_CATALOG_TTL_SECONDS)
+    _chain_index = TTLCache(maxsize=MAX_POKEMON_ID, ttl=settings.POKEMON_CATALOG_TTL_SECONDS)
+
+    # key -> future of the download in progress, concurrent misses wait for it
+    _inflight: Dict[str, asyncio.Future] = {}
+
+    # Fail fast while PokeAPI is down instead of holding requests for TIMEOUT seconds
+    breaker = CircuitBreaker(
+        failure_threshold=settings.POKEAPI_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.POKEAPI_BREAKER_RESET_SECONDS
+    )
+
+    # One connection pool per process, reused by every request (keep-alive, no TLS handshake per call)
+    _client = None
+    _client_loop = None
+
+    @classmethod
+    def get_client(cls):
+        # httpx is only needed once a request goes upstream, keep it off the import path
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._client_loop is not loop:
+            cls._client = httpx.AsyncClient(
+                timeout=cls.TIMEOUT,
+                limits=httpx.Limits(
+                    max_keepalive_connections=settings.POKEAPI_MAX_KEEPALIVE,
+                    max_connections=settings.POKEAPI_MAX_CONNECTIONS
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Resource not found: {endpoint}"
-                    )
+            )
+            cls._client_loop = loop
+        return cls._client
 
+    @classmethod
+    async def close_client(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        import httpx
+
+        if not self.breaker.allow():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="PokeAPI is unavailable, try again later"
+            )
+
+        client = self.get_client()
+        try:
+            response = await client.get(
+                f"{self.BASE_URL}/{endpoint}",
+                params=params or {}
+            )
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Resource not found: {endpoint}"
                 )
 
-            except httpx.TimeoutException:
-                raise HTTPException(
-                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                    detail=f"PokeAPI request timed out"
-                )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Resource not found: {endpoint}"
+            )
 
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail=f"Could not connect to PokeAPI: {str(e)}"
-                )
+        except httpx.TimeoutException:
+            self.breaker.record_failure()
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"PokeAPI request timed out"
+            )
 
-    async def get_pokemon(self, pokemon_id: int) -> Pokemon:
-        if pokemon_id < 1 or pokemon_id > 1025:
+        except httpx.RequestError as e:
+            self.breaker.record_failure()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Could not connect to PokeAPI: {str(e)}"
+            )
+
+    def _check_id(self, pokemon_id: int) -> None:
+        if pokemon_id < 1 or pokemon_id > self.MAX_POKEMON_ID:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Pokemon ID must be between 1 and 1025"
             )
 
+    async def get_record(self, pokemon_id: int) -> PokemonRecord:
+        self._check_id(pokemon_id)
+        record = self._pokemon_cache.get(pokemon_id)
+        if record is not None:
+            return record
+
         result = await self._make_request(f"pokemon/{pokemon_id}")
+        return self._cache_record(result)
 
-        pokemon = {
-            "id": result["id"],
-            "name": result['name']
-        }
+    def _cache_record(self, result: Dict) -> PokemonRecord:
+        record = PokemonRecord.from_payload(result)
+        self._pokemon_cache.set(record.id, record)
+        return record
 
-        return pokemon
+    async def get_pokemon(self, pokemon_id: int) -> Pokemon:
+        record = await self.get_record(pokemon_id)
+        return record.summary()
 
-    async def get_pokemon_by_name(self, name: str) -> Pokemon:
-        result = await self._make_request(f"pokemon/{name.lower()}")
+    async def get_pokemon_details(self, pokemon_id: int, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Normalized Pokémon restricted to `fields` (all of them by default).
+        """
+        unknown = set(fields or ()) - set(FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(FIELDS)}"
+            )
+        record = await self.get_record(pokemon_id)
+        return record.to_dict(fields or FIELDS)
+
+    async def get_sprite(self, pokemon_id: int, variant: str = "front_default") -> CachedFile:
+        """
+        Sprite image from the disk cache. On a miss it is downloaded once,
+        concurrent requests for the same sprite wait for that download.
+        The file is pinned, pass it to `release_sprite` once it is sent.
+        """
+        key = f"{pokemon_id}/{variant}"
+        cached = await run_in_threadpool(self._sprite_cache.pin, key)
+        if cached is not None:
+            return cached
 
-        pokemon = {
-            "id": result["id"],
-            "name": result['name']
+        await self._single_flight(f"sprite:{key}", lambda: self._fetch_sprite(pokemon_id, variant, key))
+        cached = await run_in_threadpool(self._sprite_cache.pin, key)
+        if cached is None:
+            # Evicted by another worker right after the download
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sprite cache is full, retry later"
+            )
+        return cached
+
+    def release_sprite(self, sprite: CachedFile) -> None:
+        self._sprite_cache.release(sprite)
+
+    async def _single_flight(self, key: str, fetch):
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so an exception nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch_sprite(self, pokemon_id: int, variant: str, key: str) -> CachedFile:
+        import httpx
+
+        record = await self.get_record(pokemon_id)
+        url = dict(record.sprites).get(variant)
+        if url is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No {variant} sprite for Pokemon {pokemon_id}"
+            )
+
+        # Sprites are not served by PokeAPI itself, their failures do not count against the breaker
+        try:
+            response = await self.get_client().get(url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Could not fetch sprite: {str(e)}"
+            )
+
+        media_type = response.headers.get("content-type", "image/png").split(";")[0]
+        return await run_in_threadpool(self._sprite_cache.put, key, response.content, media_type)
+
+    async def get_species(self, pokemon_id: int) -> Dict:
+        self._check_id(pokemon_id)
+        species = self._species_cache.get(pokemon_id)
+        if species is None:
+            # Default forms share their id with their species, no pokemon/{id} hop
+            species = parse_species(await self._make_request(f"pokemon-species/{pokemon_id}"))
+            self._species_cache.set(pokemon_id, species)
+        return species
+
+    async def get_evolution_chain(self, pokemon_id: int) -> Dict:
+        """
+        Evolution tree containing `pokemon_id`. A cold chain costs the species
+        and the chain document; afterwards every member is served from memory.
+        """
+        self._check_id(pokemon_id)
+        chain_id = self._chain_index.get(pokemon_id)
+        if chain_id is None:
+            species = await self.get_species(pokemon_id)
+            chain_id = species["chain_id"]
+            if chain_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No evolution chain for Pokemon {pokemon_id}"
+                )
+
+        chain = self._chain_cache.get(chain_id)
+        if chain is None:
+            chain = await self._single_flight(f"chain:{chain_id}", lambda: self._fetch_chain(chain_id))
+        return chain
+
+    async def _fetch_chain(self, chain_id: int) -> Dict:
+        chain = parse_chain(await self._make_request(f"evolution-chain/{chain_id}"))
+        self._chain_cache.set(chain_id, chain)
+        for member_id in members(chain["chain"]):
+            self._chain_index.set(member_id, chain_id)
+        return chain
+
+    async def get_pokemon_types(self, pokemon_ids: List[int]) -> Dict[int, tuple]:
+        """
+        Type names per Pokémon. Cached ids are answered from memory, the others
+        are fetched concurrently (at most POKEAPI_MAX_CONNECTIONS at a time).
+        Ids PokeAPI cannot answer are left out.
+        """
+        semaphore = asyncio.Semaphore(settings.POKEAPI_MAX_CONNECTIONS)
+
+        async def fetch(pokemon_id: int) -> PokemonRecord:
+            record = self._pokemon_cache.get(pokemon_id)
+            if record is not None:
+                return record
+            async with semaphore:
+                return await self.get_record(pokemon_id)
+
+        records = await asyncio.gather(*(fetch(pokemon_id) for pokemon_id in pokemon_ids), return_exceptions=True)
+        return {
+            pokemon_id: record.types
+            for pokemon_id, record in zip(pokemon_ids, records) if not isinstance(record, Exception)
         }
 
+    async def get_pokemon_by_name(self, name: str) -> Pokemon:
+        """
+        Resolved against the local catalog first. A typo close to a catalog name
+        answers 404 with suggestions; any other name gets a single PokeAPI lookup.
+        Only ids 1..MAX_POKEMON_ID are served, so alternate forms such as
+        `charizard-mega-x` (id 10034) answer 404 as well.
+        """
+        if name.strip().isdigit():
+            return await self.get_pokemon(int(name))
+
+        try:
+            index = await self.get_name_index()
+        except HTTPException as e:
+            if e.status_code == status.HTTP_404_NOT_FOUND:
+                raise
+            # Catalog unavailable: look the name up directly
+            index = None
+
+        if index is None:
+            return await self._lookup_name(name)
+
+        pokemon = index.resolve(name)
+        if pokemon is None:
+            suggestions = [match["name"] for match in self._fuzzy(index, name, limit=3)]
+            if not suggestions:
+                return await self._lookup_name(name)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pokemon not found: {name}. Did you mean: {', '.join(suggestions)}?"
+            )
         return pokemon
+
+    async def _lookup_name(self, name: str) -> Pokemon:
+        result = await self._make_request(f"pokemon/{normalize(name)}")
+        if not 1 <= result["id"] <= self.MAX_POKEMON_ID:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pokemon {name} (id {result['id']}) is an alternate form; "
+                       f"only ids 1-{self.MAX_POKEMON_ID} are served"
+            )
+        return self._cache_record(result).summary()
+
+    async def search(self, query: str, limit: int = 10) -> PokemonSearch:
+        """
+        Names starting with `query`, and the closest spellings when none does.
+        """
+        index = await self.get_name_index()
+        matches = index.prefix(query, limit)
+        suggestions = [] if matches else self._fuzzy(index, query, limit)
+        return {"query": query, "matches": matches, "suggestions": suggestions}
+
+    def _fuzzy(self, index: NameIndex, query: str, limit: int) -> List[Pokemon]:
+        # Short queries tolerate fewer edits: two turn "mew" into "muk"
+        max_distance = min(settings.POKEMON_SEARCH_MAX_DISTANCE, max(1, len(normalize(query)) // 3))
+        return index.fuzzy(query, max_distance=max_distance, limit=limit)
+
+    async def get_name_index(self) -> NameIndex:
+        index = self._catalog_cache.get("names")
+        if index is None:
+            index = NameIndex(await self.get_catalog())
+            self._catalog_cache.set("names", index)
+        return index
+
+    async def get_catalog(self) -> List[Pokemon]:
+        """
+        Full list of Pokémon (id and name), fetched once and cached in memory.
+        """
+        catalog = self._catalog_cache.get("catalog")
+        if catalog is not None:
+            return catalog
+
+        result = await self._make_request("pokemon", params={"limit": self.MAX_POKEMON_ID, "offset": 0})
+
+        catalog = [
+            {
+                # The id is only exposed through the resource url: .../pokemon/{id}/
+                "id": int(item["url"].rstrip("/").rsplit("/", 1)[-1]),
+                "name": item["name"]
+            }
+            for item in result["results"]
+        ]
+        self._catalog_cache.set("catalog", catalog)
+        self._catalog_cache.set("index", {pokemon["id"]: pokemon for pokemon in catalog})
+        self._catalog_cache.set("names", NameIndex(catalog))
+        return catalog
+
+    def get_cached_pokemon(self, pokemon_id: int) -> Optional[Pokemon]:
+        """
+        Pokémon from memory only (lookup cache, then the catalog), None when it would need PokeAPI.
+        """
+        record = self._pokemon_cache.get(pokemon_id)
+        if record is not None:
+            return record.summary()
+        pokemon = self._catalog_cache.get("index", {}).get(pokemon_id)
+        return dict(pokemon) if pokemon is not None else None
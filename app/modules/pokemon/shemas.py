@@ -1,7 +1,62 @@
 from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from uuid import UUID
 
 
 
 class Pokemon(BaseModel):
   id: int = Field(..., ge=1, le=1025, description="Pokemon ID from PokeAPI")
   name: str = Field(..., min_length=1, description="Pokemon name")
+
+
+class PokemonAbility(BaseModel):
+  name: str
+  is_hidden: bool
+
+
+class PokemonDetails(Pokemon):
+  height: Optional[int] = None
+  weight: Optional[int] = None
+  base_experience: Optional[int] = None
+  types: Optional[List[str]] = None
+  stats: Optional[Dict[str, int]] = Field(None, description="Base stat by stat name")
+  abilities: Optional[List[PokemonAbility]] = None
+  sprites: Optional[Dict[str, str]] = Field(None, description="Sprite URL by variant, e.g. front_default")
+
+
+class EvolutionNode(BaseModel):
+  id: int
+  name: str
+  trigger: Optional[str] = Field(None, description="How it evolves from its parent, e.g. level-up, use-item")
+  min_level: Optional[int] = None
+  item: Optional[str] = None
+  evolves_to: List["EvolutionNode"] = []
+
+
+class EvolutionChain(BaseModel):
+  id: int
+  chain: EvolutionNode
+
+
+class PokemonSearch(BaseModel):
+  query: str
+  matches: List[Pokemon] = Field(..., description="Names starting with the query, alphabetical")
+  suggestions: List[Pokemon] = Field(..., description="Closest spellings, only when nothing matches")
+
+
+class PokemonOwner(BaseModel):
+  id: UUID
+  username: str
+
+
+class PokemonOwners(BaseModel):
+  pokemon_id: int
+  total: int
+  owners: List[PokemonOwner]
+  next: Optional[UUID] = Field(None, description="Pass as `after` to get the next page")
+
+
+class LeaderboardEntry(BaseModel):
+  id: int
+  name: Optional[str] = None
+  owners: int
@@ -0,0 +1,10 @@
+from app.core.tasks import task_queue
+from .service import PokeAPIService
+
+
+@task_queue.task("pokemon.enrich")
+async def enrich_pokemon(pokemon_id: int) -> None:
+    """
+    Load a Pokémon resolved from the catalog into the lookup cache.
+    """
+    await PokeAPIService().get_pokemon(pokemon_id)
@@ -0,0 +1,110 @@
+"""
+Type effectiveness and collection coverage.
+
+The 18x18 chart is a NumPy matrix (attacking type x defending type) built once
+per process. A collection is an (n, 18) multi-hot matrix of its members'
+types, so every score is a matrix product over the whole collection:
+
+- defence: damage multipliers multiply across a dual type, so they are
+  summed as log2 values (immunity is a large negative) and raised back;
+- offence: members whose own types hit a defending type super effectively.
+"""
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+TYPE_NAMES = (
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+    "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy",
+)
+TYPE_INDEX = {name: i for i, name in enumerate(TYPE_NAMES)}
+
+# attacking type -> (super effective against, not very effective against, no effect on)
+_CHART = {
+    "normal": ((), ("rock", "steel"), ("ghost",)),
+    "fighting": (("normal", "ice", "rock", "dark", "steel"), ("poison", "flying", "psychic", "bug", "fairy"), ("ghost",)),
+    "flying": (("grass", "fighting", "bug"), ("electric", "rock", "steel"), ()),
+    "poison": (("grass", "fairy"), ("poison", "ground", "rock", "ghost"), ("steel",)),
+    "ground": (("fire", "electric", "poison", "rock", "steel"), ("grass", "bug"), ("flying",)),
+    "rock": (("fire", "ice", "flying", "bug"), ("fighting", "ground", "steel"), ()),
+    "bug": (("grass", "psychic", "dark"), ("fire", "fighting", "poison", "flying", "ghost", "steel", "fairy"), ()),
+    "ghost": (("psychic", "ghost"), ("dark",), ("normal",)),
+    "steel": (("ice", "rock", "fairy"), ("fire", "water", "electric", "steel"), ()),
+    "fire": (("grass", "ice", "bug", "steel"), ("fire", "water", "rock", "dragon"), ()),
+    "water": (("fire", "ground", "rock"), ("water", "grass", "dragon"), ()),
+    "grass": (("water", "ground", "rock"), ("fire", "grass", "poison", "flying", "bug", "dragon", "steel"), ()),
+    "electric": (("water", "flying"), ("electric", "grass", "dragon"), ("ground",)),
+    "psychic": (("fighting", "poison"), ("psychic", "steel"), ("dark",)),
+    "ice": (("grass", "ground", "flying", "dragon"), ("fire", "water", "ice", "steel"), ()),
+    "dragon": (("dragon",), ("steel",), ("fairy",)),
+    "dark": (("psychic", "ghost"), ("fighting", "dark", "fairy"), ()),
+    "fairy": (("fighting", "dragon", "dark"), ("fire", "poison", "steel"), ()),
+}
+
+# log2 of "no effect": any member with an immunity sums below IMMUNE / 2
+IMMUNE = -16.0
+
+
+def _effectiveness() -> np.ndarray:
+    chart = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)), dtype=np.float32)
+    for attacker, (double, half, none) in _CHART.items():
+        row = TYPE_INDEX[attacker]
+        for multiplier, defenders in ((2.0, double), (0.5, half), (0.0, none)):
+            chart[row, [TYPE_INDEX[defender] for defender in defenders]] = multiplier
+    return chart
+
+
+EFFECTIVENESS = _effectiveness()
+LOG_EFFECTIVENESS = np.where(EFFECTIVENESS > 0, np.log2(np.maximum(EFFECTIVENESS, 1e-9)), IMMUNE).astype(np.float32)
+SUPER_EFFECTIVE = (EFFECTIVENESS > 1).astype(np.float32)
+
+
+def type_vectors(members: Iterable[Sequence[str]]) -> np.ndarray:
+    """
+    (n, 18) multi-hot matrix, types missing from the chart are ignored.
+    """
+    members = list(members)
+    vectors = np.zeros((len(members), len(TYPE_NAMES)), dtype=np.float32)
+    for row, types in enumerate(members):
+        columns = [TYPE_INDEX[name] for name in types if name in TYPE_INDEX]
+        vectors[row, columns] = 1.0
+    return vectors
+
+
+def analyze(members: Iterable[Sequence[str]], weakest: int = 3) -> dict:
+    """
+    Type distribution, offensive and defensive coverage of a collection given
+    the types of each member.
+    """
+    vectors = type_vectors(members)
+
+    # (n, 18) damage taken by each member from each attacking type
+    exponents = vectors @ LOG_EFFECTIVENESS.T
+    taken = np.where(exponents <= IMMUNE / 2, 0.0, np.exp2(exponents))
+    weak = (taken > 1).sum(axis=0)
+    resistant = ((taken < 1) & (taken > 0)).sum(axis=0)
+    immune = (taken == 0).sum(axis=0)
+
+    # (n, 18) same-type attacks of each member that are super effective on each defending type
+    hits = (vectors @ SUPER_EFFECTIVE) > 0
+    covered = hits.sum(axis=0)
+
+    defensive = [
+        {"type": name, "weak": int(weak[i]), "resistant": int(resistant[i]), "immune": int(immune[i])}
+        for i, name in enumerate(TYPE_NAMES)
+    ]
+    # Most members hit hard and fewest walls first
+    exposure = weak.astype(np.int64) - resistant - immune
+    order = np.argsort(-exposure, kind="stable")
+    weakest_matchups: List[dict] = [defensive[i] for i in order[:weakest] if exposure[i] > 0]
+
+    distribution: Dict[str, int] = {
+        name: int(count) for name, count in zip(TYPE_NAMES, vectors.sum(axis=0)) if count
+    }
+    return {
+        "type_distribution": distribution,
+        "offensive_coverage": {name: int(covered[i]) for i, name in enumerate(TYPE_NAMES)},
+        "uncovered_types": [name for i, name in enumerate(TYPE_NAMES) if not covered[i]],
+        "defensive_coverage": defensive,
+        "weakest_matchups": weakest_matchups,
+    }
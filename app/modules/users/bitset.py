@@ -0,0 +1,55 @@
+"""
+Pokémon collections as bitsets.
+
+Ids are bounded to 1..1025, so a collection is a 1026-bit integer (bit i set
+when Pokémon i is owned) stored as 129 little-endian bytes. Set algebra runs
+on Python ints, which combine the whole collection a machine word at a time.
+"""
+from typing import Iterable, List
+
+MAX_POKEMON_ID = 1025
+BITSET_BYTES = (MAX_POKEMON_ID + 1 + 7) // 8  # 129
+EMPTY = bytes(BITSET_BYTES)
+# Every valid id, bit 0 is never set
+ALL_POKEMON = ((1 << (MAX_POKEMON_ID + 1)) - 1) & ~1
+
+
+def to_int(bits: bytes) -> int:
+    return int.from_bytes(bits or EMPTY, "little")
+
+
+def to_bytes(value: int) -> bytes:
+    return value.to_bytes(BITSET_BYTES, "little")
+
+
+def mask(pokemon_ids: Iterable[int]) -> int:
+    # Ids out of 1..1025 cannot be owned, they are left out
+    value = 0
+    for pokemon_id in pokemon_ids:
+        if 1 <= pokemon_id <= MAX_POKEMON_ID:
+            value |= 1 << pokemon_id
+    return value
+
+
+def from_ids(pokemon_ids: Iterable[int]) -> bytes:
+    return to_bytes(mask(pokemon_ids))
+
+
+def to_ids(value: int) -> List[int]:
+    ids = []
+    while value:
+        lowest = value & -value
+        ids.append(lowest.bit_length() - 1)
+        value ^= lowest
+    return ids
+
+
+def contains(bits: bytes, pokemon_id: int) -> bool:
+    # O(1): one byte, one shift
+    if not 0 <= pokemon_id >> 3 < len(bits or b""):
+        return False
+    return bool(bits[pokemon_id >> 3] >> (pokemon_id & 7) & 1)
+
+
+def count(value: int) -> int:
+    return value.bit_count()
@@ -0,0 +1,84 @@
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional
+from uuid import UUID
+from .models import PokemonOwnerCount, User, UserPokemon
+
+
+def _upsert(db: Session):
+  dialect = db.get_bind().dialect.name
+  if dialect == "postgresql":
+    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+  elif dialect == "sqlite":
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+  else:
+    raise NotImplementedError(f"Owner counts need an upsert for {dialect}")
+  return dialect_insert
+
+
+class CollectionIndexRepository:
+  """ Inverted index of the collections. Writes join the caller's transaction. """
+  def __init__(self, db: Session):
+    self.db = db
+
+  def apply(self, user_id: UUID, added: Iterable[int], removed: Iterable[int]) -> None:
+    """
+    Counts only follow the rows actually inserted or deleted, so a diff
+    computed from a stale collection never inflates them.
+    """
+    added, removed = list(added), list(removed)
+    if added:
+      inserted = self.db.execute(
+        _upsert(self.db)(UserPokemon)
+        .values([{"pokemon_id": pokemon_id, "user_id": user_id} for pokemon_id in added])
+        .on_conflict_do_nothing()
+        .returning(UserPokemon.pokemon_id)
+      ).scalars().all()
+      if inserted:
+        self._add_to_counts(inserted, 1)
+    if removed:
+      deleted = self.db.execute(
+        delete(UserPokemon)
+        .where(UserPokemon.user_id == user_id, UserPokemon.pokemon_id.in_(removed))
+        .returning(UserPokemon.pokemon_id)
+      ).scalars().all()
+      if deleted:
+        self._add_to_counts(deleted, -1)
+
+  def _add_to_counts(self, pokemon_ids: List[int], delta: int) -> None:
+    # Single statement per change: concurrent writers never lose an increment
+    statement = _upsert(self.db)(PokemonOwnerCount).values(
+      [{"pokemon_id": pokemon_id, "owners": max(delta, 0)} for pokemon_id in pokemon_ids]
+    )
+    self.db.execute(statement.on_conflict_do_update(
+      index_elements=[PokemonOwnerCount.pokemon_id],
+      set_={"owners": PokemonOwnerCount.owners + delta}
+    ))
+
+  def count_owners(self, pokemon_id: int) -> int:
+    owners = self.db.execute(
+      select(PokemonOwnerCount.owners).where(PokemonOwnerCount.pokemon_id == pokemon_id)
+    ).scalar()
+    return owners or 0
+
+  def top_pokemon(self, limit: int = 10) -> list:
+    statement = (
+      select(PokemonOwnerCount.pokemon_id, PokemonOwnerCount.owners)
+      .where(PokemonOwnerCount.owners > 0)
+      .order_by(PokemonOwnerCount.owners.desc(), PokemonOwnerCount.pokemon_id)
+      .limit(limit)
+    )
+    return self.db.execute(statement).all()
+
+  def get_owners(self, pokemon_id: int, after: Optional[UUID] = None, limit: int = 100) -> list:
+    """ Owners ordered by user id, keyset pagination on the (pokemon_id, user_id) primary key """
+    statement = (
+      select(User.id, User.username)
+      .join(UserPokemon, UserPokemon.user_id == User.id)
+      .where(UserPokemon.pokemon_id == pokemon_id)
+      .order_by(UserPokemon.user_id)
+      .limit(limit)
+    )
+    if after is not None:
+      statement = statement.where(UserPokemon.user_id > after)
+    return self.db.execute(statement).all()
@@ -1,11 +1,17 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
-from .schemas import Pokemon, UserCreate, UserUpdate, UserResponse
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response, user_etag
+from .schemas import (
+    CollectionAnalysis, CollectionCompletion, CollectionOperation, Pokemon, PokemonBatchUpdate, Recommendation,
+    SimilarUser, TopCollector, UserCreate, UserUpdate, UserResponse
+)
 from .service import UserService
-from ..auth.dependencies import get_current_user, require_superuser
+from .views import render_users
+from ..auth.dependencies import get_current_principal, require_superuser
+from ..auth.schema import Principal
 from ...core.config import get_settings
 from .models import User
 
@@ -32,26 +38,43 @@ def get_users(
     limit: int = 100,
     active_only: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     user_service = UserService(db)
-    if active_only:
-        return user_service.get_active_users(skip=skip, limit=limit)
-    return user_service.get_all_users(skip=skip, limit=limit)
+    # Rendered from slotted views, skips ORM loading and response_model validation
+    views = user_service.get_user_views(skip=skip, limit=limit, active_only=active_only)
+    return Response(content=render_users(views), media_type="application/json")
+
+
+@router.get("/top-collectors", response_model=List[TopCollector])
+def get_top_collectors(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    user_service = UserService(db)
+    return user_service.get_top_collectors(limit)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     user_service = UserService(db)
-    return user_service.get_user_by_id(user_id)
+    user = user_service.get_user_by_id(user_id)
+
+    not_modified = conditional_response(request, response, user_etag(user), PRIVATE_REVALIDATE)
+    if not_modified:
+        return not_modified
+    return user
 
 
 @router.get("/statistics")
-def get_statistics(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_statistics(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     user_service = UserService(db)
     return user_service.get_user_statistics()
 
@@ -62,10 +85,43 @@ def search_users(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
+):
+    user_service = UserService(db)
+    views = user_service.search_user_views(q, skip=skip, limit=limit)
+    return Response(content=render_users(views), media_type="application/json")
+
+
+@router.get("/{user_id}/similar", response_model=List[SimilarUser])
+def get_similar_users(
+    user_id: UUID,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    user_service = UserService(db)
+    return user_service.get_similar_users(user_id, limit)
+
+
+@router.get("/{user_id}/recommendations", response_model=List[Recommendation])
+async def get_recommendations(
+    user_id: UUID,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     user_service = UserService(db)
-    return user_service.search_users(q, skip=skip, limit=limit)
+    return await user_service.get_recommendations(user_id, limit)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -73,7 +129,7 @@ def update_user(
     user_id: UUID,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.id != user_id:
         raise HTTPException(
@@ -109,7 +165,7 @@ def activate_user(
 def delete_user(
     user_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.id != user_id and not current_user.is_superuser:
         raise HTTPException(
@@ -126,19 +182,74 @@ def delete_user(
 ### -------- Poke API
 
 @router.get("/{user_id}/pokemons", response_model=List[Pokemon])
-def get_user_pokemons(user_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_user_pokemons(user_id: UUID, request: Request, response: Response, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    user_service = UserService(db)
+    user = user_service.get_user_by_id(user_id)
+
+    not_modified = conditional_response(request, response, user_etag(user, "pokemons"), PRIVATE_REVALIDATE)
+    if not_modified:
+        return not_modified
+    return user.pokemons
+
+
+@router.get("/{user_id}/pokemons/missing", response_model=List[Pokemon])
+async def get_missing_pokemons(user_id: UUID, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    user_service = UserService(db)
+    return await user_service.get_missing_pokemons(user_id)
+
+
+@router.get("/{user_id}/pokemons/completion", response_model=CollectionCompletion)
+def get_collection_completion(user_id: UUID, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    user_service = UserService(db)
+    return user_service.get_collection_completion(user_id)
+
+
+@router.get("/{user_id}/pokemons/analysis", response_model=CollectionAnalysis)
+async def get_collection_analysis(user_id: UUID, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    user_service = UserService(db)
+    return await user_service.get_collection_analysis(user_id)
+
 
+@router.get("/{user_id}/pokemons/{operation}/{other_user_id}", response_model=List[Pokemon])
+def compare_collections(
+    user_id: UUID,
+    operation: CollectionOperation,
+    other_user_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
     user_service = UserService(db)
-    return user_service.get_user_pokemons(user_id)
+    return user_service.compare_collections(user_id, other_user_id, operation)
 
 
 @router.post("/{user_id}/pokemons/{pokemon_id}", response_model=UserResponse)
-async def add_pokemon_to_user(user_id: UUID, pokemon_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def add_pokemon_to_user(user_id: UUID, pokemon_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -149,7 +260,7 @@ async def add_pokemon_to_user(user_id: UUID, pokemon_id: int, db: Session = Depe
     
 
 @router.put("/{user_id}/pokemons", response_model=UserResponse)
-def update_user_pokemons(user_id: UUID, pokemons: List[Pokemon], db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def update_user_pokemons(user_id: UUID, pokemons: List[Pokemon], db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
 
     if current_user.id != user_id:
         raise HTTPException(
@@ -161,8 +272,19 @@ def update_user_pokemons(user_id: UUID, pokemons: List[Pokemon], db: Session = D
     return user_service.update_user_pokemons(user_id, pokemons)
 
 
+@router.patch("/{user_id}/pokemons", response_model=List[Pokemon])
+async def batch_update_user_pokemons(user_id: UUID, changes: PokemonBatchUpdate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only change your own collection"
+        )
+    user_service = UserService(db)
+    return await user_service.batch_update_user_pokemons(user_id, changes.add, changes.remove)
+
+
 @router.delete("/{user_id}/pokemons/{pokemon_id}", response_model=UserResponse)
-def remove_pokemon_from_user(user_id: UUID, pokemon_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def remove_pokemon_from_user(user_id: UUID, pokemon_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
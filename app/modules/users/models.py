@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Boolean, DateTime, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, JSON, LargeBinary, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 from datetime import datetime, timezone
 from app.core.database import Base
+from . import bitset
 import uuid
 
 
@@ -16,11 +18,44 @@ class User(Base):
   gender = Column(String, nullable=True)
 
   pokemons = Column(JSON, default=list, nullable=False)
+  # Same collection as a bitset (see bitset.py), kept in sync on every assignment of pokemons
+  pokemon_bits = Column(LargeBinary, default=bitset.EMPTY, nullable=False)
+  pokemon_count = Column(Integer, default=0, nullable=False)
 
   is_active = Column(Boolean, default=False)
   is_superuser = Column(Boolean, default=False)
   created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
   updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+  # Top collectors read K rows of this index
+  __table_args__ = (Index("ix_users_pokemon_count", pokemon_count.desc(), id),)
+
+  @validates("pokemons")
+  def _sync_pokemon_bits(self, key, pokemons):
+    bits = bitset.mask(p["id"] for p in pokemons or ())
+    self.pokemon_bits = bitset.to_bytes(bits)
+    # Same ids as the bits and the owners index, out of range ones are not counted
+    self.pokemon_count = bitset.count(bits)
+    return pokemons
+
   def __repr__(self):
-    return f"<User(id='{self.id}', email='{self.email}', username='{self.username}', pokemons='{self.pokemons}', is_active='{self.is_active}', is_superuser='{self.is_superuser})>"
\ No newline at end of file
+    return f"<User(id='{self.id}', email='{self.email}', username='{self.username}', pokemons='{self.pokemons}', is_active='{self.is_active}', is_superuser='{self.is_superuser})>"
+
+
+class UserPokemon(Base):
+  """ Owner side of the collections: one row per (Pokémon, user), the primary key answers "who owns X" """
+  __tablename__ = "user_pokemons"
+
+  pokemon_id = Column(Integer, primary_key=True)
+  user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class PokemonOwnerCount(Base):
+  """ Owners per Pokémon, maintained incrementally with user_pokemons """
+  __tablename__ = "pokemon_owner_counts"
+
+  pokemon_id = Column(Integer, primary_key=True)
+  owners = Column(Integer, default=0, nullable=False)
+
+  # Top-K reads walk this index and stop after K rows
+  __table_args__ = (Index("ix_pokemon_owner_counts_owners", owners.desc(), pokemon_id),)
@@ -1,9 +1,15 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Callable, Iterator, List, Mapping, Optional, Sequence, Union
 from .models import User
+from .views import USER_VIEW_COLUMNS, UserView
 from uuid import UUID
 
 
+DEFAULT_ITER_COLUMNS = ("id", "email", "username", "is_active")
+
+
 class UserRepository:
   """ CRUD Operetion with DataBase  """
   def __init__(self, db: Session):
@@ -13,9 +19,23 @@ class UserRepository:
   def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
     return self.db.query(User).offset(skip).limit(limit).all()
 
+  def get_views(self, skip: int = 0, limit: int = 100, active_only: bool = False, search_term: Optional[str] = None) -> List[UserView]:
+    """ Same rows as get_all/get_active_users/search_by_name, as read-only views """
+    statement = select(*(getattr(User, name) for name in USER_VIEW_COLUMNS))
+    if active_only:
+      statement = statement.where(User.is_active.is_(True))
+    if search_term is not None:
+      statement = statement.where(User.username.ilike(f"%{search_term}%"))
+    rows = self.db.execute(statement.offset(skip).limit(limit))
+    return [UserView(*row) for row in rows]
+
   def get_by_id(self, user_id: UUID) -> Optional[User]:
     return self.db.query(User).filter(User.id == user_id).first()
 
+  def get_for_update(self, user_id: UUID) -> Optional[User]:
+    """ Locks the row until the transaction ends and reloads it, for read-modify-write of the collection """
+    return self.db.query(User).filter(User.id == user_id).with_for_update().populate_existing().first()
+
   def get_by_email(self, email: str) -> Optional[User]:
     return self.db.query(User).filter(User.email == email).first()
 
@@ -39,6 +59,15 @@ class UserRepository:
     self.db.refresh(user)
     return user
 
+  def save(self, user: User) -> User:
+    """ Commit keeping the loaded state: no refresh and no reload on the next attribute access """
+    expire_on_commit, self.db.expire_on_commit = self.db.expire_on_commit, False
+    try:
+      self.db.commit()
+    finally:
+      self.db.expire_on_commit = expire_on_commit
+    return user
+
   def delete(self, user: User) -> bool:
     self.db.delete(user)
     self.db.commit()
@@ -56,6 +85,100 @@ class UserRepository:
   def count_active(self) -> int:
     return self.db.query(User).filter(User.is_active == True).count()
 
+  def get_usernames(self, user_ids: List[UUID]) -> dict:
+    if not user_ids:
+      return {}
+    rows = self.db.execute(select(User.id, User.username).where(User.id.in_(user_ids)))
+    return {row.id: row.username for row in rows}
+
+  def top_collectors(self, limit: int = 10) -> list:
+    """ Index scan on pokemon_count, reads K rows """
+    statement = (
+      select(User.id, User.username, User.pokemon_count)
+      .where(User.pokemon_count > 0)
+      .order_by(User.pokemon_count.desc(), User.id)
+      .limit(limit)
+    )
+    return self.db.execute(statement).all()
+
   def search_by_name(self, search_term: str, skip: int = 0, limit: int = 100) -> List[User]:
     search = f"%{search_term}%"
-    return self.db.query(User).filter(User.username.ilike(search)).offset(skip).limit(limit).all()
\ No newline at end of file
+    return self.db.query(User).filter(User.username.ilike(search)).offset(skip).limit(limit).all()
+
+  ### --- Batch jobs
+
+  def iter_user_batches(
+    self,
+    batch_size: int = 1000,
+    filters: Union[Mapping[str, Any], Sequence[Any], None] = None,
+    columns: Sequence[str] = DEFAULT_ITER_COLUMNS,
+    into: Optional[Callable[..., Any]] = None,
+  ) -> Iterator[list]:
+    """
+    Yields lists of up to `batch_size` rows ordered by id.
+
+    Keyset pagination (id > last id) instead of OFFSET, so every batch is an index
+    range scan and one LIMITed query: memory is bounded by a batch, no cursor stays
+    open while the caller works on it.
+    Rows are plain named tuples with only `columns`, nothing enters the identity map.
+    `filters` is a {column: value} mapping or a list of SQLAlchemy expressions,
+    `into` builds each item from the row's columns (e.g. a dataclass).
+    """
+    selected = [getattr(User, name) for name in columns]
+    # The id drives the keyset, fetch it even when not asked for
+    with_id = "id" in columns
+    if not with_id:
+      selected.append(User.id)
+
+    conditions = []
+    if isinstance(filters, Mapping):
+      conditions = [getattr(User, name) == value for name, value in filters.items()]
+    elif filters is not None:
+      conditions = list(filters)
+
+    last_id = None
+    while True:
+      statement = select(*selected).where(*conditions).order_by(User.id).limit(batch_size)
+      if last_id is not None:
+        statement = statement.where(User.id > last_id)
+
+      rows = self.db.execute(statement).all()
+      if not rows:
+        return
+
+      last_id = rows[-1].id
+      if not with_id:
+        rows = [row[:-1] for row in rows]
+      if into is not None:
+        rows = [into(*row) for row in rows]
+      yield rows
+
+      if len(rows) < batch_size:
+        return
+
+  def iter_users(
+    self,
+    batch_size: int = 1000,
+    filters: Union[Mapping[str, Any], Sequence[Any], None] = None,
+    columns: Sequence[str] = DEFAULT_ITER_COLUMNS,
+    into: Optional[Callable[..., Any]] = None,
+  ) -> Iterator[Any]:
+    """ Row by row version of iter_user_batches, memory stays at one batch """
+    for batch in self.iter_user_batches(batch_size, filters, columns, into):
+      yield from batch
+
+  async def aiter_users(
+    self,
+    batch_size: int = 1000,
+    filters: Union[Mapping[str, Any], Sequence[Any], None] = None,
+    columns: Sequence[str] = DEFAULT_ITER_COLUMNS,
+    into: Optional[Callable[..., Any]] = None,
+  ) -> AsyncIterator[Any]:
+    """ Async version of iter_users, each batch is fetched in the threadpool """
+    batches = self.iter_user_batches(batch_size, filters, columns, into)
+    while True:
+      batch = await run_in_threadpool(next, batches, None)
+      if batch is None:
+        return
+      for row in batch:
+        yield row
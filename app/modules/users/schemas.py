@@ -1,5 +1,6 @@
+from enum import Enum
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from uuid import UUID
 from app.modules.pokemon.shemas import Pokemon
@@ -34,3 +35,56 @@ class UserResponse(UserBase):
     pokemons: List[Pokemon] = []
     created_at: datetime
     updated_at: datetime
+
+
+# Schema Batch Update of the collection
+class PokemonBatchUpdate(BaseModel):
+    add: List[int] = Field(default_factory=list, max_length=200)
+    remove: List[int] = Field(default_factory=list, max_length=200)
+
+
+class CollectionOperation(str, Enum):
+    intersection = "intersection"
+    union = "union"
+    difference = "difference"
+
+
+class CollectionCompletion(BaseModel):
+    owned: int
+    total: int
+    percentage: float
+
+
+class TypeMatchup(BaseModel):
+    type: str
+    weak: int = Field(..., description="Members taking more than normal damage from this type")
+    resistant: int
+    immune: int
+
+
+class CollectionAnalysis(BaseModel):
+    total: int
+    analyzed: int = Field(..., description="Members whose types are known")
+    type_distribution: Dict[str, int]
+    offensive_coverage: Dict[str, int] = Field(..., description="Members whose own types hit each type super effectively")
+    uncovered_types: List[str]
+    defensive_coverage: List[TypeMatchup]
+    weakest_matchups: List[TypeMatchup]
+
+
+class TopCollector(BaseModel):
+    id: UUID
+    username: str
+    pokemon_count: int
+
+
+class SimilarUser(BaseModel):
+    id: UUID
+    username: str
+    score: float = Field(..., description="Jaccard similarity of the collections")
+
+
+class Recommendation(BaseModel):
+    id: int
+    name: Optional[str] = None
+    score: float
@@ -1,12 +1,39 @@
+import asyncio
+from functools import lru_cache
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import List, Optional
 from .models import User
-from .schemas import Pokemon, UserCreate, UserUpdate
+from .schemas import CollectionOperation, Pokemon, UserCreate, UserUpdate
 from .repository import UserRepository
+from .collection_index import CollectionIndexRepository
+from .views import UserView
+from . import bitset
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.invalidation import invalidation_bus
 from app.core.security import get_password_hash
+from app.core.tasks import task_queue
 from uuid import UUID
+from starlette.concurrency import run_in_threadpool
 from app.modules.pokemon.service import PokeAPIService
+from app.modules.auth.revocation import RevocationService
+import app.modules.pokemon.tasks  # noqa: F401  registers the pokemon.* jobs
+
+settings = get_settings()
+
+
+@lru_cache()
+def get_collection_matrix():
+    """
+    Similarity matrix of this worker, numpy is only imported on first use.
+    """
+    from .similarity import CollectionMatrix
+    return CollectionMatrix(refresh_seconds=settings.SIMILARITY_REFRESH_SECONDS)
+
+
+def collection_matrix_created() -> bool:
+    return get_collection_matrix.cache_info().currsize > 0
 
 
 class UserService:
@@ -15,14 +42,34 @@ class UserService:
     Coordinates operations between the controller and the repository.
     """
 
+    # Top-K boards per limit, shared by every request of the worker
+    _leaderboard_cache = TTLCache(maxsize=64, ttl=settings.LEADERBOARD_CACHE_SECONDS)
+
     def __init__(self, db: Session):
         self.db = db
         self.repository = UserRepository(db)
         self.pokeapi_service = PokeAPIService()
+        self.revocation_service = RevocationService(db)
+        self.collection_index = CollectionIndexRepository(db)
 
     
     ### ------- Pokemon API
 
+    def _set_collection(self, user: User, pokemons: List[dict]) -> None:
+        """
+        Single place collections change. Assigning a new list is detected without
+        flag_modified and the model recomputes pokemon_bits, the bitset diff then
+        updates the owners index in the same transaction. `user` must come from
+        get_for_update: the diff is only right against the current row.
+        """
+        before = bitset.to_int(user.pokemon_bits)
+        user.pokemons = pokemons
+        after = bitset.to_int(user.pokemon_bits)
+        self.collection_index.apply(user.id, added=bitset.to_ids(after & ~before), removed=bitset.to_ids(before & ~after))
+        if collection_matrix_created():
+            get_collection_matrix().update(user.id, user.pokemon_bits)
+        invalidation_bus.publish(self.db, "collection", user.id)
+
     async def add_pokemon_to_user(self, user_id: UUID, pokemon_id: int) -> User:
         user = self.repository.get_by_id(user_id)
         if not user:
@@ -31,48 +78,131 @@ class UserService:
                 detail=f"User with id {user_id} not found"
             )
 
-        try:
-            pokemon_data = await self.pokeapi_service.get_pokemon(pokemon_id)
-        except HTTPException:
+        if bitset.contains(user.pokemon_bits, pokemon_id):
+            name = next(p["name"] for p in user.pokemons if p["id"] == pokemon_id)
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Pokémon with id {pokemon_id} not found in PokeAPI"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Pokemon {name} already in collection"
             )
 
+        # Known from the catalog: no need to wait on PokeAPI, the lookup cache is filled after the commit
+        pokemon_data = self.pokeapi_service.get_cached_pokemon(pokemon_id)
+        enrich = pokemon_data is not None and pokemon_id not in self.pokeapi_service._pokemon_cache
+
+        if pokemon_data is None:
+            try:
+                pokemon_data = await self.pokeapi_service.get_pokemon(pokemon_id)
+            except HTTPException:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Pokémon with id {pokemon_id} not found in PokeAPI"
+                )
 
-        if any(p["id"] == pokemon_id for p in user.pokemons):
+        # Locked once PokeAPI answered, a concurrent change made meanwhile is seen here
+        user = self.repository.get_for_update(user_id)
+        if bitset.contains(user.pokemon_bits, pokemon_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Pokemon {pokemon_data['name']} already in collection"
             )
+        self._set_collection(user, user.pokemons + [pokemon_data])
 
-        user.pokemons.append(pokemon_data)
-        
-        ### Esto es porque SQLAlchemy no detecta automaticamente los cambios JSON/ARRAY
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(user, "pokemons")
+        # The response only needs the state already loaded, the rest runs after the commit
+        user = self.repository.save(user)
+        if enrich:
+            await task_queue.enqueue("pokemon.enrich", pokemon_id=pokemon_id)
+        return user
 
-        return self.repository.update(user)
+    async def batch_update_user_pokemons(self, user_id: UUID, add: List[int], remove: List[int]) -> List[Pokemon]:
+        """
+        Add and remove many Pokémon in one transaction.
+        Idempotent: adding an owned Pokémon or removing a missing one is a no-op.
+        """
+        user = self.repository.get_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with id {user_id} not found"
+            )
+
+        to_remove = set(remove)
+        # dict keeps the request order while deduplicating
+        to_add = dict.fromkeys(pokemon_id for pokemon_id in add)
+        conflicts = to_remove.intersection(to_add)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Pokemon ids both added and removed: {sorted(conflicts)}"
+            )
+
+        out_of_range = [pokemon_id for pokemon_id in to_add if not 1 <= pokemon_id <= PokeAPIService.MAX_POKEMON_ID]
+        if out_of_range:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Pokemon ID must be between 1 and {PokeAPIService.MAX_POKEMON_ID}: {out_of_range}"
+            )
+
+        owned = bitset.to_int(user.pokemon_bits)
+        new_ids = [pokemon_id for pokemon_id in to_add if not owned >> pokemon_id & 1]
+
+        # Validate every new id at once, upstream only for the ones not known in memory
+        resolved = {pokemon_id: self.pokeapi_service.get_cached_pokemon(pokemon_id) for pokemon_id in new_ids}
+        enrich = [pokemon_id for pokemon_id, pokemon in resolved.items()
+                  if pokemon is not None and pokemon_id not in self.pokeapi_service._pokemon_cache]
+        missing = [pokemon_id for pokemon_id, pokemon in resolved.items() if pokemon is None]
+        results = await asyncio.gather(
+            *(self.pokeapi_service.get_pokemon(pokemon_id) for pokemon_id in missing),
+            return_exceptions=True
+        )
+
+        not_found = []
+        for pokemon_id, result in zip(missing, results):
+            if isinstance(result, HTTPException):
+                not_found.append(pokemon_id)
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                resolved[pokemon_id] = result
+        if not_found:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pokémon with ids {not_found} not found in PokeAPI"
+            )
+
+        # Locked once PokeAPI answered: ids removed meanwhile are known from the first read
+        resolved.update((p["id"], p) for p in user.pokemons if p["id"] in to_add)
+        user = self.repository.get_for_update(user_id)
+        owned = bitset.to_int(user.pokemon_bits)
+        new_ids = [pokemon_id for pokemon_id in to_add if not owned >> pokemon_id & 1]
+
+        if not new_ids and not owned & bitset.mask(to_remove):
+            return user.pokemons
+
+        self._set_collection(
+            user,
+            [p for p in user.pokemons if p["id"] not in to_remove] + [resolved[i] for i in new_ids]
+        )
+
+        user = self.repository.save(user)
+        for pokemon_id in enrich:
+            await task_queue.enqueue("pokemon.enrich", pokemon_id=pokemon_id)
+        return user.pokemons
 
     def remove_pokemon_from_user(self, user_id: UUID, pokemon_id: int) -> User:
-        user = self.repository.get_by_id(user_id)
+        user = self.repository.get_for_update(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User with id {user_id} not found"
             )
 
-        original_length = len(user.pokemons)
-        user.pokemons = [p for p in user.pokemons if p["id"] != pokemon_id]
-        
-        if len(user.pokemons) == original_length:
+        if not bitset.contains(user.pokemon_bits, pokemon_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Pokemon with id {pokemon_id} not found in collection"
             )
 
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(user, "pokemons")
+        self._set_collection(user, [p for p in user.pokemons if p["id"] != pokemon_id])
 
         return self.repository.update(user)
 
@@ -85,8 +215,136 @@ class UserService:
             )
         return user.pokemons
 
+    def compare_collections(self, user_id: UUID, other_user_id: UUID, operation: CollectionOperation) -> List[Pokemon]:
+        user = self.get_user_by_id(user_id)
+        other = self.get_user_by_id(other_user_id)
+
+        mine, theirs = bitset.to_int(user.pokemon_bits), bitset.to_int(other.pokemon_bits)
+        if operation == CollectionOperation.intersection:
+            result = mine & theirs
+        elif operation == CollectionOperation.union:
+            result = mine | theirs
+        else:
+            result = mine & ~theirs
+
+        names = {p["id"]: p["name"] for p in other.pokemons}
+        names.update((p["id"], p["name"]) for p in user.pokemons)
+        return [{"id": pokemon_id, "name": names[pokemon_id]} for pokemon_id in bitset.to_ids(result)]
+
+    async def get_missing_pokemons(self, user_id: UUID) -> List[Pokemon]:
+        user = self.get_user_by_id(user_id)
+        missing = bitset.ALL_POKEMON & ~bitset.to_int(user.pokemon_bits)
+        catalog = await self.pokeapi_service.get_catalog()
+        return [pokemon for pokemon in catalog if missing >> pokemon["id"] & 1]
+
+    def get_collection_completion(self, user_id: UUID) -> dict:
+        user = self.get_user_by_id(user_id)
+        owned = bitset.count(bitset.to_int(user.pokemon_bits))
+        return {
+            "owned": owned,
+            "total": bitset.MAX_POKEMON_ID,
+            "percentage": round(100 * owned / bitset.MAX_POKEMON_ID, 2)
+        }
+
+    async def get_collection_analysis(self, user_id: UUID) -> dict:
+        # numpy is only loaded by the first analysis
+        from app.modules.pokemon.types import analyze
+
+        user = self.get_user_by_id(user_id)
+        pokemon_ids = bitset.to_ids(bitset.to_int(user.pokemon_bits))
+        types = await self.pokeapi_service.get_pokemon_types(pokemon_ids)
+        members = [types[pokemon_id] for pokemon_id in pokemon_ids if pokemon_id in types]
+        return {"total": len(pokemon_ids), "analyzed": len(members), **analyze(members)}
+
+    def get_pokemon_owners(self, pokemon_id: int, after: Optional[UUID] = None, limit: int = 100) -> dict:
+        owners = self.collection_index.get_owners(pokemon_id, after=after, limit=limit)
+        return {
+            "pokemon_id": pokemon_id,
+            "total": self.collection_index.count_owners(pokemon_id),
+            "owners": [{"id": row.id, "username": row.username} for row in owners],
+            "next": owners[-1].id if len(owners) == limit else None
+        }
+
+    async def _pokemon_names(self, pokemon_ids: List[int]) -> dict:
+        """
+        Names from the in-memory caches, PokeAPI only for the ids not cached (concurrently).
+        """
+        names = {}
+        unknown = []
+        for pokemon_id in pokemon_ids:
+            pokemon = self.pokeapi_service.get_cached_pokemon(pokemon_id)
+            if pokemon is None:
+                unknown.append(pokemon_id)
+            else:
+                names[pokemon_id] = pokemon["name"]
+
+        fetched = await asyncio.gather(
+            *(self.pokeapi_service.get_pokemon(pokemon_id) for pokemon_id in unknown),
+            return_exceptions=True
+        )
+        names.update(
+            (pokemon_id, pokemon["name"]) for pokemon_id, pokemon in zip(unknown, fetched) if not isinstance(pokemon, Exception)
+        )
+        return names
+
+    def _similarity_matrix(self):
+        matrix = get_collection_matrix()
+        matrix.refresh(lambda: self.repository.iter_users(batch_size=10000, columns=("id", "pokemon_bits")))
+        stale = matrix.take_stale()
+        if stale:
+            # Collections changed by other workers since the last query
+            rows = dict(self.repository.iter_users(filters=[User.id.in_(stale)], columns=("id", "pokemon_bits")))
+            for user_id in stale:
+                if user_id in rows:
+                    matrix.update(user_id, rows[user_id])
+                else:
+                    matrix.remove(user_id)
+        return matrix
+
+    def get_similar_users(self, user_id: UUID, limit: int = 10) -> List[dict]:
+        self.get_user_by_id(user_id)
+        similar = self._similarity_matrix().similar(user_id, limit)
+        usernames = self.repository.get_usernames([other_id for other_id, _ in similar])
+        return [
+            {"id": other_id, "username": usernames[other_id], "score": round(score, 4)}
+            for other_id, score in similar if other_id in usernames
+        ]
+
+    async def get_recommendations(self, user_id: UUID, limit: int = 10) -> List[dict]:
+        self.get_user_by_id(user_id)
+        matrix = await run_in_threadpool(self._similarity_matrix)
+        recommended = await run_in_threadpool(matrix.recommend, user_id, limit)
+        names = await self._pokemon_names([pokemon_id for pokemon_id, _ in recommended])
+        return [
+            {"id": pokemon_id, "name": names.get(pokemon_id), "score": round(score, 4)}
+            for pokemon_id, score in recommended
+        ]
+
+    async def get_pokemon_leaderboard(self, limit: int = 10) -> List[dict]:
+        key = ("pokemon", limit)
+        board = self._leaderboard_cache.get(key)
+        if board is not None:
+            return board
+
+        rows = self.collection_index.top_pokemon(limit)
+        names = await self._pokemon_names([row.pokemon_id for row in rows])
+        board = [{"id": row.pokemon_id, "name": names.get(row.pokemon_id), "owners": row.owners} for row in rows]
+        self._leaderboard_cache.set(key, board)
+        return board
+
+    def get_top_collectors(self, limit: int = 10) -> List[dict]:
+        key = ("collectors", limit)
+        board = self._leaderboard_cache.get(key)
+        if board is None:
+            board = [
+                {"id": row.id, "username": row.username, "pokemon_count": row.pokemon_count}
+                for row in self.repository.top_collectors(limit)
+            ]
+            self._leaderboard_cache.set(key, board)
+        return board
+
     def update_user_pokemons(self, user_id: UUID, pokemons: List[Pokemon]) -> User:
-        user = self.repository.get_by_id(user_id)
+        user = self.repository.get_for_update(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -99,10 +357,7 @@ class UserService:
                 detail="Duplicate Pokemon in list"
             )
 
-        user.pokemons = [p.model_dump() for p in pokemons]
-
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(user, "pokemons")
+        self._set_collection(user, [p.model_dump() for p in pokemons])
 
         return self.repository.update(user)
 
@@ -114,6 +369,12 @@ class UserService:
     def get_active_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         return self.repository.get_active_users(skip=skip, limit=limit)
 
+    def get_user_views(self, skip: int = 0, limit: int = 100, active_only: bool = False) -> List[UserView]:
+        return self.repository.get_views(skip=skip, limit=limit, active_only=active_only)
+
+    def search_user_views(self, search_term: str, skip: int = 0, limit: int = 100) -> List[UserView]:
+        return self.repository.get_views(skip=skip, limit=limit, search_term=search_term)
+
     def get_user_by_id(self, user_id: UUID) -> Optional[User]:
         user = self.repository.get_by_id(user_id)
         if not user:
@@ -215,11 +476,16 @@ class UserService:
             db_user.hashed_password = get_password_hash(user_data.password)
 
         if user_data.is_active is not None:
+            if db_user.is_active and not user_data.is_active:
+                self.revocation_service.revoke_user(user_id)
+            elif user_data.is_active and not db_user.is_active:
+                self.revocation_service.restore_user(user_id)
             db_user.is_active = user_data.is_active
 
         if user_data.gender is not None:
             db_user.gender = user_data.gender
 
+        invalidation_bus.publish(self.db, "user", user_id)
         # Save Changes
         return self.repository.update(db_user)
 
@@ -238,6 +504,12 @@ class UserService:
                 detail="Cannot delete superuser accounts"
             )
 
+        self.revocation_service.revoke_user(user_id)
+        self.collection_index.apply(user_id, added=(), removed=bitset.to_ids(bitset.to_int(db_user.pokemon_bits)))
+        if collection_matrix_created():
+            get_collection_matrix().remove(user_id)
+        invalidation_bus.publish(self.db, "user", user_id)
+        invalidation_bus.publish(self.db, "collection", user_id)
         return self.repository.delete(db_user)
 
     def deactivate_user(self, user_id: UUID) -> User:
@@ -249,6 +521,8 @@ class UserService:
             )
 
         db_user.is_active = False
+        self.revocation_service.revoke_user(user_id)
+        invalidation_bus.publish(self.db, "user", user_id)
         return self.repository.update(db_user)
 
     def activate_user(self, user_id: UUID) -> User:
@@ -260,6 +534,8 @@ class UserService:
             )
 
         db_user.is_active = True
+        self.revocation_service.restore_user(user_id)
+        invalidation_bus.publish(self.db, "user", user_id)
         return self.repository.update(db_user)
 
     def get_user_statistics(self) -> dict:
@@ -268,3 +544,15 @@ class UserService:
             "active_users": self.repository.count_active(),
             "inactive_users": self.repository.count_all() - self.repository.count_active()
         }
+
+
+def _collections_changed(keys) -> None:
+    # Everything (keys=None) is left to the periodic reload of the matrix
+    if keys is not None and collection_matrix_created():
+        get_collection_matrix().mark_stale(UUID(key) for key in keys)
+
+
+# Top collectors show usernames, renamed and deleted users must not linger
+invalidation_bus.subscribe("user", lambda keys: UserService._leaderboard_cache.clear())
+# This worker's matrix is already updated by _set_collection
+invalidation_bus.subscribe("collection", _collections_changed, local=False)
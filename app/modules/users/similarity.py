@@ -0,0 +1,166 @@
+"""
+Collection similarity over every user at once.
+
+Each user is a bitset of owned Pokémon: the 129-byte pokemon_bits padded to
+136 bytes, 17 uint64 words. The matrix is stored word-major (17 x users), so
+Jaccard against one user is, for each non-zero word of that user, one AND and
+one popcount over a contiguous array of all users. Collections are sparse and
+most words are skipped; at 1M users a query reads well under 136 MB.
+
+The matrix is loaded lazily per worker, updated in place when this worker
+changes a collection, row by row for the changes other workers announce
+(app.core.invalidation) and fully reloaded every `refresh_seconds`.
+"""
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from .bitset import BITSET_BYTES, MAX_POKEMON_ID
+
+ROW_BYTES = 136  # BITSET_BYTES rounded up to whole uint64 words
+ROW_WORDS = ROW_BYTES // 8
+
+
+def _row(bits: bytes) -> np.ndarray:
+    return np.frombuffer(bytearray((bits or b"").ljust(ROW_BYTES, b"\0")), dtype=np.uint64)
+
+
+def _top(values: np.ndarray, k: int) -> np.ndarray:
+    # Partial selection is O(n), only the k winners are sorted
+    k = min(k, len(values))
+    top = np.argpartition(values, -k)[-k:]
+    return top[np.argsort(-values[top], kind="stable")]
+
+
+class CollectionMatrix:
+
+    def __init__(self, refresh_seconds: float = 300.0):
+        self.refresh_seconds = refresh_seconds
+        self._words = np.zeros((ROW_WORDS, 0), dtype=np.uint64)
+        self._sizes = np.zeros(0, dtype=np.int32)
+        self._user_ids: List[UUID] = []
+        self._index: Dict[UUID, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._stale: Set[UUID] = set()
+        self._lock = Lock()
+        self._load_lock = Lock()
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def load(self, rows: Iterable[Tuple[UUID, bytes]]) -> None:
+        user_ids, buffer = [], bytearray()
+        for user_id, bits in rows:
+            user_ids.append(user_id)
+            buffer += (bits or b"").ljust(ROW_BYTES, b"\0")
+        words = np.ascontiguousarray(np.frombuffer(buffer, dtype=np.uint64).reshape(-1, ROW_WORDS).T)
+        sizes = np.bitwise_count(words).sum(axis=0, dtype=np.int32)
+        with self._lock:
+            self._words, self._sizes = words, sizes
+            self._user_ids = user_ids
+            self._index = {user_id: i for i, user_id in enumerate(user_ids)}
+            self._stale = set()
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, loader: Callable[[], Iterable[Tuple[UUID, bytes]]]) -> None:
+        # One reload at a time, requests waiting on it then see a fresh matrix
+        with self._load_lock:
+            if self.stale:
+                self.load(loader())
+
+    def mark_stale(self, user_ids: Iterable[UUID]) -> None:
+        """
+        Rows changed elsewhere, reloaded by the caller through `take_stale`.
+        """
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._stale.update(user_ids)
+
+    def take_stale(self) -> Set[UUID]:
+        with self._lock:
+            stale, self._stale = self._stale, set()
+        return stale
+
+    def update(self, user_id: UUID, bits: bytes) -> None:
+        if self._loaded_at is None:
+            return
+        row = _row(bits)
+        with self._lock:
+            i = self._index.get(user_id)
+            if i is None:
+                i = len(self._user_ids)
+                if i == self._words.shape[1]:
+                    # Grow by half: appends stay amortized O(1)
+                    capacity = max(16, i + i // 2)
+                    words = np.zeros((ROW_WORDS, capacity), dtype=np.uint64)
+                    words[:, :i] = self._words
+                    sizes = np.zeros(capacity, dtype=np.int32)
+                    sizes[:i] = self._sizes
+                    self._words, self._sizes = words, sizes
+                self._user_ids.append(user_id)
+                self._index[user_id] = i
+            self._words[:, i] = row
+            self._sizes[i] = int(np.bitwise_count(row).sum())
+
+    def remove(self, user_id: UUID) -> None:
+        if user_id in self._index:
+            self.update(user_id, bytes(BITSET_BYTES))
+
+    def jaccard(self, user_id: UUID) -> Optional[np.ndarray]:
+        """
+        Jaccard similarity of every user against `user_id`, None when unknown.
+        """
+        i = self._index.get(user_id)
+        if i is None:
+            return None
+        n = len(self._user_ids)
+        words, sizes = self._words[:, :n], self._sizes[:n]
+
+        intersection = np.zeros(n, dtype=np.uint16)
+        scratch, counts = np.empty(n, dtype=np.uint64), np.empty(n, dtype=np.uint8)
+        for w, word in enumerate(words[:, i]):
+            if not word:
+                continue
+            np.bitwise_and(words[w], word, out=scratch)
+            np.bitwise_count(scratch, out=counts)
+            np.add(intersection, counts, out=intersection)
+
+        union = sizes + sizes[i] - intersection
+        scores = np.divide(intersection, union, out=np.zeros(n, dtype=np.float32), where=union > 0)
+        scores[i] = 0.0
+        return scores
+
+    def similar(self, user_id: UUID, limit: int = 10) -> List[Tuple[UUID, float]]:
+        scores = self.jaccard(user_id)
+        if scores is None or not len(scores):
+            return []
+        return [(self._user_ids[j], float(scores[j])) for j in _top(scores, limit) if scores[j] > 0]
+
+    def recommend(self, user_id: UUID, limit: int = 10, neighbors: int = 50) -> List[Tuple[int, float]]:
+        """
+        Pokémon owned by the nearest collectors, weighted by their similarity,
+        that `user_id` does not own yet.
+        """
+        scores = self.jaccard(user_id)
+        if scores is None or not len(scores):
+            return []
+        nearest = np.array([j for j in _top(scores, neighbors) if scores[j] > 0], dtype=np.intp)
+        if not len(nearest):
+            return []
+
+        def unpack(columns: np.ndarray) -> np.ndarray:
+            rows = np.ascontiguousarray(columns.T)
+            return np.unpackbits(rows.view(np.uint8), axis=-1, bitorder="little")[..., :MAX_POKEMON_ID + 1]
+
+        votes = scores[nearest] @ unpack(self._words[:, nearest]).astype(np.float32)
+        votes[unpack(self._words[:, [self._index[user_id]]])[0].astype(bool)] = 0.0
+
+        return [(int(pokemon_id), float(votes[pokemon_id])) for pokemon_id in _top(votes, limit) if votes[pokemon_id] > 0]
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
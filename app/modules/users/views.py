@@ -0,0 +1,70 @@
+"""
+Read-only user views for list and search endpoints.
+
+Rows are mapped straight from the query into slotted objects, without ORM
+instances, identity map or pydantic re-validation. Collections keep the
+Pokémon ids as an array of unsigned shorts (2 bytes each) next to a tuple
+of the names each user stored, interned so repeated names are shared.
+"""
+import json
+from array import array
+from datetime import datetime, timezone
+from sys import intern
+from typing import Iterable, List, Optional
+
+USER_VIEW_COLUMNS = (
+    "id", "email", "username", "gender", "is_active", "is_superuser", "pokemons", "created_at", "updated_at"
+)
+
+
+def _json_datetime(value: Optional[datetime]) -> str:
+    if value is None:
+        return "null"
+    # Same format pydantic uses for UserResponse
+    text = value.isoformat()
+    if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+        text = text[:-6] + "Z"
+    return f'"{text}"'
+
+
+class UserView:
+    __slots__ = (
+        "id", "email", "username", "gender", "is_active", "is_superuser", "pokemon_ids", "pokemon_names", "created_at",
+        "updated_at"
+    )
+
+    def __init__(self, id, email, username, gender, is_active, is_superuser, pokemons, created_at, updated_at):
+        self.id = id
+        self.email = email
+        self.username = username
+        self.gender = gender
+        self.is_active = is_active
+        self.is_superuser = is_superuser
+        pokemons = pokemons or ()
+        self.pokemon_ids = array("H", (pokemon["id"] for pokemon in pokemons))
+        self.pokemon_names = tuple(intern(pokemon["name"]) for pokemon in pokemons)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def pokemons(self) -> List[dict]:
+        return [{"id": pokemon_id, "name": name} for pokemon_id, name in zip(self.pokemon_ids, self.pokemon_names)]
+
+    def to_json(self) -> str:
+        dumps = json.dumps
+        pokemons = ",".join(
+            f'{{"id":{pokemon_id},"name":{dumps(name)}}}' for pokemon_id, name in zip(self.pokemon_ids, self.pokemon_names)
+        )
+        return (
+            f'{{"email":{dumps(self.email)},"username":{dumps(self.username)},"gender":{dumps(self.gender)},'
+            f'"id":"{self.id}","is_active":{dumps(bool(self.is_active))},"is_superuser":{dumps(bool(self.is_superuser))},'
+            f'"pokemons":[{pokemons}],'
+            f'"created_at":{_json_datetime(self.created_at)},"updated_at":{_json_datetime(self.updated_at)}}}'
+        )
+
+
+def render_users(views: Iterable[UserView]) -> bytes:
+    """
+    JSON array of UserResponse documents, written directly from the views.
+    """
+    return ("[" + ",".join(view.to_json() for view in views) + "]").encode()
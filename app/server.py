@@ -0,0 +1,110 @@
+"""
+Production launcher.
+
+    python -m app.server
+
+Runs the app under gunicorn with uvicorn workers:
+- worker count from WEB_CONCURRENCY or the CPU cores
+- uvloop event loop and httptools HTTP parser
+- workers recycled after MAX_REQUESTS (+ jitter) requests to cap memory growth
+- app preloaded in the master so workers share its pages (copy-on-write)
+- per-worker DB pool sized from DB_CONNECTION_BUDGET so scaling workers
+  never exceeds the connections Postgres allows, the LISTEN connection of
+  each worker included; startup fails when the budget cannot cover the workers
+"""
+import logging
+import os
+from typing import Optional, Tuple
+
+from gunicorn.app.base import BaseApplication
+from sqlalchemy.engine import make_url
+from uvicorn_worker import UvicornWorker
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProductionWorker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    if configured:
+        return configured
+    return os.cpu_count() or 1
+
+
+def pool_sizes(workers: int, connection_budget: int, reserved: int = 0) -> Tuple[int, int]:
+    """
+    Split a global connection budget between workers.
+    `reserved` connections per worker are kept out of the pool (e.g. the
+    invalidation listener). Returns (pool_size, max_overflow) per worker: half
+    of the share kept open, the other half only opened under bursts.
+    """
+    per_worker = connection_budget // workers - reserved
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={connection_budget} cannot cover {workers} workers "
+            f"with {reserved + 1} connections each, lower WEB_CONCURRENCY or raise the budget"
+        )
+    pool_size = max(1, per_worker // 2)
+    return pool_size, per_worker - pool_size
+
+
+def post_fork(server, worker):
+    # Connections must not be shared between processes, drop any inherited from the master
+    from app.core.database import engine_created, get_engine
+    if engine_created():
+        get_engine().dispose(close=False)
+
+
+class ProductionServer(BaseApplication):
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def build_options(settings) -> dict:
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": worker_count(settings.WEB_CONCURRENCY),
+        "worker_class": "app.server.ProductionWorker",
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "preload_app": True,
+        "post_fork": post_fork,
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    options = build_options(settings)
+
+    if settings.DB_CONNECTION_BUDGET:
+        # Each worker keeps one connection in LISTEN for cache invalidation, PostgreSQL only
+        listeners = 1 if make_url(settings.DATABASE_URL).get_backend_name() == "postgresql" else 0
+        pool_size, max_overflow = pool_sizes(options["workers"], settings.DB_CONNECTION_BUDGET, reserved=listeners)
+        # Set before the app (and its engine) is loaded, workers inherit it on fork
+        settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = pool_size, max_overflow
+
+    logger.info(
+        "Starting %s workers on %s, DB pool %s+%s per worker",
+        options["workers"], options["bind"], settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    )
+    ProductionServer(options).run()
+
+
+if __name__ == "__main__":
+    main()
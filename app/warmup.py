@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import get_engine
+from app.core.security import get_password_hash
+from app.modules.pokemon.service import PokeAPIService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def warm_database(connections: int) -> None:
+    """
+    Open `connections` pool connections at once and return them to the pool,
+    so the first requests find them established.
+    """
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_pokeapi(pokemon_ids) -> None:
+    """
+    Resolve and connect to PokeAPI through the shared client, then load the
+    catalog and the hottest Pokémon into cache.
+    """
+    service = PokeAPIService()
+    await asyncio.gather(
+        service.get_catalog(),
+        *(service.get_pokemon(pokemon_id) for pokemon_id in pokemon_ids)
+    )
+
+
+def warm_hasher() -> None:
+    # First Argon2 hash allocates its memory blocks
+    get_password_hash("warmup-password")
+
+
+async def _run(name: str, step) -> None:
+    try:
+        await step
+    except Exception as e:
+        # A failed step leaves that dependency cold, the worker can still serve
+        logger.warning("Warmup step %s failed: %s", name, e)
+
+
+async def warmup(app: FastAPI) -> None:
+    """
+    Warm the DB pool, the PokeAPI client and cache and the password hasher,
+    then mark the worker ready for /health.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    steps = {
+        "database": run_in_threadpool(warm_database, min(settings.WARMUP_DB_CONNECTIONS, settings.DB_POOL_SIZE)),
+        "pokeapi": warm_pokeapi(settings.WARMUP_POKEMON_IDS),
+        "hasher": run_in_threadpool(warm_hasher),
+    }
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(_run(name, step) for name, step in steps.items())),
+            timeout=settings.WARMUP_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Warmup did not finish in %ss", settings.WARMUP_TIMEOUT_SECONDS)
+
+    app.state.ready = True
+    logger.info("Warmup finished in %.0f ms", (loop.time() - start) * 1000)
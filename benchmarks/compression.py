@@ -0,0 +1,106 @@
+"""
+CPU / bandwidth trade-off of the response encodings.
+
+Usage:
+    python -m benchmarks.compression [--runs 50] [--output compression.json]
+
+For every sample payload and compression level it reports the compressed size,
+the ratio and the median time to compress, as JSON.
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from app.core.compression import brotli, compress
+
+
+def user_list_payload(count: int = 100) -> bytes:
+    now = datetime.now().isoformat()
+    users = [
+        {
+            "email": f"user{i}@example.com",
+            "username": f"user_{i}",
+            "gender": None,
+            "id": str(uuid.uuid4()),
+            "is_active": True,
+            "is_superuser": False,
+            "pokemons": [{"id": p, "name": f"pokemon-{p}"} for p in range(1, 1 + i % 20)],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+    return json.dumps(users).encode()
+
+
+def catalog_payload(count: int = 1025) -> bytes:
+    return json.dumps(
+        [{"id": i, "name": f"pokemon-{i}"} for i in range(1, count + 1)],
+        separators=(",", ":")
+    ).encode()
+
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 11],
+}
+
+
+def measure(body: bytes, encoding: str, level: int, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if encoding == "gzip":
+            compressed = compress(body, encoding, gzip_level=level)
+        else:
+            compressed = compress(body, encoding, brotli_quality=level)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "encoding": encoding,
+        "level": level,
+        "size": len(compressed),
+        "ratio": round(len(body) / len(compressed), 2),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def run(runs: int) -> dict:
+    payloads = {
+        "users_100": user_list_payload(),
+        "catalog_1025": catalog_payload(),
+    }
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    return {
+        name: {
+            "identity_size": len(body),
+            "results": [
+                measure(body, encoding, level, runs)
+                for encoding in encodings
+                for level in LEVELS[encoding]
+            ],
+        }
+        for name, body in payloads.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--output", help="Write the report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.runs), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Local stand-in for PokeAPI used by the benchmarks.
+
+Serves the payloads from MOCK_POKEMON_DATA (tests/fixtures.py) and synthesizes
+the rest of the 1..1025 range from them, with configurable latency and error rate.
+
+Usage:
+    python -m benchmarks.fake_pokeapi [--port 8100] [--latency-ms 20] [--error-rate 0.01]
+"""
+import argparse
+import asyncio
+import copy
+import random
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from tests.fixtures import MOCK_POKEMON_DATA
+
+MAX_POKEMON_ID = 1025
+_TEMPLATES = list(MOCK_POKEMON_DATA.values())
+_BY_ID = {data["id"]: data for data in _TEMPLATES}
+
+
+def pokemon_payload(pokemon_id: int) -> dict:
+    if pokemon_id in _BY_ID:
+        return _BY_ID[pokemon_id]
+
+    payload = copy.deepcopy(_TEMPLATES[pokemon_id % len(_TEMPLATES)])
+    payload["id"] = pokemon_id
+    payload["name"] = f"pokemon-{pokemon_id}"
+    return payload
+
+
+def pokemon_name(pokemon_id: int) -> str:
+    return _BY_ID[pokemon_id]["name"] if pokemon_id in _BY_ID else f"pokemon-{pokemon_id}"
+
+
+_BY_NAME = {pokemon_name(i): i for i in range(1, MAX_POKEMON_ID + 1)}
+
+
+def create_app(base_url: str, latency_ms: float = 0.0, error_rate: float = 0.0) -> Starlette:
+
+    async def simulate_upstream():
+        if latency_ms:
+            # Jitter of +-25% around the configured latency
+            await asyncio.sleep(latency_ms / 1000 * random.uniform(0.75, 1.25))
+        if error_rate and random.random() < error_rate:
+            return JSONResponse({"detail": "Upstream error"}, status_code=503)
+        return None
+
+    async def catalog(request: Request):
+        error = await simulate_upstream()
+        if error:
+            return error
+
+        limit = int(request.query_params.get("limit", 20))
+        offset = int(request.query_params.get("offset", 0))
+        ids = range(offset + 1, min(offset + limit, MAX_POKEMON_ID) + 1)
+        return JSONResponse({
+            "count": MAX_POKEMON_ID,
+            "results": [
+                {"name": pokemon_name(i), "url": f"{base_url}/pokemon/{i}/"}
+                for i in ids
+            ]
+        })
+
+    async def pokemon(request: Request):
+        error = await simulate_upstream()
+        if error:
+            return error
+
+        key = request.path_params["key"].lower()
+        pokemon_id = int(key) if key.isdigit() else _BY_NAME.get(key)
+        if pokemon_id is None or not 1 <= pokemon_id <= MAX_POKEMON_ID:
+            return JSONResponse({"detail": "Not found"}, status_code=404)
+        return JSONResponse(pokemon_payload(pokemon_id))
+
+    return Starlette(routes=[
+        Route("/pokemon", catalog),
+        Route("/pokemon/{key}", pokemon),
+        Route("/pokemon/{key}/", pokemon),
+    ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(f"http://{args.host}:{args.port}", args.latency_ms, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Load test of the user facing routes of the API.
+
+Boots the app against a local database and a local fake PokeAPI
+(benchmarks/fake_pokeapi.py), drives a weighted mix of scenarios at the given
+concurrency and reports RPS and p50/p95/p99 latency per route as JSON.
+
+Usage:
+    python -m benchmarks.load --duration 30 --concurrency 50 --output load.json
+    python -m benchmarks.load --compare load.json --threshold 10
+
+Scenarios (weights set with --mix "login=1,collection=2,list=3,pokemon=4,profile=1,account=1"):
+    login       POST /auth/login then GET /auth/me
+    collection  add and remove a Pokémon from the user's collection
+    list        list, search and fetch users
+    pokemon     Pokémon lookups by id and by name, catalog
+    profile     update the user and replace its collection
+    account     register, log in and delete a throwaway user
+
+Not covered: the superuser routes (activate, deactivate) and /users/statistics.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+import httpx
+
+API = "/api/v1"
+PASSWORD = "benchpassword123"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def wait_until_up(url: str, timeout: float = 60.0):
+    """
+    Poll until `url` answers 200: /health answers 503 until the warmup is done.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up in {timeout}s")
+
+
+@contextmanager
+def run_services(args):
+    """
+    Start the fake PokeAPI and the app as subprocesses, yield the app url.
+    """
+    pokeapi_port, app_port = free_port(), free_port()
+    pokeapi_url = f"http://127.0.0.1:{pokeapi_port}"
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "API_POKEMON": pokeapi_url,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key"),
+    }
+
+    subprocess.run(
+        # Importing the app registers every model on Base.metadata
+        [sys.executable, "-c", "import app.main; from app.core.database import create_tables; create_tables()"],
+        env=env, check=True
+    )
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_pokeapi", "--port", str(pokeapi_port),
+             "--latency-ms", str(args.pokeapi_latency_ms), "--error-rate", str(args.pokeapi_error_rate)],
+            env=env
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port),
+             "--log-level", "warning", "--no-access-log"],
+            env=env
+        ),
+    ]
+    try:
+        wait_until_up(f"{pokeapi_url}/pokemon/1")
+        wait_until_up(f"http://127.0.0.1:{app_port}/health")
+        yield f"http://127.0.0.1:{app_port}"
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, method: str, route: str, url: str, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        key = f"{method} {route}"
+        self.latencies[key].append(time.perf_counter() - start)
+        if response is None or response.status_code not in expected:
+            self.errors[key] += 1
+        return response
+
+
+class VirtualUser:
+
+    def __init__(self, index: int, recorder: Recorder):
+        self.email = f"bench{index}@example.com"
+        self.username = f"bench_{index}"
+        self.recorder = recorder
+        self.user_id = None
+        self.headers = {}
+
+    async def setup(self, client: httpx.AsyncClient):
+        response = await client.post(f"{API}/users/register", json={
+            "email": self.email, "username": self.username, "password": PASSWORD
+        })
+        if response.status_code == 201:
+            self.user_id = response.json()["id"]
+        await self.login(client)
+
+    async def login(self, client: httpx.AsyncClient):
+        response = await self.recorder.call(
+            client, "POST", "/auth/login", f"{API}/auth/login",
+            json={"email": self.email, "password": PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        if self.user_id is None and self.headers:
+            me = await client.get(f"{API}/auth/me", headers=self.headers)
+            self.user_id = me.json()["id"]
+
+    async def scenario_login(self, client):
+        await self.login(client)
+        await self.recorder.call(client, "GET", "/auth/me", f"{API}/auth/me", headers=self.headers)
+
+    async def scenario_collection(self, client):
+        pokemon_id = random.randint(1, 1025)
+        await self.recorder.call(
+            client, "POST", "/users/{id}/pokemons/{pokemon_id}",
+            f"{API}/users/{self.user_id}/pokemons/{pokemon_id}",
+            expected=(200, 400), headers=self.headers
+        )
+        await self.recorder.call(
+            client, "GET", "/users/{id}/pokemons", f"{API}/users/{self.user_id}/pokemons", headers=self.headers
+        )
+        await self.recorder.call(
+            client, "DELETE", "/users/{id}/pokemons/{pokemon_id}",
+            f"{API}/users/{self.user_id}/pokemons/{pokemon_id}",
+            expected=(200, 404), headers=self.headers
+        )
+
+    async def scenario_list(self, client):
+        await self.recorder.call(client, "GET", "/users/", f"{API}/users/?limit=50", headers=self.headers)
+        await self.recorder.call(client, "GET", "/users/search/", f"{API}/users/search/?q=bench", headers=self.headers)
+        await self.recorder.call(client, "GET", "/users/{id}", f"{API}/users/{self.user_id}", headers=self.headers)
+
+    async def scenario_pokemon(self, client):
+        await self.recorder.call(client, "GET", "/pokemon/{id}", f"{API}/pokemon/{random.randint(1, 1025)}")
+        await self.recorder.call(client, "GET", "/pokemon/name/{name}", f"{API}/pokemon/name/pikachu")
+        await self.recorder.call(client, "GET", "/pokemon/", f"{API}/pokemon/")
+
+    async def scenario_profile(self, client):
+        await self.recorder.call(
+            client, "PUT", "/users/{id}", f"{API}/users/{self.user_id}",
+            json={"gender": random.choice(["female", "male"])}, headers=self.headers
+        )
+        pokemons = [{"id": i, "name": f"pokemon-{i}"} for i in random.sample(range(1, 1026), 5)]
+        await self.recorder.call(
+            client, "PUT", "/users/{id}/pokemons", f"{API}/users/{self.user_id}/pokemons",
+            json=pokemons, headers=self.headers
+        )
+
+    async def scenario_account(self, client):
+        suffix = uuid.uuid4().hex[:12]
+        email = f"throwaway_{suffix}@example.com"
+        response = await self.recorder.call(
+            client, "POST", "/users/register", f"{API}/users/register", expected=(201,),
+            json={"email": email, "username": f"throwaway_{suffix}", "password": PASSWORD}
+        )
+        if response is None or response.status_code != 201:
+            return
+        user_id = response.json()["id"]
+
+        response = await self.recorder.call(
+            client, "POST", "/auth/login", f"{API}/auth/login", json={"email": email, "password": PASSWORD}
+        )
+        if response is None or response.status_code != 200:
+            return
+        await self.recorder.call(
+            client, "DELETE", "/users/{id}", f"{API}/users/{user_id}", expected=(204,),
+            headers={"Authorization": f"Bearer {response.json()['access_token']}"}
+        )
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+async def drive(base_url: str, args) -> dict:
+    recorder = Recorder()
+    weights = parse_mix(args.mix)
+    scenarios, scenario_weights = list(weights), list(weights.values())
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        users = [VirtualUser(i, recorder) for i in range(args.concurrency)]
+        for user in users:
+            await user.setup(client)
+
+        # Setup traffic is not part of the measurement
+        recorder.latencies.clear()
+        recorder.errors.clear()
+
+        deadline = time.monotonic() + args.duration
+
+        async def worker(user: VirtualUser):
+            while time.monotonic() < deadline:
+                scenario = random.choices(scenarios, scenario_weights)[0]
+                await getattr(user, f"scenario_{scenario}")(client)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(user) for user in users))
+        elapsed = time.perf_counter() - start
+
+    return summarize(recorder, elapsed)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def route_stats(latencies: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    routes = {
+        route: route_stats(latencies, recorder.errors[route], elapsed)
+        for route, latencies in sorted(recorder.latencies.items())
+    }
+    every = [value for latencies in recorder.latencies.values() for value in latencies]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": route_stats(every, sum(recorder.errors.values()), elapsed) if every else {},
+        "routes": routes,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Return the regressions (p95 latency up or RPS down more than `threshold` percent).
+    """
+    regressions = []
+    for route, stats in current["routes"].items():
+        base = baseline.get("routes", {}).get(route)
+        if not base:
+            continue
+        if base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + threshold / 100):
+            regressions.append(f"{route}: p95 {base['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if base["rps"] and stats["rps"] < base["rps"] * (1 - threshold / 100):
+            regressions.append(f"{route}: rps {base['rps']} -> {stats['rps']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of measured load")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--mix", default="login=1,collection=2,list=3,pokemon=4,profile=1,account=1")
+    parser.add_argument("--database-url", default=f"sqlite:///{tempfile.gettempdir()}/benchmark_load.db")
+    parser.add_argument("--pokeapi-latency-ms", type=float, default=20.0)
+    parser.add_argument("--pokeapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the report to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    with run_services(args) as base_url:
+        results = asyncio.run(drive(base_url, args))
+
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": parse_mix(args.mix),
+            "pokeapi_latency_ms": args.pokeapi_latency_ms,
+            "pokeapi_error_rate": args.pokeapi_error_rate,
+        },
+        **results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
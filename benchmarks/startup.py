@@ -0,0 +1,93 @@
+"""
+Cold start profile of the app.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--top 25] [--budget-ms 1500]
+
+Imports `app.main` in fresh interpreters with `-X importtime` and reports, as JSON,
+the median wall time of the import and the modules with the highest cumulative
+import time. With --budget-ms the run fails when the median is over budget.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+SNIPPET = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+
+def import_once() -> tuple[float, str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(report: str) -> List[dict]:
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time:   self [us] | cumulative | module" (module indented by depth)
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def profile(runs: int, top: int) -> dict:
+    # First run warms the bytecode cache, it is not measured
+    import_once()
+
+    timings, report = [], ""
+    for _ in range(runs):
+        elapsed, report = import_once()
+        timings.append(elapsed * 1000)
+
+    modules = sorted(parse_importtime(report), key=lambda m: m["cumulative_ms"], reverse=True)
+    app_modules = [m for m in modules if m["module"].startswith("app.")]
+    return {
+        "runs": runs,
+        "import_ms": {
+            "median": round(statistics.median(timings), 1),
+            "min": round(min(timings), 1),
+            "max": round(max(timings), 1),
+        },
+        "top_modules": modules[:top],
+        "app_modules": app_modules[:top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median import time is above this")
+    parser.add_argument("--output", help="Write the report to this file instead of stdout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = profile(args.runs, args.top)
+    report["profile_s"] = round(time.perf_counter() - start, 2)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.budget_ms and report["import_ms"]["median"] > args.budget_ms:
+        print(f"Startup over budget: {report['import_ms']['median']}ms > {args.budget_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# Micro-benchmarks (tests/benchmarks), baselines are stored in .benchmarks/
+#   ./run_benchmarks.sh save      -> record a new baseline
+#   ./run_benchmarks.sh compare   -> compare with the latest baseline, fails on a mean regression above 15%
+
+MODE=${1:-compare}
+THRESHOLD=${BENCHMARK_THRESHOLD:-15%}
+
+if [ "$MODE" = "save" ]; then
+    pytest tests/benchmarks --benchmark-only --benchmark-autosave --benchmark-min-rounds=20
+else
+    pytest tests/benchmarks --benchmark-only --benchmark-min-rounds=20 \
+        --benchmark-compare --benchmark-compare-fail=mean:$THRESHOLD
+fi
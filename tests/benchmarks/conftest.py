@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from uuid import uuid4
+
+from app.core.security import get_password_hash
+from app.modules.users.models import User
+
+
+# Hash once, the benchmarks build thousands of users
+BENCHMARK_PASSWORD_HASH = get_password_hash("password123")
+
+
+def pytest_collection_modifyitems(config, items):
+  """ Benchmarks only run with --benchmark-only, they are slow for the regular suite """
+  if config.getoption("benchmark_only"):
+    return
+
+  skip = pytest.mark.skip(reason="Benchmarks run with --benchmark-only")
+  for item in items:
+    if "tests/benchmarks" in item.nodeid:
+      item.add_marker(skip)
+
+
+@pytest.fixture(scope="function")
+def event_loop_runner():
+  """ Runs coroutines on a single loop so the loop setup is not measured """
+  loop = asyncio.new_event_loop()
+  yield loop.run_until_complete
+  loop.close()
+
+
+def make_user(index: int, pokemons_count: int = 0) -> User:
+  return User(
+    id=uuid4(),
+    email=f"bench{index}@example.com",
+    username=f"bench_user_{index}",
+    hashed_password=BENCHMARK_PASSWORD_HASH,
+    pokemons=[{"id": i, "name": f"pokemon-{i}"} for i in range(1, pokemons_count + 1)],
+    is_active=True,
+    is_superuser=False
+  )
@@ -0,0 +1,40 @@
+from uuid import uuid4
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.security import _token_cache, create_access_token, verify_token
+from app.modules.auth.dependencies import get_current_user
+
+
+def test_create_access_token(benchmark):
+  token = benchmark(create_access_token, {"sub": str(uuid4())})
+  assert token.count(".") == 2
+
+
+def test_verify_token(benchmark):
+  token = create_access_token({"sub": str(uuid4())})
+  payload = benchmark(verify_token, token)
+  assert "sub" in payload
+
+
+def test_get_current_user(benchmark, db_session, test_user, event_loop_runner):
+  db_session.add(test_user)
+  db_session.commit()
+
+  credentials = HTTPAuthorizationCredentials(
+    scheme="Bearer",
+    credentials=create_access_token({"sub": str(test_user.id)})
+  )
+
+  user = benchmark(lambda: event_loop_runner(get_current_user(credentials, db_session)))
+  assert user.id == test_user.id
+
+
+def test_verify_token_uncached(benchmark):
+  token = create_access_token({"sub": str(uuid4())})
+
+  def verify():
+    _token_cache.clear()
+    return verify_token(token)
+
+  payload = benchmark(verify)
+  assert "sub" in payload
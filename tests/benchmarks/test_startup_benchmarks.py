@@ -0,0 +1,16 @@
+import os
+from benchmarks.startup import import_once
+
+
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 2000))
+
+
+def test_startup_budget(benchmark):
+  timings = []
+
+  def cold_import():
+    elapsed, _ = import_once()
+    timings.append(elapsed * 1000)
+
+  benchmark.pedantic(cold_import, rounds=3, iterations=1, warmup_rounds=1)
+  assert sorted(timings)[len(timings) // 2] < STARTUP_BUDGET_MS
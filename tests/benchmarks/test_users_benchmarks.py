@@ -0,0 +1,157 @@
+import pytest
+from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+
+from app.modules.pokemon.shemas import Pokemon
+from app.modules.users.models import User
+from app.modules.users.repository import UserRepository
+from app.modules.users.schemas import UserResponse
+from app.modules.users.views import UserView, render_users
+from .conftest import make_user
+
+
+@pytest.fixture(scope="function")
+def collection_user(db_session, users_service, monkeypatch):
+  """ User factory with a collection of the given size, PokeAPI answered locally """
+  async def get_pokemon(pokemon_id: int):
+    return {"id": pokemon_id, "name": f"pokemon-{pokemon_id}"}
+
+  monkeypatch.setattr(users_service.pokeapi_service, "get_pokemon", get_pokemon)
+
+  def factory(size: int) -> User:
+    user = make_user(0)
+    db_session.add(user)
+    db_session.commit()
+    reset_collection(users_service, user, size)
+    return user
+
+  return factory
+
+
+def reset_collection(users_service, user: User, size: int):
+  # Through the service, the owners index has to follow the collection
+  users_service.update_user_pokemons(user.id, [Pokemon(id=i, name=f"pokemon-{i}") for i in range(1, size + 1)])
+
+
+@pytest.mark.parametrize("size", [10, 100, 1000])
+def test_add_pokemon_to_user(benchmark, users_service, collection_user, event_loop_runner, size):
+  user = collection_user(size)
+
+  benchmark.pedantic(
+    lambda: event_loop_runner(users_service.add_pokemon_to_user(user.id, size + 1)),
+    setup=lambda: reset_collection(users_service, user, size),
+    rounds=50
+  )
+  assert len(user.pokemons) == size + 1
+
+
+@pytest.mark.parametrize("size", [10, 100, 1000])
+def test_remove_pokemon_from_user(benchmark, users_service, collection_user, size):
+  user = collection_user(size)
+
+  benchmark.pedantic(
+    lambda: users_service.remove_pokemon_from_user(user.id, size),
+    setup=lambda: reset_collection(users_service, user, size),
+    rounds=50
+  )
+  assert len(user.pokemons) == size - 1
+
+
+def test_user_response_serialization(benchmark):
+  now = datetime.now()
+  users = [make_user(i, 20) for i in range(100)]
+  for user in users:
+    user.created_at = user.updated_at = now
+  adapter = TypeAdapter(List[UserResponse])
+
+  body = benchmark(lambda: adapter.dump_json(adapter.validate_python(users, from_attributes=True)))
+  assert body.startswith(b"[")
+
+
+def test_user_view_serialization(benchmark):
+  now = datetime.now()
+  views = [
+    UserView(user.id, user.email, user.username, None, True, False, user.pokemons, now, now)
+    for user in (make_user(i, 20) for i in range(100))
+  ]
+
+  body = benchmark(render_users, views)
+  assert body.startswith(b"[")
+
+
+def list_users_orm(db_session, limit):
+  adapter = TypeAdapter(List[UserResponse])
+  users = UserRepository(db_session).get_all(0, limit)
+  return users, adapter.dump_json(adapter.validate_python(users, from_attributes=True))
+
+
+def list_users_views(db_session, limit):
+  views = UserRepository(db_session).get_views(0, limit)
+  return views, render_users(views)
+
+
+@pytest.mark.parametrize("path", [list_users_orm, list_users_views], ids=["orm", "views"])
+def test_list_users_memory(benchmark, db_session, path):
+  """ Peak allocations and retained memory of a 10k users page, reported in extra_info """
+  import tracemalloc
+
+  db_session.bulk_save_objects([make_user(i, 20) for i in range(10_000)])
+  db_session.commit()
+
+  def run():
+    db_session.expunge_all()
+    tracemalloc.start()
+    loaded, body = path(db_session, 10_000)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    benchmark.extra_info["peak_mib"] = round(peak / 2**20, 1)
+    benchmark.extra_info["retained_mib"] = round(retained / 2**20, 1)
+    return loaded
+
+  loaded = benchmark.pedantic(run, rounds=3)
+  assert len(loaded) == 10_000
+
+
+@pytest.mark.parametrize("rows", [10_000, 100_000])
+def test_search_by_name(benchmark, db_session, rows):
+  db_session.bulk_save_objects([make_user(i) for i in range(rows)])
+  db_session.commit()
+  repository = UserRepository(db_session)
+
+  result = benchmark(repository.search_by_name, "user_99", 0, 100)
+  assert len(result) > 0
+
+
+@pytest.mark.parametrize("users", [100_000, 1_000_000])
+def test_similarity_query(benchmark, users):
+  """ Nearest collectors over the whole matrix, target under 50 ms at 1M users """
+  import numpy as np
+  from uuid import uuid4
+  from app.modules.users.similarity import CollectionMatrix
+
+  rng = np.random.default_rng(0)
+  bits = np.zeros((users, 129), dtype=np.uint8)
+  rows = np.arange(users)
+  for pokemon_ids in rng.integers(1, 1026, size=(30, users)):
+    np.bitwise_or.at(bits, (rows, pokemon_ids >> 3), (1 << (pokemon_ids & 7)).astype(np.uint8))
+
+  matrix = CollectionMatrix()
+  user_ids = [uuid4() for _ in range(users)]
+  matrix.load(zip(user_ids, (row.tobytes() for row in bits)))
+
+  similar = benchmark(matrix.similar, user_ids[0], 10)
+  assert len(similar) == 10
+
+
+@pytest.mark.parametrize("size", [100, 1000])
+def test_collection_analysis(benchmark, size):
+  """ Type coverage of a collection, matrix products instead of per member loops """
+  import random
+  from app.modules.pokemon.types import TYPE_NAMES, analyze
+
+  rng = random.Random(0)
+  members = [tuple(rng.sample(TYPE_NAMES, rng.choice((1, 2)))) for _ in range(size)]
+
+  analysis = benchmark(analyze, members)
+  assert sum(matchup["weak"] > 0 for matchup in analysis["defensive_coverage"]) > 0
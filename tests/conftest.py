@@ -21,151 +21,70 @@ from app.modules.pokemon.service import PokeAPIService
 from app.modules.users.models import User
 from app.modules.users.service import UserService
 from app.rate_limiting import limiter
+from tests.fixtures import MOCK_POKEMON_DATA
 
 settings = get_settings()
+# Tests drive the app without a lifespan, it is ready from the start
+settings.WARMUP_ENABLED = False
 
 
-MOCK_POKEMON_DATA = {
-    "pikachu": {
-        "id": 25,
-        "name": "pikachu",
-        "height": 4,
-        "weight": 60,
-        "base_experience": 112,
-        "types": [
-            {
-                "slot": 1,
-                "type": {
-                    "name": "electric",
-                    "url": "https://pokeapi.co/api/v2/type/13/"
-                }
-            }
-        ],
-        "sprites": {
-            "front_default": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/25.png",
-            "front_shiny": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/shiny/25.png"
-        },
-        "abilities": [
-            {
-                "ability": {
-                    "name": "static",
-                    "url": "https://pokeapi.co/api/v2/ability/9/"
-                },
-                "is_hidden": False,
-                "slot": 1
-            },
-            {
-                "ability": {
-                    "name": "lightning-rod",
-                    "url": "https://pokeapi.co/api/v2/ability/31/"
-                },
-                "is_hidden": True,
-                "slot": 3
-            }
-        ],
-        "stats": [
-            {"base_stat": 35, "stat": {"name": "hp"}},
-            {"base_stat": 55, "stat": {"name": "attack"}},
-            {"base_stat": 40, "stat": {"name": "defense"}},
-            {"base_stat": 50, "stat": {"name": "special-attack"}},
-            {"base_stat": 50, "stat": {"name": "special-defense"}},
-            {"base_stat": 90, "stat": {"name": "speed"}}
-        ]
-    },
-    "charizard": {
-        "id": 6,
-        "name": "charizard",
-        "height": 17,
-        "weight": 905,
-        "base_experience": 267,
-        "types": [
-            {
-                "slot": 1,
-                "type": {
-                    "name": "fire",
-                    "url": "https://pokeapi.co/api/v2/type/10/"
-                }
-            },
-            {
-                "slot": 2,
-                "type": {
-                    "name": "flying",
-                    "url": "https://pokeapi.co/api/v2/type/3/"
-                }
-            }
-        ],
-        "sprites": {
-            "front_default": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/6.png"
-        },
-        "abilities": [
-            {
-                "ability": {
-                    "name": "blaze",
-                    "url": "https://pokeapi.co/api/v2/ability/66/"
-                },
-                "is_hidden": False,
-                "slot": 1
-            }
-        ],
-        "stats": [
-            {"base_stat": 78, "stat": {"name": "hp"}},
-            {"base_stat": 84, "stat": {"name": "attack"}},
-            {"base_stat": 78, "stat": {"name": "defense"}},
-            {"base_stat": 109, "stat": {"name": "special-attack"}},
-            {"base_stat": 85, "stat": {"name": "special-defense"}},
-            {"base_stat": 100, "stat": {"name": "speed"}}
-        ]
-    },
-    "bulbasaur": {
-        "id": 1,
-        "name": "bulbasaur",
-        "height": 7,
-        "weight": 69,
-        "base_experience": 64,
-        "types": [
-            {
-                "slot": 1,
-                "type": {
-                    "name": "grass",
-                    "url": "https://pokeapi.co/api/v2/type/12/"
-                }
-            },
-            {
-                "slot": 2,
-                "type": {
-                    "name": "poison",
-                    "url": "https://pokeapi.co/api/v2/type/4/"
-                }
-            }
-        ],
-        "sprites": {
-            "front_default": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/1.png"
-        },
-        "abilities": [
-            {
-                "ability": {
-                    "name": "overgrow",
-                    "url": "https://pokeapi.co/api/v2/ability/65/"
-                },
-                "is_hidden": False,
-                "slot": 1
-            }
-        ],
-        "stats": [
-            {"base_stat": 45, "stat": {"name": "hp"}},
-            {"base_stat": 49, "stat": {"name": "attack"}},
-            {"base_stat": 49, "stat": {"name": "defense"}},
-            {"base_stat": 65, "stat": {"name": "special-attack"}},
-            {"base_stat": 65, "stat": {"name": "special-defense"}},
-            {"base_stat": 45, "stat": {"name": "speed"}}
-        ]
+MOCK_POKEMON_CATALOG = {
+    "count": len(MOCK_POKEMON_DATA),
+    "results": [
+        {"name": name, "url": f"https://pokeapi.co/api/v2/pokemon/{data['id']}/"}
+        for name, data in MOCK_POKEMON_DATA.items()
+    ]
+}
+
+
+def _species(pokemon_id: int, name: str) -> dict:
+    return {"name": name, "url": f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"}
+
+
+MOCK_EVOLUTION_CHAINS = {
+    10: {
+        "id": 10,
+        "chain": {
+            "species": _species(172, "pichu"),
+            "evolution_details": [],
+            "evolves_to": [{
+                "species": _species(25, "pikachu"),
+                "evolution_details": [{"trigger": {"name": "level-up"}, "min_level": None, "item": None, "min_happiness": 220}],
+                "evolves_to": [{
+                    "species": _species(26, "raichu"),
+                    "evolution_details": [{"trigger": {"name": "use-item"}, "min_level": None, "item": {"name": "thunder-stone"}}],
+                    "evolves_to": []
+                }]
+            }]
+        }
     }
 }
 
+MOCK_POKEMON_SPECIES = {
+    pokemon_id: {
+        "id": pokemon_id,
+        "name": name,
+        "evolves_from_species": _species(*parent) if parent else None,
+        "evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/10/"}
+    }
+    for pokemon_id, name, parent in ((172, "pichu", None), (25, "pikachu", (172, "pichu")), (26, "raichu", (25, "pikachu")))
+}
+
+
 @pytest_asyncio.fixture(scope="function")
 async def mock_pokeapi():
     """ Mock automatico de PokeAPI usando respx. """
+    PokeAPIService._catalog_cache.clear()
+    PokeAPIService._pokemon_cache.clear()
+    for cache in (PokeAPIService._species_cache, PokeAPIService._chain_cache, PokeAPIService._chain_index):
+        cache.clear()
+    PokeAPIService.breaker.reset()
     async with respx.mock:
+        # Mock catalog listing
+        respx.get(url__regex=r"https://pokeapi\.co/api/v2/pokemon\?.*").mock(
+            return_value=httpx.Response(200, json=MOCK_POKEMON_CATALOG)
+        )
+
         # Mock for pokemon exists
         for pokemon_name, data in MOCK_POKEMON_DATA.items():
             # Mock pokemon by Name
@@ -177,6 +96,15 @@ async def mock_pokeapi():
                 return_value=httpx.Response(200, json=data)
             )
         
+        for pokemon_id, data in MOCK_POKEMON_SPECIES.items():
+            respx.get(f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}").mock(
+                return_value=httpx.Response(200, json=data)
+            )
+        for chain_id, data in MOCK_EVOLUTION_CHAINS.items():
+            respx.get(f"https://pokeapi.co/api/v2/evolution-chain/{chain_id}").mock(
+                return_value=httpx.Response(200, json=data)
+            )
+
         # Mock for pokemon not find
         respx.get(url__regex=r"https://pokeapi\.co/api/v2/pokemon/.*").mock(
             return_value=httpx.Response(404, json={"detail": "Not found"})
@@ -185,6 +113,55 @@ async def mock_pokeapi():
         yield
 
 
+# Smallest valid PNG (1x1 transparent pixel)
+SPRITE_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+@pytest.fixture(scope="function")
+def sprite_server(mock_pokeapi, tmp_path, monkeypatch):
+    """ Local stand-in for the sprite host, pikachu's sprites point at it. """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.core.file_cache import DiskCache
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if not self.path.endswith(".png"):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(SPRITE_PNG)))
+            self.end_headers()
+            self.wfile.write(SPRITE_PNG)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    respx.route(host="127.0.0.1").pass_through()
+    data = {**MOCK_POKEMON_DATA["pikachu"], "sprites": {
+        "front_default": f"{base_url}/25.png",
+        "back_default": f"{base_url}/missing",
+    }}
+    # Same pattern as the mock_pokeapi route, respx replaces it in place
+    respx.get("https://pokeapi.co/api/v2/pokemon/25").mock(return_value=httpx.Response(200, json=data))
+    monkeypatch.setattr(PokeAPIService, "_sprite_cache", DiskCache(str(tmp_path / "sprites"), 1024 * 1024))
+
+    yield hits
+    server.shutdown()
+    server.server_close()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
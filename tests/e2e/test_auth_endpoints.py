@@ -19,4 +19,59 @@ async def test_login(async_client, test_user):
 @pytest.mark.asyncio
 async def test_get_current_user(async_client, auth_headers):
     response = await async_client.get("/api/v1/auth/me", headers=auth_headers)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(async_client, test_user):
+    login_response = await async_client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": test_user.email,
+            "password": "password123"
+        }
+    )
+    refresh_token = login_response.json()["refresh_token"]
+
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    tokens = response.json()
+    assert tokens["refresh_token"] != refresh_token
+
+    me = await async_client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.status_code == 200
+
+    # A rotated refresh token cannot be used again
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+    # Refresh tokens are not access tokens
+    me = await async_client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert me.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_token_revoked(async_client, test_user, test_user_admin):
+    tokens = {}
+    for user in (test_user, test_user_admin):
+        response = await async_client.post(
+            "/api/v1/auth/login",
+            json={"email": user.email, "password": "password123"}
+        )
+        tokens[user.email] = response.json()
+    user_headers = {"Authorization": f"Bearer {tokens[test_user.email]['access_token']}"}
+    admin_headers = {"Authorization": f"Bearer {tokens[test_user_admin.email]['access_token']}"}
+
+    response = await async_client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    assert response.status_code == 200
+
+    response = await async_client.patch(f"/api/v1/users/{test_user.id}/deactivate", headers=admin_headers)
+    assert response.status_code == 200
+
+    response = await async_client.get(f"/api/v1/users/{test_user.id}", headers=user_headers)
+    assert response.status_code == 401
+
+    response = await async_client.post(
+        "/api/v1/auth/refresh",
+        json={"refresh_token": tokens[test_user.email]["refresh_token"]}
+    )
+    assert response.status_code == 401
@@ -14,4 +14,170 @@ async def test_get_pokemon(async_client, mock_pokeapi):
 async def test_get_pokemon_by_name(async_client, mock_pokeapi):
   response = await async_client.get(f"/api/v1/pokemon/name/bulbasaur")
   assert response.status_code == 200
-  assert response.json()['name'] == 'bulbasaur'
\ No newline at end of file
+  assert response.json()['name'] == 'bulbasaur'
+
+@pytest.mark.asyncio
+async def test_search_pokemon(async_client, mock_pokeapi):
+  response = await async_client.get("/api/v1/pokemon/search", params={"q": "char"})
+  assert response.status_code == 200
+  assert response.json()["matches"] == [{"id": 6, "name": "charizard"}]
+  assert response.json()["suggestions"] == []
+
+  response = await async_client.get("/api/v1/pokemon/search", params={"q": "bulbasuar"})
+  assert response.json()["matches"] == []
+  assert response.json()["suggestions"] == [{"id": 1, "name": "bulbasaur"}]
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_not_modified(async_client, mock_pokeapi):
+  response = await async_client.get("/api/v1/pokemon/25")
+  etag = response.headers['etag']
+  assert response.headers['cache-control'].startswith("public")
+
+  response = await async_client.get("/api/v1/pokemon/25", headers={"If-None-Match": etag})
+  assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_catalog_precompressed(async_client, mock_pokeapi):
+  response = await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "br"})
+  assert response.status_code == 200
+  assert response.headers['content-encoding'] == "br"
+  assert {"id": 25, "name": "pikachu"} in response.json()
+
+  response = await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "gzip"})
+  assert response.headers['content-encoding'] == "gzip"
+  assert len(response.json()) == 3
+
+  response = await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "identity"})
+  assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_etag_per_content_encoding(async_client, mock_pokeapi):
+  identity = (await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "identity"})).headers["etag"]
+  brotli = (await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "br"})).headers["etag"]
+  gzipped = (await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "gzip"})).headers["etag"]
+  assert len({identity, brotli, gzipped}) == 3
+  assert brotli == identity[:-1] + '-br"'
+
+  # Revalidating any variant still matches the representation
+  response = await async_client.get("/api/v1/pokemon/", headers={"Accept-Encoding": "br", "If-None-Match": gzipped})
+  assert response.status_code == 304
+  assert response.headers["etag"] == brotli
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_owners(async_client, mock_pokeapi, auth_headers):
+  user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+  await async_client.post(f"/api/v1/users/{user_id}/pokemons/25", headers=auth_headers)
+
+  response = await async_client.get("/api/v1/pokemon/25/owners", headers=auth_headers)
+  assert response.status_code == 200
+  body = response.json()
+  assert body["total"] == 1
+  assert body["owners"] == [{"id": user_id, "username": "Testtt"}]
+  assert body["next"] is None
+
+  response = await async_client.get("/api/v1/pokemon/25/owners")
+  assert response.status_code in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_endpoints(async_client, mock_pokeapi, auth_headers):
+  from app.modules.users.service import UserService
+
+  UserService._leaderboard_cache.clear()
+  user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+  await async_client.patch(f"/api/v1/users/{user_id}/pokemons", json={"add": [25, 6]}, headers=auth_headers)
+
+  response = await async_client.get("/api/v1/pokemon/leaderboard?limit=5", headers=auth_headers)
+  assert response.status_code == 200
+  assert [entry["id"] for entry in response.json()] == [6, 25]
+
+  # Derived from the users' collections, same access as the other user aggregates
+  response = await async_client.get("/api/v1/pokemon/leaderboard?limit=5")
+  assert response.status_code in (401, 403)
+
+  response = await async_client.get("/api/v1/users/top-collectors", headers=auth_headers)
+  assert response.status_code == 200
+  assert response.json()[0] == {"id": user_id, "username": "Testtt", "pokemon_count": 2}
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_details_projection(async_client, mock_pokeapi):
+  response = await async_client.get("/api/v1/pokemon/25/details", params={"fields": "types,stats"})
+  assert response.status_code == 200
+  assert response.json() == {
+    "id": 25,
+    "name": "pikachu",
+    "types": ["electric"],
+    "stats": {"hp": 35, "attack": 55, "defense": 40, "special-attack": 50, "special-defense": 50, "speed": 90}
+  }
+
+  response = await async_client.get("/api/v1/pokemon/25/details")
+  details = response.json()
+  assert details["abilities"] == [{"name": "static", "is_hidden": False}, {"name": "lightning-rod", "is_hidden": True}]
+  assert details["sprites"]["front_default"].endswith("/25.png")
+  assert details["weight"] == 60
+
+  response = await async_client.get("/api/v1/pokemon/25/details", params={"fields": "moves"})
+  assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_sprite_cached_on_disk(async_client, sprite_server):
+  import hashlib
+  import os
+  from tests.conftest import SPRITE_PNG
+
+  response = await async_client.get("/api/v1/pokemon/25/sprite")
+  assert response.status_code == 200
+  assert response.content == SPRITE_PNG
+  assert response.headers["content-type"] == "image/png"
+  assert response.headers["cache-control"].startswith("public")
+  etag = response.headers["etag"]
+  assert etag == f'"{hashlib.sha256(SPRITE_PNG).hexdigest()}"'
+
+  # Served from disk, the image server is not called again
+  response = await async_client.get("/api/v1/pokemon/25/sprite")
+  assert response.content == SPRITE_PNG
+  assert response.headers["etag"] == etag
+  assert sprite_server == ["/25.png"]
+
+  response = await async_client.get("/api/v1/pokemon/25/sprite", headers={"If-None-Match": etag})
+  assert response.status_code == 304
+
+  # Every pin is released once its response is sent
+  from app.modules.pokemon.service import PokeAPIService
+  assert os.listdir(os.path.join(PokeAPIService._sprite_cache.root, "pins")) == []
+
+  response = await async_client.get("/api/v1/pokemon/25/sprite", params={"variant": "back_default"})
+  assert response.status_code == 502
+  response = await async_client.get("/api/v1/pokemon/25/sprite", params={"variant": "front_female"})
+  assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_pokemon_evolution(async_client, mock_pokeapi):
+  import respx
+
+  response = await async_client.get("/api/v1/pokemon/25/evolution")
+  assert response.status_code == 200
+  chain = response.json()
+  assert chain["id"] == 10
+  assert chain["chain"]["name"] == "pichu"
+  pikachu = chain["chain"]["evolves_to"][0]
+  assert (pikachu["id"], pikachu["trigger"]) == (25, "level-up")
+  assert pikachu["evolves_to"][0] == {
+    "id": 26, "name": "raichu", "trigger": "use-item", "min_level": None, "item": "thunder-stone", "evolves_to": []
+  }
+  # Species then chain, nothing per member
+  assert respx.calls.call_count == 2
+
+  # Every member is warm after one resolution
+  for pokemon_id in (172, 26):
+    response = await async_client.get(f"/api/v1/pokemon/{pokemon_id}/evolution")
+    assert response.json() == chain
+  assert respx.calls.call_count == 2
+
@@ -35,6 +35,67 @@ async def test_add_pokemon_to_user(async_client, mock_pokeapi):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_batch_update_user_pokemons(async_client, mock_pokeapi, auth_headers):
+    user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+
+    response = await async_client.patch(
+        f"/api/v1/users/{user_id}/pokemons",
+        json={"add": [25, 6, 1]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == [25, 6, 1]
+
+    response = await async_client.patch(
+        f"/api/v1/users/{user_id}/pokemons",
+        json={"add": [6], "remove": [25, 150]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"id": 6, "name": "charizard"}, {"id": 1, "name": "bulbasaur"}]
+
+    response = await async_client.patch(
+        f"/api/v1/users/{user_id}/pokemons",
+        json={"add": [25], "remove": [25]},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_missing_pokemons_and_completion(async_client, mock_pokeapi, auth_headers):
+    user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+    await async_client.patch(f"/api/v1/users/{user_id}/pokemons", json={"add": [25]}, headers=auth_headers)
+
+    response = await async_client.get(f"/api/v1/users/{user_id}/pokemons/missing", headers=auth_headers)
+    assert response.status_code == 200
+    assert 25 not in [p["id"] for p in response.json()]
+    assert {1, 6} <= {p["id"] for p in response.json()}
+
+    response = await async_client.get(f"/api/v1/users/{user_id}/pokemons/completion", headers=auth_headers)
+    assert response.json()["owned"] == 1
+
+    response = await async_client.get(f"/api/v1/users/{user_id}/pokemons/intersection/{user_id}", headers=auth_headers)
+    assert response.json() == [{"id": 25, "name": "pikachu"}]
+
+
+@pytest.mark.asyncio
+async def test_collection_analysis(async_client, mock_pokeapi, auth_headers):
+    user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+    await async_client.patch(f"/api/v1/users/{user_id}/pokemons", json={"add": [6, 25]}, headers=auth_headers)
+
+    response = await async_client.get(f"/api/v1/users/{user_id}/pokemons/analysis", headers=auth_headers)
+    assert response.status_code == 200
+    analysis = response.json()
+    assert analysis["analyzed"] == analysis["total"] == 2
+    assert analysis["type_distribution"] == {"fire": 1, "flying": 1, "electric": 1}
+    # Rock hits charizard 4x and resists nothing in the collection
+    assert analysis["weakest_matchups"][0]["type"] == "rock"
+    assert analysis["offensive_coverage"]["water"] == 1
+    assert "dragon" in analysis["uncovered_types"]
+
+
 def test_delete_pokemon_from_user(client: TestClient, test_user):
     login_response = client.post(
         "/api/v1/auth/login",
@@ -183,4 +244,66 @@ async def test_delete_user(async_client, client: TestClient, test_user, test_use
     auth_headers = {"Authorization": f"Bearer {token}"}
 
     response = client.delete(f"/api/v1/users/{test_user.id}", headers=auth_headers)
-    assert response.status_code == 204
\ No newline at end of file
+    assert response.status_code == 204
+
+def test_get_user_not_modified(client: TestClient, test_user):
+    login_response = client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": test_user.email,
+            "password": "password123",
+            "grant_type": "password"
+        }
+    )
+    token = login_response.json()["access_token"]
+    auth_headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get(f"/api/v1/users/{test_user.id}", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = client.get(
+        f"/api/v1/users/{test_user.id}",
+        headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    collection_url = f"/api/v1/users/{test_user.id}/pokemons"
+    collection_etag = client.get(collection_url, headers=auth_headers).headers["ETag"]
+    response = client.get(collection_url, headers={**auth_headers, "If-None-Match": collection_etag})
+    assert response.status_code == 304
+
+    # Changing the collection changes both representations
+    client.delete(f"/api/v1/users/{test_user.id}/pokemons/4", headers=auth_headers)
+    response = client.get(collection_url, headers={**auth_headers, "If-None-Match": collection_etag})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert response.headers["ETag"] != collection_etag
+
+    response = client.get(f"/api/v1/users/{test_user.id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_users_compressed(client: TestClient, test_user, test_user_admin):
+    login_response = client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": test_user.email,
+            "password": "password123",
+            "grant_type": "password"
+        }
+    )
+    token = login_response.json()["access_token"]
+    auth_headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+
+    response = client.get("/api/v1/users/", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) >= 2
+
+    # Small payloads stay below the threshold
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
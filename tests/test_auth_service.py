@@ -1,6 +1,14 @@
+import pytest
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4, UUID
+from fastapi import HTTPException
 from app.modules.users.models import User
-from app.core.security import get_password_hash, verify_password, verify_token
+from app.modules.auth.revocation import BloomFilter, RevocationIndex, RevocationService, token_key, user_key
+from app.core.argon2_calibration import calibrate
+from app.core.security import (
+  build_password_hash, create_access_token, get_password_hash, get_signing_key, get_verification_key,
+  get_password_hasher, settings, verify_password, verify_token
+)
 
 class TestAuthService: 
   def test_verify_password(self):
@@ -46,4 +54,102 @@ def test_create_and_verify_token(db_session, test_user, auth_service):
 
     token_data = verify_token(token)
     assert UUID(token_data['sub']) == request.id
-    assert auth_service.authenticate_user("usertest@example.com", "wrong123") is None
\ No newline at end of file
+    assert auth_service.authenticate_user("usertest@example.com", "wrong123") is None
+
+def test_verify_token_cached():
+  token = create_access_token({"sub": str(uuid4())})
+
+  first = verify_token(token)
+  second = verify_token(token)
+  assert first == second
+  # Callers get their own copy of the cached claims
+  first["sub"] = "changed"
+  assert verify_token(token)["sub"] != "changed"
+
+
+def test_verify_expired_token():
+  token = create_access_token({"sub": str(uuid4())}, expires_delta=timedelta(seconds=-1))
+
+  with pytest.raises(HTTPException) as exc:
+    verify_token(token)
+  assert exc.value.status_code == 401
+
+
+def test_asymmetric_token(monkeypatch):
+  pytest.importorskip("cryptography")
+  from cryptography.hazmat.primitives import serialization
+  from cryptography.hazmat.primitives.asymmetric import rsa
+
+  private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+  pem = private_key.private_bytes(
+    serialization.Encoding.PEM,
+    serialization.PrivateFormat.PKCS8,
+    serialization.NoEncryption()
+  ).decode()
+
+  monkeypatch.setattr(settings, "ALGORITHM", "RS256")
+  monkeypatch.setattr(settings, "JWT_PRIVATE_KEY", pem)
+  get_signing_key.cache_clear()
+  get_verification_key.cache_clear()
+  try:
+    token = create_access_token({"sub": "asymmetric"})
+    assert verify_token(token)["sub"] == "asymmetric"
+  finally:
+    get_signing_key.cache_clear()
+    get_verification_key.cache_clear()
+
+
+def test_revocation_index_sync(db_session):
+  user_id = uuid4()
+  RevocationService(db_session).revoke_user(user_id)
+  db_session.commit()
+
+  # A fresh index (e.g. another worker) picks the revocation from the table
+  index = RevocationIndex(sync_interval=30)
+  assert not index.is_revoked(user_key(user_id))
+  index.sync(db_session)
+  assert index.is_revoked(user_key(user_id))
+  assert not index.is_revoked(user_key(uuid4()))
+
+
+def test_refresh_token_revoked_once(db_session):
+  service = RevocationService(db_session)
+  expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+  assert service.revoke_token("reused", expires_at)
+  assert not service.revoke_token("reused", expires_at)
+  db_session.commit()
+
+  # Token revocations stay in the table, only revoked users are kept in memory
+  index = RevocationIndex(sync_interval=30)
+  index.sync(db_session)
+  assert not index.is_revoked(token_key("reused"))
+
+
+def test_revocation_bloom_filter_grows():
+  index = RevocationIndex(sync_interval=30)
+  capacity = index._bloom.capacity
+  for i in range(capacity + 1):
+    index.add(user_key(i))
+  assert index._bloom.capacity > capacity
+  assert all(index.is_revoked(user_key(i)) for i in range(capacity + 1))
+  assert BloomFilter(capacity=100_000).size_bits >= 100_000 * BloomFilter.BITS_PER_KEY
+
+
+def test_authenticate_user_rehash(db_session, test_user, auth_service):
+  # Hash made with weaker parameters than the configured ones
+  legacy_hash = build_password_hash(time_cost=1, memory_cost=8192, parallelism=1).hash("password123")
+  test_user.hashed_password = legacy_hash
+  db_session.add(test_user)
+  db_session.commit()
+
+  user = auth_service.authenticate_user(test_user.email, "password123")
+  assert user.hashed_password != legacy_hash
+  assert not get_password_hasher().current_hasher.check_needs_rehash(user.hashed_password)
+  assert verify_password("password123", user.hashed_password)
+
+
+def test_argon2_calibration():
+  result = calibrate(target_ms=50, max_memory_kib=8192, parallelism=1, min_memory_kib=1024, rounds=1)
+  assert result["ARGON2_TIME_COST"] >= 1
+  assert result["ARGON2_MEMORY_COST"] <= 8192
+  assert result["latency_ms"] <= 50
@@ -0,0 +1,40 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import PUBLIC_LONG, conditional_response, make_etag
+
+
+def make_app() -> FastAPI:
+  app = FastAPI()
+  app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+  @app.get("/document")
+  def document(request: Request, response: Response):
+    not_modified = conditional_response(request, response, make_etag("document"), PUBLIC_LONG)
+    if not_modified:
+      return not_modified
+    return {"body": "x" * 1000}
+
+  return app
+
+
+@pytest.mark.asyncio
+async def test_compressed_responses_get_their_own_etag():
+  transport = httpx.ASGITransport(app=make_app())
+  async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+    identity = (await client.get("/document", headers={"Accept-Encoding": "identity"})).headers["etag"]
+    assert identity == make_etag("document")
+
+    response = await client.get("/document", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    gzipped = response.headers["etag"]
+    assert gzipped == identity[:-1] + '-gzip"'
+
+    # The 304 names the variant the client revalidated
+    response = await client.get("/document", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped})
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzipped
+
+    response = await client.get("/document", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped})
+    assert response.status_code == 304
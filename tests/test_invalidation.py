@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import text
+from app.core.invalidation import InvalidationBus, invalidation_bus
+
+
+def test_events_dispatched_on_commit_only(monkeypatch):
+  from tests.conftest import TestingSessionLocal
+
+  received = []
+  monkeypatch.setitem(invalidation_bus._handlers, "test", [])
+  invalidation_bus.subscribe("test", received.append)
+
+  with TestingSessionLocal() as session:
+    session.execute(text("SELECT 1"))
+    invalidation_bus.publish(session, "test", "a")
+    invalidation_bus.publish(session, "test", "a")
+    assert received == []
+    session.commit()
+    assert received == [{"a"}]
+
+    # Published inside a transaction, as services do after loading the row
+    session.execute(text("SELECT 1"))
+    invalidation_bus.publish(session, "test", "b")
+    session.rollback()
+    session.execute(text("SELECT 1"))
+    session.commit()
+  assert received == [{"a"}]
+
+
+@pytest.mark.asyncio
+async def test_remote_events_coalesced():
+  sender = InvalidationBus("test", max_keys=2)
+  bus = InvalidationBus("test", coalesce=0.01, max_keys=2)
+  received = []
+  bus.subscribe("user", received.append)
+  bus.subscribe("local", received.append, local=False)
+
+  for key in ("1", "2", "1"):
+    for payload in sender.encode({"user": {key}}):
+      bus.receive(payload)
+  # Own events were already applied locally
+  bus.receive(bus.encode({"user": {"3"}})[0])
+  await asyncio.sleep(0.05)
+  assert received == [{"1", "2"}]
+
+  # Past max_keys a topic is sent as a wildcard
+  payload = sender.encode({"user": {"1", "2", "3"}})
+  assert json.loads(payload[0])["e"] == {"user": None}
+
+  bus.dispatch({"local": {"x"}}, local=True)
+  assert received == [{"1", "2"}]
+
+
+def test_revocations_applied_after_commit():
+  from tests.conftest import TestingSessionLocal
+  from app.modules.auth.revocation import RevocationService, revocation_index
+
+  revocation_index.load([])
+  with TestingSessionLocal() as session:
+    service = RevocationService(session)
+    service.revoke_user("rolled-back")
+    session.rollback()
+    assert not revocation_index.is_revoked("sub:rolled-back")
+
+    service.revoke_user("committed")
+    assert not revocation_index.is_revoked("sub:committed")
+    session.commit()
+    assert revocation_index.is_revoked("sub:committed")
+
+    service.restore_user("committed")
+    session.commit()
+  assert not revocation_index.is_revoked("sub:committed")
+  assert not revocation_index.is_revoked("sub:rolled-back")
+
+
+def test_revocation_wildcard_forces_a_sync():
+  from app.modules.auth.revocation import revocation_index
+
+  revocation_index.load([])
+  invalidation_bus.dispatch({"revoked": None})
+  assert revocation_index._last_sync is None
@@ -16,4 +16,158 @@ async def test_get_by_name(async_client, mock_pokeapi):
   assert response.status_code == 200
   pokemon = response.json()
   assert pokemon['id'] == 1
-  assert pokemon['name'] == "bulbasaur"
\ No newline at end of file
+  assert pokemon['name'] == "bulbasaur"
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_upstream_errors(async_client, mock_pokeapi, monkeypatch):
+  import httpx
+  import respx
+  from app.modules.pokemon.service import PokeAPIService
+
+  breaker = PokeAPIService.breaker
+  monkeypatch.setattr(breaker, "failure_threshold", 2)
+  # Same pattern as the fixture route, respx replaces it in place
+  route = respx.get("https://pokeapi.co/api/v2/pokemon/25").mock(return_value=httpx.Response(502))
+
+  for _ in range(2):
+    await async_client.get("/api/v1/pokemon/25")
+  assert breaker.state == breaker.OPEN
+
+  # Rejected without going upstream
+  response = await async_client.get("/api/v1/pokemon/25")
+  assert response.status_code == 503
+  assert route.call_count == 2
+
+  monkeypatch.setattr(breaker, "reset_timeout", 0)
+  route.mock(return_value=httpx.Response(200, json={"id": 25, "name": "pikachu"}))
+  response = await async_client.get("/api/v1/pokemon/25")
+  assert response.status_code == 200
+  assert breaker.state == breaker.CLOSED
+
+
+def test_name_index_prefix_and_fuzzy():
+  from app.modules.pokemon.search import NameIndex, bounded_distance
+
+  index = NameIndex([{"id": 25, "name": "pikachu"}, {"id": 26, "name": "raichu"}, {"id": 122, "name": "mr-mime"}])
+  assert index.prefix("PIKA") == [{"id": 25, "name": "pikachu"}]
+  assert index.prefix("x") == []
+  assert index.resolve("Mr. Mime") == {"id": 122, "name": "mr-mime"}
+  assert index.fuzzy("pikchu", max_distance=2) == [{"id": 25, "name": "pikachu"}]
+  assert bounded_distance("raichu", "pikachu", 2) is None
+
+
+@pytest.mark.asyncio
+async def test_get_by_name_resolves_locally(async_client, mock_pokeapi):
+  import respx
+
+  await async_client.get("/api/v1/pokemon/name/bulbasaur")
+  calls = respx.calls.call_count
+
+  response = await async_client.get("/api/v1/pokemon/name/Pikachu")
+  assert response.json() == {"id": 25, "name": "pikachu"}
+
+  # Typo: answered from the catalog with a suggestion, PokeAPI is not called
+  response = await async_client.get("/api/v1/pokemon/name/pikchu")
+  assert response.status_code == 404
+  assert "Did you mean: pikachu?" in response.json()["detail"]
+  assert respx.calls.call_count == calls
+
+
+
+@pytest.mark.asyncio
+async def test_get_by_name_falls_back_to_pokeapi(async_client, mock_pokeapi):
+  import httpx
+  import respx
+
+  # Nothing close in the catalog: a single upstream lookup decides
+  response = await async_client.get("/api/v1/pokemon/name/mewtwo")
+  assert response.status_code == 404
+  assert "Did you mean" not in response.json()["detail"]
+
+  # Same pattern as the fixture catch-all, respx replaces it in place
+  route = respx.get(url__regex=r"https://pokeapi\.co/api/v2/pokemon/.*").mock(
+    return_value=httpx.Response(200, json={"id": 150, "name": "mewtwo"})
+  )
+  calls = route.call_count
+  response = await async_client.get("/api/v1/pokemon/name/mewtwo")
+  assert response.json() == {"id": 150, "name": "mewtwo"}
+  assert route.call_count == calls + 1
+
+  # Alternate forms are outside the ids this API serves
+  route.mock(return_value=httpx.Response(200, json={"id": 10034, "name": "charizard-mega-x"}))
+  response = await async_client.get("/api/v1/pokemon/name/charizard-mega-x")
+  assert response.status_code == 404
+  assert "alternate form" in response.json()["detail"]
+
+def test_type_analysis_matrix():
+  from app.modules.pokemon.types import analyze
+
+  # Charizard (fire/flying): immune to ground, 4x weak to rock
+  analysis = analyze([("fire", "flying"), ("grass", "poison")])
+  defensive = {matchup["type"]: matchup for matchup in analysis["defensive_coverage"]}
+  assert defensive["ground"]["immune"] == 1
+  assert defensive["rock"]["weak"] == 1
+  assert defensive["fighting"]["resistant"] == 2
+  # Fire halves ice, flying doubles it: neutral on charizard
+  assert defensive["ice"]["weak"] == 1
+  assert analysis["offensive_coverage"]["grass"] == 2
+  assert analyze([])["weakest_matchups"] == []
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+  from app.core.file_cache import DiskCache
+
+  cache = DiskCache(str(tmp_path), max_bytes=10)
+  cache.put("a", b"aaaa", "image/png")
+  cache.put("b", b"aaaa", "image/png")  # same content, one blob
+  assert cache.size == 4
+  cache.put("c", b"cccc", "image/png")
+  assert cache.get("a") is not None
+  cache.put("d", b"dddd", "image/png")
+
+  # b was the least recently used, the blob stays for a
+  assert cache.get("b") is None
+  assert cache.get("c") is None
+  assert open(cache.get("a").path, "rb").read() == b"aaaa"
+  assert cache.size == 8
+
+  # Reloaded from disk with the same entries
+  reloaded = DiskCache(str(tmp_path), max_bytes=10)
+  assert reloaded.get("d").digest == cache.get("d").digest
+  assert len(reloaded) == 2
+
+
+def test_disk_cache_shared_between_workers(tmp_path):
+  from app.core.file_cache import DiskCache
+
+  first = DiskCache(str(tmp_path), max_bytes=10)
+  second = DiskCache(str(tmp_path), max_bytes=10)
+  first.put("a", b"aaaa", "image/png")
+  pinned = first.pin("a")
+
+  # The cap covers the blobs of both workers, the other worker's key goes first
+  second.put("b", b"bbbb", "image/png")
+  second.put("c", b"cccc", "image/png")
+  assert second.size == 8
+  assert second.get("a") is None
+
+  # Still served from the pin, a miss for the worker that wrote it
+  assert open(pinned.path, "rb").read() == b"aaaa"
+  first.release(pinned)
+  assert first.get("a") is None
+  assert first.pin("a") is None
+
+
+
+def test_disk_cache_keeps_blobs_other_workers_use(tmp_path):
+  from app.core.file_cache import DiskCache
+
+  first = DiskCache(str(tmp_path), max_bytes=100)
+  second = DiskCache(str(tmp_path), max_bytes=100)
+  assert second.get("b") is None  # loaded before the first worker writes
+
+  first.put("a", b"aaaa", "image/png")
+  second.put("b", b"aaaa", "image/png")
+  # b moves to other content, the blob is still a's
+  second.put("b", b"bbbb", "image/png")
+  assert open(first.get("a").path, "rb").read() == b"aaaa"
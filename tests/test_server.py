@@ -0,0 +1,95 @@
+import pytest
+import subprocess
+import sys
+from app.core.config import get_settings
+from app.server import build_options, pool_sizes, worker_count
+
+
+def test_pool_sizes_respect_budget():
+  for workers in (1, 3, 8, 16):
+    for reserved in (0, 1):
+      pool_size, max_overflow = pool_sizes(workers, 80, reserved=reserved)
+      assert pool_size >= 1
+      assert (pool_size + max_overflow + reserved) * workers <= 80
+
+  # Cannot give every worker a connection plus its listener
+  with pytest.raises(ValueError):
+    pool_sizes(16, 20, reserved=1)
+  with pytest.raises(ValueError):
+    pool_sizes(100, 80)
+
+
+def test_worker_count():
+  assert worker_count(3) == 3
+  assert worker_count(None) >= 1
+
+
+def test_build_options():
+  options = build_options(get_settings())
+  assert options["preload_app"] is True
+  assert options["worker_class"] == "app.server.ProductionWorker"
+  assert options["max_requests"] > 0
+
+
+def test_import_is_lazy():
+  # Fresh interpreter: importing the app must not create the engine nor the hasher
+  code = (
+    "import app.main; "
+    "from app.core.database import engine_created; "
+    "from app.core.security import get_password_hasher; "
+    "assert not engine_created(); "
+    "assert get_password_hasher.cache_info().currsize == 0"
+  )
+  subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.asyncio
+async def test_warmup_marks_ready(async_client, mock_pokeapi, monkeypatch):
+  from app.main import app
+  from app.modules.pokemon.service import PokeAPIService
+  from app.warmup import warmup
+
+  settings = get_settings()
+  monkeypatch.setattr(settings, "WARMUP_POKEMON_IDS", [1, 25])
+  monkeypatch.setattr(app.state, "ready", False)
+
+  response = await async_client.get("/health")
+  assert response.status_code == 503
+  assert response.json() == {"status": "starting"}
+
+  await warmup(app)
+
+  assert 25 in PokeAPIService._pokemon_cache
+  assert 1 in PokeAPIService._pokemon_cache
+  response = await async_client.get("/health")
+  assert response.status_code == 200
+  assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_probe(async_client, mock_pokeapi, monkeypatch):
+  from app.health import readiness_probe
+  from app.modules.pokemon.service import PokeAPIService
+
+  readiness_probe.invalidate()
+  response = await async_client.get("/readyz")
+  assert response.status_code == 200
+  report = response.json()
+  assert report["status"] == "ready"
+  assert set(report["checks"]) == {"database", "pokeapi", "caches", "task_queue", "invalidation"}
+  assert all("latency_ms" in check for check in report["checks"].values())
+
+  # Served from cache until the interval passes
+  response = await async_client.get("/readyz")
+  assert response.json()["checks"] == report["checks"]
+
+  # An open PokeAPI circuit degrades the worker but keeps it in rotation
+  monkeypatch.setattr(PokeAPIService.breaker, "failure_threshold", 1)
+  PokeAPIService.breaker.record_failure()
+  readiness_probe.invalidate()
+  response = await async_client.get("/readyz")
+  assert response.status_code == 200
+  assert response.json()["status"] == "degraded"
+
+  response = await async_client.get("/livez")
+  assert response.json() == {"status": "alive"}
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from app.core.tasks import SQLiteBackend, TaskQueue
+
+
+@pytest.mark.asyncio
+async def test_task_retries_then_succeeds():
+  queue = TaskQueue(workers=2, retry_backoff=0.01)
+  calls = []
+
+  @queue.task("flaky")
+  async def flaky(value):
+    calls.append(value)
+    if len(calls) < 3:
+      raise RuntimeError("boom")
+
+  await queue.start()
+  await queue.enqueue("flaky", value=1)
+  for _ in range(100):
+    if len(calls) == 3:
+      break
+    await asyncio.sleep(0.01)
+  await queue.stop()
+  assert calls == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_task_runs_inline_when_not_started():
+  queue = TaskQueue()
+  calls = []
+
+  @queue.task("sync")
+  def sync_job(value):
+    calls.append(value)
+
+  await queue.enqueue("sync", value="x")
+  assert calls == ["x"]
+
+
+@pytest.mark.asyncio
+async def test_persisted_jobs_survive_restart(tmp_path):
+  path = str(tmp_path / "jobs.db")
+  calls = []
+
+  # Worker stops before the job ran (stop with no time left)
+  first = TaskQueue(backend=SQLiteBackend(path), workers=1, lease=0.05)
+  blocker = asyncio.Event()
+
+  @first.task("collect")
+  async def collect_first(value):
+    await blocker.wait()
+
+  await first.start()
+  await first.enqueue("collect", value=7)
+  await first.stop(timeout=0)
+
+  second = TaskQueue(backend=SQLiteBackend(path), workers=1, lease=0.05)
+
+  @second.task("collect")
+  async def collect(value):
+    calls.append(value)
+
+  await asyncio.sleep(0.06)
+  await second.start()
+  for _ in range(100):
+    if calls:
+      break
+    await asyncio.sleep(0.01)
+  await second.stop()
+  assert calls == [7]
+  assert SQLiteBackend(path).claim(lease=1, limit=10) == []
+
+
+def test_sqlite_backend_connects_per_process(tmp_path, monkeypatch):
+  path = tmp_path / "jobs.db"
+  backend = SQLiteBackend(str(path))
+  # Nothing opened until used: the app is imported before the workers fork
+  assert not path.exists()
+
+  parent = backend.connection
+  assert backend.connection is parent
+  monkeypatch.setattr("app.core.tasks.os.getpid", lambda: -1)
+  assert backend.connection is not parent
+
+
+@pytest.mark.asyncio
+async def test_add_pokemon_from_catalog_enqueues_enrichment(async_client, mock_pokeapi, auth_headers):
+  from app.modules.pokemon.service import PokeAPIService
+
+  await PokeAPIService().get_catalog()
+  user_id = (await async_client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+  response = await async_client.post(f"/api/v1/users/{user_id}/pokemons/25", headers=auth_headers)
+  assert response.status_code == 200
+  assert response.json()["pokemons"] == [{"id": 25, "name": "pikachu"}]
+  # No workers in tests, the enrichment ran inline
+  assert 25 in PokeAPIService._pokemon_cache
@@ -17,6 +17,22 @@ async def test_add_pokemon_to_user(db_session, test_user, users_service, mock_po
   assert pokemon['id'] == 6
   
 
+@pytest.mark.asyncio
+async def test_batch_update_user_pokemons(db_session, test_user, users_service, mock_pokeapi):
+  db_session.add(test_user)
+  db_session.commit()
+  db_session.refresh(test_user)
+
+  pokemons = await users_service.batch_update_user_pokemons(test_user.id, add=[6, 25, 6, 1], remove=[4])
+  assert [p["id"] for p in pokemons] == [6, 25, 1]
+
+  # Unknown ids reject the whole batch
+  with pytest.raises(Exception) as exc:
+    await users_service.batch_update_user_pokemons(test_user.id, add=[999], remove=[6])
+  assert exc.value.status_code == 404
+  assert [p["id"] for p in users_service.get_user_pokemons(test_user.id)] == [6, 25, 1]
+
+
 def test_remove_pokemon_from_user(db_session, test_user, users_service):
   db_session.add(test_user)
   db_session.commit()
@@ -173,4 +189,176 @@ def test_activate_user(db_session, test_user, users_service):
   assert user.is_active == False
 
   user2 = users_service.activate_user(test_user.id)
-  assert user2.is_active == True
\ No newline at end of file
+  assert user2.is_active == True
+
+@pytest.mark.asyncio
+async def test_iter_users_keyset_batches(db_session):
+  from dataclasses import dataclass
+  from uuid import uuid4
+  from app.modules.users.repository import UserRepository
+
+  for i in range(7):
+    db_session.add(User(id=uuid4(), email=f"iter{i}@example.com", username=f"iter_{i}", hashed_password="x", is_active=i % 2 == 0))
+  db_session.commit()
+  db_session.expunge_all()
+  repository = UserRepository(db_session)
+
+  batches = list(repository.iter_user_batches(batch_size=3, columns=("username",)))
+  assert [len(batch) for batch in batches] == [3, 3, 1]
+  assert sorted(row[0] for batch in batches for row in batch) == [f"iter_{i}" for i in range(7)]
+  # Plain rows, no ORM instances were loaded
+  assert len(db_session.identity_map) == 0
+
+  @dataclass(slots=True)
+  class Row:
+    id: object
+    username: str
+
+  active = list(repository.iter_users(batch_size=2, filters={"is_active": True}, columns=("id", "username"), into=Row))
+  assert sorted(row.username for row in active) == ["iter_0", "iter_2", "iter_4", "iter_6"]
+
+  streamed = [row async for row in repository.aiter_users(batch_size=4, filters=[User.username.like("iter_%")])]
+  assert len(streamed) == 7
+
+
+def test_user_views_match_user_response(db_session, test_user, test_user_admin, users_service):
+  import json
+  from app.modules.users.schemas import UserResponse
+  from app.modules.users.views import render_users
+
+  users = users_service.get_all_users()
+  expected = [UserResponse.model_validate(user, from_attributes=True).model_dump(mode="json") for user in users]
+
+  views = users_service.get_user_views()
+  assert json.loads(render_users(views)) == expected
+  assert views[0].pokemon_ids.typecode == "H"
+
+  views = users_service.search_user_views("userTest")
+  assert [view.username for view in views] == ["userTest"]
+
+
+def test_user_views_keep_each_stored_name(db_session, test_user, test_user_admin, users_service):
+  import json
+  from app.modules.users.views import render_users
+
+  users_service.update_user_pokemons(test_user.id, [Pokemon(id=4, name="pikachu")])
+  users_service.update_user_pokemons(test_user_admin.id, [Pokemon(id=4, name="charmander")])
+
+  rendered = {user["id"]: user["pokemons"] for user in json.loads(render_users(users_service.get_user_views()))}
+  assert rendered[str(test_user.id)] == [{"id": 4, "name": "pikachu"}]
+  assert rendered[str(test_user_admin.id)] == [{"id": 4, "name": "charmander"}]
+
+
+def test_collection_bitset_operations(db_session, test_user, test_user_admin, users_service):
+  from app.modules.users import bitset
+  from app.modules.users.schemas import CollectionOperation
+
+  # Assigning the collection keeps the bitset in sync
+  user = users_service.update_user_pokemons(test_user.id, [Pokemon(id=1, name="bulbasaur"), Pokemon(id=1025, name="pecharunt")])
+  assert len(user.pokemon_bits) == bitset.BITSET_BYTES
+  assert bitset.contains(user.pokemon_bits, 1025)
+  assert not bitset.contains(user.pokemon_bits, 4)
+  assert user.pokemon_count == 2
+  # Stored collections may hold ids the bits cannot, the count follows the bits
+  assert User(pokemons=[{"id": 1, "name": "bulbasaur"}, {"id": 10034, "name": "charizard-mega-x"}]).pokemon_count == 1
+  users_service.update_user_pokemons(test_user_admin.id, [Pokemon(id=1, name="bulbasaur"), Pokemon(id=6, name="charizard")])
+
+  def compare(operation):
+    return [p["id"] for p in users_service.compare_collections(test_user.id, test_user_admin.id, operation)]
+
+  assert compare(CollectionOperation.intersection) == [1]
+  assert compare(CollectionOperation.union) == [1, 6, 1025]
+  assert compare(CollectionOperation.difference) == [1025]
+
+  assert users_service.get_collection_completion(test_user.id) == {"owned": 2, "total": 1025, "percentage": 0.2}
+
+
+@pytest.mark.asyncio
+async def test_pokemon_owners_index(db_session, test_user, test_user_admin, users_service, mock_pokeapi):
+  await users_service.batch_update_user_pokemons(test_user.id, add=[25, 6], remove=[])
+  await users_service.add_pokemon_to_user(test_user_admin.id, 25)
+
+  owners = users_service.get_pokemon_owners(25)
+  assert owners["total"] == 2
+  assert {o["id"] for o in owners["owners"]} == {test_user.id, test_user_admin.id}
+
+  first = users_service.get_pokemon_owners(25, limit=1)
+  second = users_service.get_pokemon_owners(25, after=first["next"], limit=1)
+  assert [first["owners"][0]["id"], second["owners"][0]["id"]] == sorted([test_user.id, test_user_admin.id])
+
+  users_service.remove_pokemon_from_user(test_user.id, 25)
+  users_service.update_user_pokemons(test_user.id, [])
+  assert users_service.get_pokemon_owners(25)["total"] == 1
+  assert users_service.get_pokemon_owners(6)["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_collection_change_during_lookup(db_session, test_user, users_service, monkeypatch):
+  from fastapi import HTTPException
+
+  # Another request adds the same Pokémon while this one waits on PokeAPI
+  async def get_pokemon(pokemon_id):
+    users_service.update_user_pokemons(test_user.id, [Pokemon(id=pokemon_id, name="charizard")])
+    return {"id": pokemon_id, "name": "charizard"}
+
+  monkeypatch.setattr(users_service.pokeapi_service, "get_cached_pokemon", lambda pokemon_id: None)
+  monkeypatch.setattr(users_service.pokeapi_service, "get_pokemon", get_pokemon)
+
+  with pytest.raises(HTTPException) as error:
+    await users_service.add_pokemon_to_user(test_user.id, 6)
+  assert error.value.status_code == 400
+  assert [p["id"] for p in users_service.get_user_pokemons(test_user.id)] == [6]
+
+  # A diff computed from a stale collection leaves the counts alone
+  users_service.collection_index.apply(test_user.id, added=[6], removed=[25])
+  assert users_service.get_pokemon_owners(6)["total"] == 1
+  assert users_service.collection_index.count_owners(6) == 1
+  assert users_service.collection_index.count_owners(25) == 0
+
+
+@pytest.mark.asyncio
+async def test_leaderboards(db_session, test_user, test_user_admin, users_service, mock_pokeapi):
+  users_service._leaderboard_cache.clear()
+  await users_service.batch_update_user_pokemons(test_user.id, add=[25, 6, 1], remove=[4])
+  await users_service.batch_update_user_pokemons(test_user_admin.id, add=[25], remove=[4])
+
+  board = await users_service.get_pokemon_leaderboard(limit=2)
+  assert board == [{"id": 25, "name": "pikachu", "owners": 2}, {"id": 1, "name": "bulbasaur", "owners": 1}]
+
+  collectors = users_service.get_top_collectors(limit=10)
+  assert [(c["id"], c["pokemon_count"]) for c in collectors] == [(test_user.id, 3), (test_user_admin.id, 1)]
+
+  # Served from cache until the TTL passes
+  users_service.update_user_pokemons(test_user.id, [])
+  assert users_service.get_top_collectors(limit=10) == collectors
+  users_service._leaderboard_cache.clear()
+  assert [c["id"] for c in users_service.get_top_collectors(limit=10)] == [test_user_admin.id]
+
+
+@pytest.mark.asyncio
+async def test_similar_users_and_recommendations(db_session, test_user, test_user_admin, users_service, mock_pokeapi):
+  from app.modules.users.service import get_collection_matrix
+
+  get_collection_matrix.cache_clear()
+  await users_service.batch_update_user_pokemons(test_user.id, add=[25, 6], remove=[4])
+  await users_service.batch_update_user_pokemons(test_user_admin.id, add=[25, 6, 1], remove=[4])
+
+  similar = users_service.get_similar_users(test_user.id)
+  assert [(u["id"], u["score"]) for u in similar] == [(test_user_admin.id, round(2 / 3, 4))]
+
+  recommendations = await users_service.get_recommendations(test_user.id)
+  assert recommendations == [{"id": 1, "name": "bulbasaur", "score": round(2 / 3, 4)}]
+
+  # Collection changes update the loaded matrix in place
+  users_service.update_user_pokemons(test_user_admin.id, [])
+  assert users_service.get_similar_users(test_user.id) == []
+
+  # Written by another worker: the row is reloaded once the change is announced
+  from sqlalchemy import update
+  from app.core.invalidation import invalidation_bus
+  from app.modules.users import bitset
+  db_session.execute(update(User).where(User.id == test_user_admin.id).values(pokemon_bits=bitset.from_ids([25])))
+  assert users_service.get_similar_users(test_user.id) == []
+  invalidation_bus.dispatch({"collection": {str(test_user_admin.id)}})
+  assert [u["id"] for u in users_service.get_similar_users(test_user.id)] == [test_user_admin.id]
+  get_collection_matrix.cache_clear()